@@ -1,7 +1,8 @@
 # project/__init__.py
 import json
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from traceback import print_exc
 
 from flask import Flask, jsonify
@@ -10,7 +11,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 
 from util.dt_encoder import DTEncoder
-from util.ignore_requests import check_ignore_token
+from util.ignore_requests import ActivityLogRules
+from util.ttl_cache import TTLCache
 
 # instantiate the extensions
 
@@ -28,22 +30,165 @@ def create_app(config_name):
 
     bcrypt.init_app(app)
 
+    # Per-worker attendance caches, shared by all requests of this process
+    if app.config.get('ATTENDANCE_OPEN_SESSION_CACHE_ENABLED'):
+        app.extensions['attendance_open_sessions'] = TTLCache(
+            max_size=app.config['ATTENDANCE_OPEN_SESSION_CACHE_SIZE'],
+            ttl_seconds=app.config['ATTENDANCE_OPEN_SESSION_CACHE_TTL_SECONDS']
+        )
+    if app.config.get('EMPLOYEE_STATUS_INDEX_ENABLED'):
+        import crud
+        from datastore.deps import session_scope
+        from repositories.employee_repository import EmployeeRepository
+        from services.employee_status_index import EmployeeStatusIndex
+        app.extensions['employee_status_index'] = EmployeeStatusIndex(
+            repository=EmployeeRepository(crud.employee_crud_handler),
+            session_factory=session_scope,
+            refresh_seconds=app.config['EMPLOYEE_STATUS_INDEX_REFRESH_SECONDS'],
+            full_reload_seconds=app.config['EMPLOYEE_STATUS_INDEX_FULL_RELOAD_SECONDS']
+        )
+
+    if app.config.get('ATTENDANCE_WRITE_BEHIND_ENABLED'):
+        import crud
+        from datastore.deps import session_scope
+        from repositories.attendance_repository import AttendanceRepository
+        from services.punch_write_behind import PunchWriteBehindQueue
+        app.extensions['attendance_punch_queue'] = PunchWriteBehindQueue(
+            repository=AttendanceRepository(crud.attendance_crud_handler, crud.attendance_summary_crud_handler),
+            session_factory=session_scope,
+            spool_dir=app.config['ATTENDANCE_WRITE_BEHIND_SPOOL_DIR'],
+            max_size=app.config['ATTENDANCE_WRITE_BEHIND_QUEUE_SIZE'],
+            batch_size=app.config['ATTENDANCE_WRITE_BEHIND_BATCH_SIZE'],
+            flush_interval_ms=app.config['ATTENDANCE_WRITE_BEHIND_FLUSH_INTERVAL_MS'],
+            enqueue_timeout_ms=app.config['ATTENDANCE_WRITE_BEHIND_ENQUEUE_TIMEOUT_MS'],
+            fsync=app.config['ATTENDANCE_WRITE_BEHIND_FSYNC'],
+            partitioned=app.config.get('ATTENDANCE_PARTITIONED', False),
+            open_session_lookback_days=app.config.get('ATTENDANCE_OPEN_SESSION_LOOKBACK_DAYS'),
+            dropped_ttl_seconds=app.config['ATTENDANCE_WRITE_BEHIND_DROPPED_TTL_SECONDS']
+        )
+
+    if app.config.get('ATTENDANCE_PRESENCE_INDEX_ENABLED'):
+        import crud
+        from datastore.deps import session_scope
+        from repositories.attendance_repository import AttendanceRepository
+        from services.presence_index import PresenceIndex
+        app.extensions['attendance_presence_index'] = PresenceIndex(
+            repository=AttendanceRepository(crud.attendance_crud_handler, crud.attendance_summary_crud_handler),
+            session_factory=session_scope,
+            reconcile_seconds=app.config['ATTENDANCE_PRESENCE_RECONCILE_SECONDS'],
+            open_session_lookback_days=app.config.get('ATTENDANCE_OPEN_SESSION_LOOKBACK_DAYS')
+        )
+
+    if app.config.get('IDEMPOTENCY_KEYS_ENABLED'):
+        from services.idempotency_store import IdempotencyStore
+        repository = session_factory = None
+        if app.config.get('IDEMPOTENCY_PERSISTED'):
+            import crud
+            from datastore.deps import new_session_scope
+            from repositories.idempotency_repository import IdempotencyRepository
+            repository = IdempotencyRepository(crud.idempotency_crud_handler)
+            # Claims must be committed at once, not with the request's transaction
+            session_factory = new_session_scope
+        app.extensions['idempotency_store'] = IdempotencyStore(
+            cache=TTLCache(
+                max_size=app.config['IDEMPOTENCY_CACHE_SIZE'],
+                ttl_seconds=app.config['IDEMPOTENCY_TTL_SECONDS']
+            ),
+            repository=repository,
+            session_factory=session_factory,
+            lock_seconds=app.config['IDEMPOTENCY_LOCK_SECONDS']
+        )
+
+    # Request activity, sampled per USER_ACTIVITY_RULES, is written off the
+    # request path: buffered in memory, or spooled to disk with USER_ACTIVITY_SPOOL_DIR
+    import crud
+    from datastore.deps import session_scope
+    from repositories.user_activity_repository import UserActivityRepository
+    from services.activity_log_writer import ActivityLogWriter
+    from services.activity_rollup import ActivityRollup
+    activity_repository = UserActivityRepository(
+        crud.user_activity_crud_handler,
+        crud.user_activity_rollup_crud_handler
+    )
+    app.extensions['activity_log_rules'] = ActivityLogRules(
+        rules=app.config['USER_ACTIVITY_RULES'],
+        default_sample_rate=app.config['USER_ACTIVITY_DEFAULT_SAMPLE_RATE']
+    )
+    if app.config.get('USER_ACTIVITY_SPOOL_DIR'):
+        from services.activity_log_spool import ActivityLogSpool
+        app.extensions['activity_log_writer'] = ActivityLogSpool(
+            repository=activity_repository,
+            session_factory=session_scope,
+            spool_dir=app.config['USER_ACTIVITY_SPOOL_DIR'],
+            segment_bytes=app.config['USER_ACTIVITY_SPOOL_SEGMENT_BYTES'],
+            max_bytes=app.config['USER_ACTIVITY_SPOOL_MAX_BYTES'],
+            flush_interval_ms=app.config['USER_ACTIVITY_FLUSH_INTERVAL_MS'],
+            fsync=app.config['USER_ACTIVITY_SPOOL_FSYNC']
+        )
+    else:
+        app.extensions['activity_log_writer'] = ActivityLogWriter(
+            repository=activity_repository,
+            session_factory=session_scope,
+            max_size=app.config['USER_ACTIVITY_QUEUE_SIZE'],
+            batch_size=app.config['USER_ACTIVITY_BATCH_SIZE'],
+            flush_interval_ms=app.config['USER_ACTIVITY_FLUSH_INTERVAL_MS']
+        )
+    # Per-route query count and database time of this worker (GET /metrics)
+    from datastore.instrumentation import RouteDbStats
+    app.extensions['route_db_stats'] = RouteDbStats(
+        n_plus_one_threshold=app.config.get('DATABASE_N_PLUS_ONE_THRESHOLD')
+    )
+
+    # Hourly per-route counts of every request, sampled or not
+    app.extensions['activity_rollup'] = ActivityRollup(
+        repository=activity_repository,
+        session_factory=session_scope,
+        flush_seconds=app.config['USER_ACTIVITY_ROLLUP_FLUSH_SECONDS']
+    )
+
     # Register REST API blueprints - separate modules for each resource
     from app.api.auth import auth_bp
     from app.api.users import users_bp
     from app.api.organizations import organizations_bp
     from app.api.attendance import attendance_bp
+    from app.api.employees import employees_bp
+    from app.api.activity import activity_bp
+    from app.api.metrics import metrics_bp
 
     # Register blueprints with /api prefix
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(users_bp, url_prefix='/api')
     app.register_blueprint(organizations_bp, url_prefix='/api')
     app.register_blueprint(attendance_bp, url_prefix='/api')
+    # Registered under their own prefixes: /api/employees, /api/activity, /api/metrics
+    app.register_blueprint(employees_bp, url_prefix='/api/employees')
+    app.register_blueprint(activity_bp, url_prefix='/api/activity')
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
 
     # Register global exception handlers
     from exceptions.exception_handlers import register_exception_handlers
     register_exception_handlers(app)
 
+    # Register CLI commands (flask --app manage <group> <command>)
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Periodic jobs, started by the first request a worker serves
+    from datastore.session import engine
+    from services.scheduler import Scheduler
+    from app.jobs import register_jobs
+    app.extensions['scheduler'] = Scheduler(engine)
+    register_jobs(app, app.extensions['scheduler'])
+
+    @app.before_request
+    def start_request_timer():
+        from flask import g
+        g.request_started = time.perf_counter()
+
+    @app.before_request
+    def start_scheduler():
+        app.extensions['scheduler'].start()
+
     from util.utils import authenticate
     @app.before_request
     #@authenticate
@@ -52,8 +197,12 @@ def create_app(config_name):
 
     @app.after_request
     def after_request(response):
-        from flask import request
-        if check_ignore_token(request.path, request.method):
+        from flask import g, request
+        started = g.get('request_started')
+        duration_ms = (time.perf_counter() - started) * 1000 if started is not None else None
+        app.extensions['activity_rollup'].add(request.endpoint, request.method, response.status_code, duration_ms)
+        app.extensions['route_db_stats'].add(request.endpoint, request.method, g.get('db_stats'))
+        if not app.extensions['activity_log_rules'].should_log(request.endpoint, request.method, response.status_code):
             return response
 
         now = datetime.now()  # current date and time
@@ -71,16 +220,50 @@ def create_app(config_name):
             "request_user_agent": request.user_agent.string
         }
         #print(user_activity)
-        from datastore.deps import session_scope
-        with session_scope() as session:
-            import crud
-            object_in = {
-                'user_id': request.args.get('userId'),
-                'user_activity': user_activity
-            }
-            crud.user_activity_crud_handler.create_user_activity(db=session, obj_in=object_in)
+        app.extensions['activity_log_writer'].record({
+            'user_id': request.args.get('userId', type=int),
+            'user_activity': user_activity,
+            'user_activity_on': datetime.now(timezone.utc),
+            'endpoint': request.endpoint,
+            'request_path': request.path,
+            'request_method': request.method,
+            'response_status': response.status_code,
+            'duration_ms': duration_ms
+        })
         return response
 
+    # The request's database work as X-DB-* response headers (development)
+    if app.config.get('DATABASE_QUERY_HEADERS'):
+        @app.after_request
+        def add_db_headers(response):
+            from flask import g
+            stats = g.get('db_stats')
+            if stats is not None:
+                response.headers['X-DB-Queries'] = str(stats.queries)
+                response.headers['X-DB-Time-Ms'] = f'{stats.query_ms:.1f}'
+                response.headers['X-DB-Checkout-Ms'] = f'{stats.checkout_ms:.1f}'
+                response.headers['X-DB-Slow-Queries'] = str(stats.slow_queries)
+                threshold = app.config.get('DATABASE_N_PLUS_ONE_THRESHOLD')
+                if threshold is not None:
+                    response.headers['X-DB-Repeated-Statements'] = str(len(stats.repeated_statements(threshold)))
+            return response
+
+    # One database session per request (datastore.deps.session_scope), shared
+    # by authenticate, the views and the services. Registered last, so it
+    # commits before the other after_request hooks run.
+    from datastore.deps import close_request_session, commit_request_session, pin_primary
+
+    @app.after_request
+    def commit_db_session(response):
+        from flask import request
+        if commit_request_session() and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            pin_primary(response, app.config['DATABASE_REPLICA_STICKY_SECONDS'])
+        return response
+
+    @app.teardown_request
+    def close_db_session(exc):
+        close_request_session()
+
     return app
 
 def load_config(mode=os.environ.get('ENV')):
@@ -0,0 +1,6 @@
+"""
+Activity API endpoints
+"""
+from app.api.activity.routes import activity_bp
+
+__all__ = ['activity_bp']
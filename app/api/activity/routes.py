@@ -0,0 +1,80 @@
+"""
+Activity API Routes - RESTful endpoints
+Following REST standards: GET /activity, GET /activity/rollups
+"""
+from flask import Blueprint, jsonify
+from flask_pydantic import validate
+from datastore.deps import read_only, session_scope
+from schemas.pydantic_models import (
+    ActivityQuery,
+    ActivityRollupQuery,
+)
+import crud
+from repositories.user_activity_repository import UserActivityRepository
+from services.activity_service import ActivityService
+
+activity_bp = Blueprint('activity', __name__, url_prefix='/activity')
+
+
+def _get_activity_service():
+    """Create and return ActivityService instance"""
+    return ActivityService(
+        user_activity_repository=UserActivityRepository(
+            crud.user_activity_crud_handler,
+            crud.user_activity_rollup_crud_handler
+        )
+    )
+
+
+@activity_bp.route('', methods=['GET'])
+@read_only
+@validate()
+def list_activity(query: ActivityQuery):
+    """
+    GET /activity
+    Recorded requests in a time range, newest first (keyset-paginated)
+
+    Only requests kept by USER_ACTIVITY_RULES sampling are recorded; use
+    /activity/rollups for request counts.
+
+    Query Parameters:
+        from, to: Time range [from, to), UTC if no offset
+        user_id, endpoint, method, status (optional): Filters
+        limit (optional): Page size, default 100
+        cursor (optional): next_cursor of the previous page
+
+    Returns:
+        200: Page of activity and next_cursor
+        400: Invalid range, filter or cursor
+    """
+    activity_service = _get_activity_service()
+
+    with session_scope() as session:
+        response = activity_service.list_activity(db=session, query=query)
+        return jsonify(response.model_dump()), 200
+
+
+@activity_bp.route('/rollups', methods=['GET'])
+@read_only
+@validate()
+def get_activity_rollups(query: ActivityRollupQuery):
+    """
+    GET /activity/rollups
+    Requests, 4xx and 5xx counts and latency percentiles per route, from
+    the hourly rollup (counts every request, not only sampled ones)
+
+    Query Parameters:
+        from, to: Hours in [from, to), UTC if no offset
+        endpoint, method (optional): Filters
+        interval (optional): 'total' (default) one row per route, or
+            'hour' one row per route and hour
+
+    Returns:
+        200: Rollup rows
+        400: Invalid range or filter
+    """
+    activity_service = _get_activity_service()
+
+    with session_scope() as session:
+        response = activity_service.get_rollups(db=session, query=query)
+        return jsonify(response.model_dump()), 200
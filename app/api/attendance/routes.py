@@ -1,75 +1,357 @@
 """
 Attendance API Routes - RESTful endpoints
-Following REST standards: POST /attendance/clock-in
-Directly calls CRUD layer (no service layer)
+Following REST standards: POST /attendance/clock-in, POST /attendance/clock-out, POST /attendance/punches,
+GET /attendance/records, GET /attendance/export, GET /attendance/summary, GET /attendance/report,
+GET /attendance/present
 """
-from datetime import datetime, timezone
-from flask import Blueprint, jsonify
-from datastore.deps import session_scope
+from datetime import time
+
+from flask import Blueprint, Response, current_app, jsonify, stream_with_context
+from flask_pydantic import validate
+from datastore.deps import read_only, session_scope
 from schemas.pydantic_models import (
+    AttendanceExportQuery,
+    AttendancePresenceQuery,
+    AttendanceRecordsQuery,
+    AttendanceReportQuery,
+    AttendanceSummaryQuery,
+    BatchPunchRequest,
     StandardResponse,
-    AttendanceResponse,
-    AttendanceData,
 )
 import crud
-from exceptions.app_exceptions import NotFoundException, ConflictException
+from repositories.attendance_repository import AttendanceRepository
+from repositories.employee_repository import EmployeeRepository
+from services.attendance_service import AttendanceService
+from services.attendance_report_service import AttendanceReportService
+from util.idempotency import idempotent
 
 attendance_bp = Blueprint('attendance', __name__, url_prefix='/attendance')
 
 
+def _get_attendance_service():
+    """Create and return AttendanceService instance"""
+    attendance_repository = AttendanceRepository(
+        crud.attendance_crud_handler,
+        crud.attendance_summary_crud_handler
+    )
+    employee_repository = EmployeeRepository(crud.employee_crud_handler)
+    return AttendanceService(
+        attendance_repository=attendance_repository,
+        employee_repository=employee_repository,
+        open_session_cache=current_app.extensions.get('attendance_open_sessions'),
+        employee_status_index=current_app.extensions.get('employee_status_index'),
+        work_day_timezone=current_app.config.get('ATTENDANCE_WORK_DAY_TIMEZONE', 'UTC'),
+        partitioned=current_app.config.get('ATTENDANCE_PARTITIONED', False),
+        open_session_lookback_days=current_app.config.get('ATTENDANCE_OPEN_SESSION_LOOKBACK_DAYS'),
+        punch_queue=current_app.extensions.get('attendance_punch_queue'),
+        presence_index=current_app.extensions.get('attendance_presence_index')
+    )
+
+
+def _get_report_service():
+    """Create and return AttendanceReportService instance"""
+    config = current_app.config
+    return AttendanceReportService(
+        attendance_repository=AttendanceRepository(
+            crud.attendance_crud_handler,
+            crud.attendance_summary_crud_handler
+        ),
+        work_day_timezone=config.get('ATTENDANCE_WORK_DAY_TIMEZONE', 'UTC'),
+        shift_start=time.fromisoformat(config.get('ATTENDANCE_SHIFT_START', '09:00')),
+        late_grace_minutes=config.get('ATTENDANCE_LATE_GRACE_MINUTES', 5),
+        daily_overtime_hours=config.get('ATTENDANCE_DAILY_OVERTIME_HOURS', 8),
+        max_session_hours=config.get('ATTENDANCE_MAX_SESSION_HOURS', 16)
+    )
+
+
 @attendance_bp.route('/employees/<employee_id>/clock_in', methods=['POST'])
+@idempotent
 def clock_in(employee_id: str):
-   
+    """
+    POST /attendance/employees/{employee_id}/clock_in
+    Clock in an employee
+
+    Verifies the employee, rejects a duplicate open session and inserts
+    the attendance record in a single statement. In write-behind mode a
+    punch of an employee known to the status index is acknowledged with
+    202 and written in the next batch. A 202 punch is still dropped if the
+    employee turns out to be clocked in already or deleted: the worker
+    that accepted it then reports it as dropped_clock_in (attendance_id,
+    clock_in, reason) in the 404/409 of the employee's clock out and in
+    the employee's records.
+
+    Headers:
+        Idempotency-Key (optional): Retries with the same key get the first
+        successful response replayed (Idempotent-Replayed: true)
+
+    Returns:
+        201: Clocked in successfully
+        202: Clock in accepted (write-behind mode)
+        400: Invalid employee ID
+        403: Employee is not active
+        404: Employee not found
+        409: Employee is already clocked in, or a request with the same
+             Idempotency-Key is still in progress
+        503: Punch queue full, retry after the Retry-After header
+    """
+    attendance_service = _get_attendance_service()
+
+    response = attendance_service.accept_clock_in(employee_id=employee_id)
+    if response is not None:
+        return jsonify(response.model_dump(exclude_none=True)), 202
+
+    with session_scope() as session:
+        response = attendance_service.clock_in(db=session, employee_id=employee_id)
+        return jsonify(response.model_dump(exclude_none=True)), 201
+
+
+@attendance_bp.route('/employees/<employee_id>/clock_out', methods=['POST'])
+@idempotent
+def clock_out(employee_id: str):
+    """
+    POST /attendance/employees/{employee_id}/clock_out
+    Clock out an employee
+
+    Closes the open attendance record with a single conditional UPDATE
+    and returns it with the worked duration.
+
+    Headers:
+        Idempotency-Key (optional): Retries with the same key get the first
+        successful response replayed (Idempotent-Replayed: true)
+
+    Returns:
+        200: Clocked out successfully
+        400: Invalid employee ID
+        404: Employee not found (with dropped_clock_in, see clock in)
+        409: Employee is not clocked in (with dropped_clock_in when a
+             write-behind clock in was dropped), or a request with the
+             same Idempotency-Key is still in progress
+    """
+    attendance_service = _get_attendance_service()
+
+    with session_scope() as session:
+        response = attendance_service.clock_out(db=session, employee_id=employee_id)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@attendance_bp.route('/punches', methods=['POST'])
+@idempotent
+@validate()
+def apply_punches(body: BatchPunchRequest):
+    """
+    POST /attendance/punches
+    Apply a batch of buffered clock in / clock out punches from one gateway
+
+    All punches are applied in a single transaction. Each punch gets its own
+    result: created, closed, conflict, not_found or inactive.
+
+    Headers:
+        Idempotency-Key (optional): Retries with the same key get the first
+        successful response replayed (Idempotent-Replayed: true)
+
+    Returns:
+        200: Per-punch results
+        400: Validation error, or Idempotency-Key reused with a different batch
+        409: A request with the same Idempotency-Key is still in progress
+    """
+    attendance_service = _get_attendance_service()
+
+    with session_scope() as session:
+        response = attendance_service.apply_punches(db=session, batch=body)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@attendance_bp.route('/employees/<employee_id>/records', methods=['GET'])
+@read_only
+@validate()
+def list_employee_records(employee_id: str, query: AttendanceRecordsQuery):
+    """
+    GET /attendance/employees/{employee_id}/records
+    Attendance history of an employee, newest first, keyset paginated
+
+    Query Parameters:
+        from, to (optional): Clock in range [from, to)
+        limit (optional): Page size, default 100
+        cursor (optional): next_cursor of the previous page
+
+    Returns:
+        200: Page of attendance records, with dropped_clock_in when a
+             write-behind clock in of the employee was dropped
+        400: Invalid employee ID, range or cursor
+    """
+    attendance_service = _get_attendance_service()
+
+    with session_scope() as session:
+        response = attendance_service.get_records(db=session, query=query, employee_id=employee_id)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@attendance_bp.route('/records', methods=['GET'])
+@read_only
+@validate()
+def list_records(query: AttendanceRecordsQuery):
+    """
+    GET /attendance/records
+    Attendance records of all employees in a date range, newest first, keyset paginated
+
+    Query Parameters:
+        from, to (optional): Clock in range [from, to)
+        limit (optional): Page size, default 100
+        cursor (optional): next_cursor of the previous page
+
+    Returns:
+        200: Page of attendance records
+        400: Invalid range or cursor
+    """
+    attendance_service = _get_attendance_service()
+
     with session_scope() as session:
+        response = attendance_service.get_records(db=session, query=query)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@attendance_bp.route('/export', methods=['GET'])
+@read_only
+@validate()
+def export_records(query: AttendanceExportQuery):
+    """
+    GET /attendance/export
+    Stream attendance records with employee code and name for payroll
 
-        # need to create service layer
-        # Check if employee exists
-        # have to write crud layer.Just for understanding calling directly in API
-        from models.employee import Employee
-        employee = session.query(Employee).filter(Employee.id == employee_id).first()
-        if not employee:
-            raise NotFoundException(message='Employee not found.')
-        
-        # we should check whether this employee already has an active attendance entry
-        # (clocked in without clock_out). If so, system should prevent duplicate clock-in.
-
-        active_attendance = crud.attendance_crud_handler.get_active_attendance_by_employee(
-            db=session,
-            employee_id=employee_id
-        )
-        
-        if active_attendance:
-            raise ConflictException(
-                message='Employee is already clocked in. Please clock out first.',
-                payload={'attendance_id': str(active_attendance.id)}
+    Rows are read with a server-side cursor and streamed as they are
+    produced, oldest first, so any range can be exported in constant memory.
+
+    Query Parameters:
+        from, to: Clock in range [from, to)
+        employee_id (optional): Only this employee
+        format (optional): csv (default) or ndjson
+
+    Returns:
+        200: text/csv or application/x-ndjson attachment
+        400: Invalid range or format
+    """
+    attendance_service = _get_attendance_service()
+    chunk_size = current_app.config.get('ATTENDANCE_EXPORT_CHUNK_SIZE', 5000)
+
+    def generate():
+        with session_scope() as session:
+            yield from attendance_service.export_records(
+                db=session, query=query, chunk_size=chunk_size
             )
-        
-        # Create new attendance record (clock in)
-        attendance_data = {
-            'employee_id': employee_id,
-            'clock_in': datetime.now(timezone.utc),
-            'clock_out': None
-        }
 
-        ## need to create service layer
-        attendance_record = crud.attendance_crud_handler.create_attendance_record(
-            db=session,
-            obj_in=attendance_data
-        )
-        
-        attendance_data_response = AttendanceData(
-            id=str(attendance_record.id),
-            employee_id=str(attendance_record.employee_id),
-            clock_in=attendance_record.clock_in,
-            clock_out=attendance_record.clock_out,
-            created_at=attendance_record.created_at,
-            updated_at=attendance_record.updated_at
-        )
-        
-        response = AttendanceResponse(
-            status='success',
-            message='Successfully clocked in.',
-            data=attendance_data_response
-        )
-        return jsonify(response.model_dump(exclude_none=True)), 201
+    mimetype = 'text/csv' if query.format == 'csv' else 'application/x-ndjson'
+    filename = 'attendance_{}_{}.{}'.format(
+        query.from_.strftime('%Y%m%dT%H%M%S'), query.to.strftime('%Y%m%dT%H%M%S'), query.format
+    )
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@attendance_bp.route('/summary', methods=['GET'])
+@read_only
+@validate()
+def get_summary(query: AttendanceSummaryQuery):
+    """
+    GET /attendance/summary
+    Per-employee, per-day worked-hours totals read from the daily rollup
+
+    Query Parameters:
+        from, to: Work date range (inclusive)
+        employee_id (optional): Only this employee
+        limit (optional): Page size, default 500
+        cursor (optional): next_cursor of the previous page
+
+    Returns:
+        200: Page of daily summaries (first in, last out, total seconds, session count)
+        400: Invalid range or cursor
+    """
+    attendance_service = _get_attendance_service()
+
+    with session_scope() as session:
+        response = attendance_service.get_daily_summary(db=session, query=query)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
 
+@attendance_bp.route('/report', methods=['GET'])
+@read_only
+@validate()
+def get_report(query: AttendanceReportQuery):
+    """
+    GET /attendance/report
+    Per-employee worked hours, overtime, late arrivals and missing punches
+
+    Sessions of the range are aggregated in vectorized form (NumPy).
+
+    Query Parameters:
+        from, to: Work date range (inclusive)
+        employee_id (optional): Only this employee
+        shift_start, late_grace_minutes, daily_overtime_hours,
+        max_session_hours (optional): Override the configured defaults
+
+    Returns:
+        200: One row per employee with sessions in the range
+        400: Invalid range or parameters
+    """
+    report_service = _get_report_service()
+
+    with session_scope() as session:
+        response = report_service.get_report(db=session, query=query)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@attendance_bp.route('/present', methods=['GET'])
+@validate()
+def get_presence(query: AttendancePresenceQuery):
+    """
+    GET /attendance/present
+    Headcount and roster of the employees currently clocked in
+
+    Served from this worker's presence index when enabled (reconciled
+    with the database every few seconds), otherwise from the open sessions.
+
+    Query Parameters:
+        group_by (optional): city or country, adds per-group counts
+        city, country (optional): Only employees of this city / country
+        limit (optional): Roster page size, default 100, 0 for counts only
+        cursor (optional): next_cursor of the previous page
+
+    Returns:
+        200: Count, groups, roster page and next_cursor
+        400: Invalid parameters or cursor
+    """
+    attendance_service = _get_attendance_service()
+
+    with session_scope() as session:
+        response = attendance_service.get_presence(db=session, query=query)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@attendance_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """
+    GET /attendance/cache/stats
+    Statistics of this worker's attendance caches: open-session cache,
+    employee status index, punch queue, presence index and idempotency
+    store (scheduled jobs, activity logging and replicas: GET /metrics)
+
+    Returns:
+        200: Cache statistics (null for a disabled cache)
+    """
+    attendance_service = _get_attendance_service()
+    idempotency_store = current_app.extensions.get('idempotency_store')
+
+    response = StandardResponse(
+        status='success',
+        message='Attendance cache statistics.',
+        data={
+            'open_sessions': attendance_service.get_open_session_cache_stats(),
+            'employee_status_index': attendance_service.get_employee_status_index_stats(),
+            'punch_queue': attendance_service.get_punch_queue_stats(),
+            'presence_index': attendance_service.get_presence_index_stats(),
+            'idempotency': idempotency_store.stats() if idempotency_store is not None else None
+        }
+    )
+    return jsonify(response.model_dump(exclude_none=True)), 200
@@ -0,0 +1,6 @@
+"""
+Employees API endpoints
+"""
+from app.api.employees.routes import employees_bp
+
+__all__ = ['employees_bp']
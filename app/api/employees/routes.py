@@ -0,0 +1,100 @@
+"""
+Employees API Routes - RESTful endpoints
+Following REST standards: GET /employees, GET /employees/by-code/{employee_code},
+POST /employees/bulk
+"""
+from flask import Blueprint, current_app, jsonify
+from flask_pydantic import validate
+from datastore.deps import session_scope
+from schemas.pydantic_models import (
+    EmployeeBulkUpsertRequest,
+    EmployeeFieldsQuery,
+    EmployeeListQuery,
+)
+import crud
+from repositories.employee_repository import EmployeeRepository
+from services.employee_service import EmployeeService
+
+employees_bp = Blueprint('employees', __name__, url_prefix='/employees')
+
+
+def _get_employee_service():
+    """Create and return EmployeeService instance"""
+    return EmployeeService(employee_repository=EmployeeRepository(crud.employee_crud_handler))
+
+
+@employees_bp.route('', methods=['GET'])
+@validate()
+def list_employees(query: EmployeeListQuery):
+    """
+    GET /employees
+    Keyset-paginated employee directory, ordered by last name
+
+    Query Parameters:
+        status, city, country (optional): Filters
+        fields (optional): Comma-separated columns to return, default
+            id,employee_code,first_name,last_name,status
+        limit (optional): Page size, default 100
+        cursor (optional): next_cursor of the previous page
+
+    Returns:
+        200: Page of employee projections and next_cursor
+        400: Invalid filter, fields or cursor
+    """
+    employee_service = _get_employee_service()
+
+    with session_scope() as session:
+        response = employee_service.list_employees(db=session, query=query)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@employees_bp.route('/by-code/<employee_code>', methods=['GET'])
+@validate()
+def get_employee_by_code(employee_code: str, query: EmployeeFieldsQuery):
+    """
+    GET /employees/by-code/{employee_code}
+    Look up an employee by the code printed on the badge
+
+    Query Parameters:
+        fields (optional): Comma-separated columns to return
+
+    Returns:
+        200: Employee projection
+        400: Invalid fields
+        404: Employee not found
+    """
+    employee_service = _get_employee_service()
+
+    with session_scope() as session:
+        response = employee_service.get_by_code(db=session, employee_code=employee_code, query=query)
+        return jsonify(response.model_dump(exclude_none=True)), 200
+
+
+@employees_bp.route('/bulk', methods=['POST'])
+@validate()
+def bulk_upsert_employees(body: EmployeeBulkUpsertRequest):
+    """
+    POST /employees/bulk
+    Insert or update up to 10000 employees by employee_code (HRIS sync)
+
+    Request Body:
+        {
+            "employees": [
+                {"employee_code": "E001", "first_name": "...", "last_name": "...",
+                 "date_of_birth": "1990-01-31", "email": "...", "city": "...",
+                 "country": "...", "status": "ACTIVE"}
+            ]
+        }
+
+    Returns:
+        200: inserted, updated and unchanged counts
+        400: Validation error or duplicate employee_code in the request
+        409: A row conflicts with another employee on a unique key (e.g. an
+            email already used), named in the message; nothing is written
+    """
+    employee_service = _get_employee_service()
+    chunk_size = current_app.config.get('EMPLOYEE_UPSERT_CHUNK_SIZE', 1000)
+
+    with session_scope() as session:
+        response = employee_service.bulk_upsert(db=session, request=body, chunk_size=chunk_size)
+        return jsonify(response.model_dump()), 200
@@ -0,0 +1,6 @@
+"""
+Metrics API endpoints
+"""
+from app.api.metrics.routes import metrics_bp
+
+__all__ = ['metrics_bp']
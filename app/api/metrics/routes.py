@@ -0,0 +1,53 @@
+"""
+Metrics API Routes - RESTful endpoints
+Following REST standards: GET /metrics
+"""
+from flask import Blueprint, current_app, jsonify
+from datastore.session import engine_metrics, replica_set
+from schemas.pydantic_models import StandardResponse
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """
+    GET /metrics
+    Database and background work statistics of this worker since it started
+
+    pools: per engine (primary, replica-N) the pool state (size, checked
+    out, idle, overflow), checkout time percentiles and timeouts, pre-ping
+    count, time and failures, connections opened and invalidated, the
+    oldest connection checked out, and query count and mean time.
+    routes: per endpoint and method the queries and database time per
+    request, busiest first.
+    read_replicas: health and lag per replica. scheduled_jobs: runs,
+    skips, errors and last result per job. activity_log: rows recorded,
+    sampled out, dropped and written by the activity writer or spool.
+    activity_rollup: pending and flushed hourly rollups. Null when disabled.
+
+    Returns:
+        200: Database metrics
+    """
+    route_db_stats = current_app.extensions.get('route_db_stats')
+    scheduler = current_app.extensions.get('scheduler')
+    activity_log_writer = current_app.extensions.get('activity_log_writer')
+    activity_log_rules = current_app.extensions.get('activity_log_rules')
+    activity_rollup = current_app.extensions.get('activity_rollup')
+    activity_log = activity_log_writer.stats() if activity_log_writer is not None else None
+    if activity_log is not None and activity_log_rules is not None:
+        activity_log['sampled_out'] = activity_log_rules.sampled_out
+
+    response = StandardResponse(
+        status='success',
+        message='Database metrics.',
+        data={
+            'pools': {name: metrics.stats() for name, metrics in engine_metrics.items()},
+            'routes': route_db_stats.stats() if route_db_stats is not None else None,
+            'read_replicas': replica_set.stats() if replica_set is not None else None,
+            'scheduled_jobs': scheduler.stats() if scheduler is not None else None,
+            'activity_log': activity_log,
+            'activity_rollup': activity_rollup.stats() if activity_rollup is not None else None
+        }
+    )
+    return jsonify(response.model_dump(exclude_none=True)), 200
@@ -4,7 +4,7 @@ Following REST standards: GET /organizations, POST /organizations, GET /organiza
 """
 from flask import Blueprint, jsonify
 from flask_pydantic import validate
-from datastore.deps import session_scope
+from datastore.deps import read_only, session_scope
 from schemas.pydantic_models import (
     AddOrganizationRequest,
     UpdateOrganizationRequest,
@@ -29,6 +29,7 @@ def _get_organization_service():
 
 
 @organizations_bp.route('', methods=['GET'])
+@read_only
 def list_organizations():
     """
     GET /organizations
@@ -64,6 +65,7 @@ def create_organization(body: AddOrganizationRequest):
 
 
 @organizations_bp.route('/<int:org_id>', methods=['GET'])
+@read_only
 def get_organization(org_id: int):
     """
     GET /organizations/{id}
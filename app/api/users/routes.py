@@ -4,7 +4,7 @@ Following REST standards: GET /users, POST /users, GET /users/{id}, PUT /users/{
 """
 from flask import Blueprint, request, jsonify
 from flask_pydantic import validate
-from datastore.deps import session_scope
+from datastore.deps import read_only, session_scope
 from schemas.pydantic_models import AddUserRequest, StandardResponse, UsersListResponse
 from app import bcrypt
 import crud
@@ -33,6 +33,7 @@ def _get_file_service():
 
 
 @users_bp.route('', methods=['GET'])
+@read_only
 def list_users():
     """
     GET /users
@@ -87,6 +88,7 @@ def create_user(form: AddUserRequest):
 
 
 @users_bp.route('/<int:user_id>', methods=['GET'])
+@read_only
 def get_user(user_id: int):
     """
     GET /users/{id}
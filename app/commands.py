@@ -0,0 +1,319 @@
+"""
+CLI commands
+Run with: flask --app manage <group> <command>
+"""
+import csv
+import json
+import sys
+from datetime import time, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+import crud
+from datastore import partitioning
+from datastore.deps import session_scope
+from repositories.attendance_repository import AttendanceRepository
+from repositories.employee_repository import EmployeeRepository
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.user_activity_repository import UserActivityRepository
+from services.attendance_service import AttendanceService
+from schemas.pydantic_models import AttendanceReportQuery, AttendanceReportRow
+from services.attendance_report_service import AttendanceReportService
+from services.attendance_import_service import REJECT_COLUMNS, AttendanceImportService
+from services.activity_log_spool import ActivityLogSpool
+from app.jobs import close_stale_sessions, maintain_activity_partitions
+from exceptions.app_exceptions import ValidationException
+
+attendance_cli = AppGroup('attendance', help='Attendance maintenance commands.')
+partitions_cli = AppGroup('partitions', help='Monthly partitions of attendance_record_t.')
+attendance_cli.add_command(partitions_cli)
+activity_cli = AppGroup('activity', help='User activity log commands.')
+activity_partitions_cli = AppGroup('partitions', help='Monthly partitions of user_activity_t.')
+activity_cli.add_command(activity_partitions_cli)
+
+DATE = click.DateTime(formats=['%Y-%m-%d'])
+
+
+def _get_attendance_service():
+    """Create and return AttendanceService instance"""
+    attendance_repository = AttendanceRepository(
+        crud.attendance_crud_handler,
+        crud.attendance_summary_crud_handler
+    )
+    employee_repository = EmployeeRepository(crud.employee_crud_handler)
+    return AttendanceService(
+        attendance_repository=attendance_repository,
+        employee_repository=employee_repository,
+        work_day_timezone=current_app.config.get('ATTENDANCE_WORK_DAY_TIMEZONE', 'UTC'),
+        partitioned=current_app.config.get('ATTENDANCE_PARTITIONED', False),
+        open_session_lookback_days=current_app.config.get('ATTENDANCE_OPEN_SESSION_LOOKBACK_DAYS')
+    )
+
+
+def _get_report_service():
+    """Create and return AttendanceReportService instance"""
+    config = current_app.config
+    return AttendanceReportService(
+        attendance_repository=AttendanceRepository(
+            crud.attendance_crud_handler,
+            crud.attendance_summary_crud_handler
+        ),
+        work_day_timezone=config.get('ATTENDANCE_WORK_DAY_TIMEZONE', 'UTC'),
+        shift_start=time.fromisoformat(config.get('ATTENDANCE_SHIFT_START', '09:00')),
+        late_grace_minutes=config.get('ATTENDANCE_LATE_GRACE_MINUTES', 5),
+        daily_overtime_hours=config.get('ATTENDANCE_DAILY_OVERTIME_HOURS', 8),
+        max_session_hours=config.get('ATTENDANCE_MAX_SESSION_HOURS', 16)
+    )
+
+
+@attendance_cli.command('rebuild-summary')
+@click.option('--from', 'start', type=DATE, required=True, help='First work date (YYYY-MM-DD).')
+@click.option('--to', 'end', type=DATE, required=True, help='Last work date, inclusive (YYYY-MM-DD).')
+@click.option('--chunk-days', default=31, show_default=True, help='Work dates rebuilt per transaction.')
+def rebuild_summary(start, end, chunk_days):
+    """Backfill / rebuild the daily worked-hours rollup from attendance records."""
+    _rebuild_summary(start.date(), end.date(), chunk_days)
+
+
+def _rebuild_summary(first, last, chunk_days):
+    """Rebuild the daily rollup for work dates [first, last], chunk_days per transaction"""
+    attendance_service = _get_attendance_service()
+    chunk_start = first
+    total = 0
+    while chunk_start <= last:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last)
+        with session_scope() as session:
+            count = attendance_service.rebuild_daily_summary(db=session, start=chunk_start, end=chunk_end)
+        total += count
+        click.echo(f'{chunk_start}..{chunk_end}: {count} daily summaries')
+        chunk_start = chunk_end + timedelta(days=1)
+    click.echo(f'Rebuilt {total} daily summaries.')
+
+
+@attendance_cli.command('report')
+@click.option('--from', 'start', type=DATE, required=True, help='First work date (YYYY-MM-DD).')
+@click.option('--to', 'end', type=DATE, required=True, help='Last work date, inclusive (YYYY-MM-DD).')
+@click.option('--format', 'output_format', type=click.Choice(['csv', 'json']), default='csv', show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Output file [default: stdout].')
+def report(start, end, output_format, output):
+    """Per-employee worked hours, overtime, late arrivals and missing punches."""
+    report_service = _get_report_service()
+    query = AttendanceReportQuery(**{'from': start.date(), 'to': end.date()})
+    with session_scope() as session:
+        response = report_service.get_report(db=session, query=query)
+
+    rows = [row.model_dump() for row in response.data['employees']]
+    stream = open(output, 'w', newline='') if output else sys.stdout
+    try:
+        if output_format == 'json':
+            json.dump(response.model_dump(mode='json')['data'], stream, indent=2)
+            stream.write('\n')
+        else:
+            writer = csv.DictWriter(stream, fieldnames=list(AttendanceReportRow.model_fields))
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if output:
+            stream.close()
+    if output:
+        click.echo(f'Wrote {len(rows)} employees to {output}.')
+
+
+@attendance_cli.command('import')
+@click.argument('files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--rejects', type=click.Path(dir_okay=False, writable=True), default='attendance_rejects.csv',
+              show_default=True, help='CSV file receiving rejected rows with the reason.')
+@click.option('--timezone', 'default_timezone', default='UTC', show_default=True,
+              help='Time zone of timestamps without an offset.')
+@click.option('--chunk-size', default=100000, show_default=True, help='Rows COPYed and merged per transaction.')
+@click.option('--rebuild-summary/--no-rebuild-summary', default=True, show_default=True,
+              help='Rebuild the daily rollup for the imported work dates.')
+def import_attendance(files, rejects, default_timezone, chunk_size, rebuild_summary):
+    """Import historical sessions from CSV files (employee_id or employee_code, clock_in, clock_out)."""
+    import_service = AttendanceImportService(
+        attendance_repository=AttendanceRepository(
+            crud.attendance_crud_handler,
+            crud.attendance_summary_crud_handler
+        ),
+        session_factory=session_scope,
+        work_day_timezone=current_app.config.get('ATTENDANCE_WORK_DAY_TIMEZONE', 'UTC'),
+        partitioned=current_app.config.get('ATTENDANCE_PARTITIONED', False),
+        chunk_size=chunk_size
+    )
+    totals = {'lines': 0, 'inserted': 0, 'skipped': 0, 'rejected': 0}
+    first_work_date = last_work_date = None
+    with open(rejects, 'w', newline='') as rejects_file:
+        csv.writer(rejects_file).writerow(REJECT_COLUMNS)
+        for path in files:
+            with open(path, newline='') as source:
+                try:
+                    for result in import_service.import_csv(source, rejects_file, default_timezone):
+                        for name in totals:
+                            totals[name] += getattr(result, name)
+                        if result.first_work_date and (first_work_date is None or result.first_work_date < first_work_date):
+                            first_work_date = result.first_work_date
+                        if result.last_work_date and (last_work_date is None or result.last_work_date > last_work_date):
+                            last_work_date = result.last_work_date
+                        click.echo(
+                            f'{path}: {totals["lines"]} lines, {totals["inserted"]} inserted, '
+                            f'{totals["skipped"]} skipped, {totals["rejected"]} rejected'
+                        )
+                except ValidationException as e:
+                    raise click.ClickException(f'{path}: {e.message}')
+    click.echo(
+        f'Imported {totals["inserted"]} sessions; {totals["skipped"]} skipped, '
+        f'{totals["rejected"]} rejected (see {rejects}).'
+    )
+    if rebuild_summary and totals['inserted']:
+        _rebuild_summary(first_work_date, last_work_date, 31)
+
+
+@attendance_cli.command('auto-close')
+@click.option('--after-hours', type=float, default=None,
+              help='Close sessions open longer than this [default: ATTENDANCE_AUTO_CLOSE_AFTER_HOURS].')
+@click.option('--batch-size', type=int, default=None,
+              help='Sessions closed per transaction [default: ATTENDANCE_AUTO_CLOSE_BATCH_SIZE].')
+def auto_close(after_hours, batch_size):
+    """Close sessions left open too long (forgotten clock outs), flagged auto_closed."""
+    config = current_app.config
+    total = close_stale_sessions(
+        _get_attendance_service(),
+        after_hours or config['ATTENDANCE_AUTO_CLOSE_AFTER_HOURS'],
+        batch_size or config['ATTENDANCE_AUTO_CLOSE_BATCH_SIZE']
+    )
+    click.echo(f'Auto-closed {total} sessions.')
+
+
+@attendance_cli.command('purge-idempotency-keys')
+@click.option('--batch-size', default=10000, show_default=True, help='Keys deleted per transaction.')
+def purge_idempotency_keys(batch_size):
+    """Delete expired keys from idempotency_key_t."""
+    repository = IdempotencyRepository(crud.idempotency_crud_handler)
+    total = 0
+    while True:
+        with session_scope() as session:
+            count = repository.purge_expired(db=session, limit=batch_size)
+        total += count
+        if count < batch_size:
+            break
+    click.echo(f'Deleted {total} expired idempotency keys.')
+
+
+@partitions_cli.command('list')
+def list_partitions():
+    """List the monthly partitions of attendance_record_t."""
+    with session_scope() as session:
+        if not partitioning.is_partitioned(session):
+            raise click.ClickException(f'{partitioning.ATTENDANCE_TABLE} is not partitioned.')
+        for month, name in partitioning.list_partitions(session):
+            click.echo(f'{month:%Y-%m}  {name}')
+
+
+@partitions_cli.command('ensure')
+@click.option('--months-ahead', type=int, default=None,
+              help='Months after the current one to create [default: ATTENDANCE_PARTITION_MONTHS_AHEAD].')
+def ensure_partitions(months_ahead):
+    """Create the partitions of the current and upcoming months."""
+    if months_ahead is None:
+        months_ahead = current_app.config['ATTENDANCE_PARTITION_MONTHS_AHEAD']
+    month = partitioning.current_month()
+    with session_scope() as session:
+        created = partitioning.ensure_partitions(session, month, partitioning.add_months(month, months_ahead))
+    for name in created:
+        click.echo(f'Created {name}')
+    click.echo(f'{len(created)} partitions created.')
+
+
+@partitions_cli.command('retention')
+@click.option('--retention-months', type=int, default=None,
+              help='Months of partitions to keep [default: ATTENDANCE_RETENTION_MONTHS].')
+@click.option('--drop', is_flag=True, help='Drop expired partitions instead of archiving them.')
+def apply_retention(retention_months, drop):
+    """Detach partitions past the retention and archive (or drop) them."""
+    if retention_months is None:
+        retention_months = current_app.config['ATTENDANCE_RETENTION_MONTHS']
+    archive_schema = None if drop else current_app.config.get('ATTENDANCE_ARCHIVE_SCHEMA')
+    before = partitioning.add_months(partitioning.current_month(), -retention_months)
+    with session_scope() as session:
+        detached = partitioning.detach_expired_partitions(session, before, archive_schema)
+    target = f'moved to {archive_schema}' if archive_schema else 'dropped'
+    for name in detached:
+        click.echo(f'Detached {name} ({target})')
+    click.echo(f'{len(detached)} partitions before {before:%Y-%m} detached.')
+
+
+@partitions_cli.command('convert')
+@click.confirmation_option(prompt='This locks attendance_record_t while all rows are copied. Continue?')
+def convert_table():
+    """Rebuild attendance_record_t as a monthly partitioned table."""
+    with session_scope() as session:
+        try:
+            copied = partitioning.convert_attendance_table(
+                session, current_app.config['ATTENDANCE_PARTITION_MONTHS_AHEAD']
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    click.echo(f'Copied {copied} attendance records. The original table is kept as '
+               f'{partitioning.ATTENDANCE_TABLE}{partitioning.LEGACY_SUFFIX}; '
+               f'set ATTENDANCE_PARTITIONED = True before restarting the workers.')
+
+
+@activity_cli.command('replay-spool')
+@click.option('--dir', 'spool_dir', type=click.Path(file_okay=False),
+              help='Spool root [default: USER_ACTIVITY_SPOOL_DIR].')
+def replay_activity_spool(spool_dir):
+    """Load left-over activity spools of stopped workers into user_activity_t.
+
+    Spools of running workers are locked and skipped.
+    """
+    spool_dir = spool_dir or current_app.config.get('USER_ACTIVITY_SPOOL_DIR')
+    if not spool_dir:
+        raise click.UsageError('Pass --dir or set USER_ACTIVITY_SPOOL_DIR.')
+    spool = ActivityLogSpool(
+        repository=UserActivityRepository(
+            crud.user_activity_crud_handler,
+            crud.user_activity_rollup_crud_handler
+        ),
+        session_factory=session_scope,
+        spool_dir=spool_dir
+    )
+    click.echo(f'Loaded {spool.replay_orphans()} activity rows.')
+
+
+@activity_partitions_cli.command('maintain')
+def maintain_activity_table_partitions():
+    """Create upcoming partitions and detach those past USER_ACTIVITY_RETENTION_MONTHS."""
+    config = current_app.config
+    with session_scope() as session:
+        if not partitioning.is_partitioned(session, partitioning.ACTIVITY_TABLE):
+            raise click.ClickException(f'{partitioning.ACTIVITY_TABLE} is not partitioned.')
+    changed = maintain_activity_partitions(
+        config['USER_ACTIVITY_PARTITION_MONTHS_AHEAD'],
+        config['USER_ACTIVITY_RETENTION_MONTHS'],
+        config.get('USER_ACTIVITY_ARCHIVE_SCHEMA')
+    )
+    click.echo(f'{changed} partitions created or detached.')
+
+
+@activity_partitions_cli.command('convert')
+@click.confirmation_option(prompt='This locks user_activity_t while all rows are copied. Continue?')
+def convert_activity_table():
+    """Rebuild user_activity_t as a monthly partitioned table."""
+    with session_scope() as session:
+        try:
+            copied = partitioning.convert_activity_table(
+                session, current_app.config['USER_ACTIVITY_PARTITION_MONTHS_AHEAD']
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    click.echo(f'Copied {copied} activity rows. The original table is kept as '
+               f'{partitioning.ACTIVITY_TABLE}{partitioning.LEGACY_SUFFIX}; '
+               f'set USER_ACTIVITY_PARTITIONED = True before restarting the workers.')
+
+def register_commands(app):
+    """Register all CLI command groups with Flask app"""
+    app.cli.add_command(attendance_cli)
+    app.cli.add_command(activity_cli)
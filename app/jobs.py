@@ -0,0 +1,117 @@
+"""
+Scheduled jobs
+Run by each worker's Scheduler (services/scheduler.py), one worker at a time
+"""
+import logging
+
+import crud
+from datastore import partitioning
+from datastore.deps import session_scope
+from repositories.attendance_repository import AttendanceRepository
+from repositories.employee_repository import EmployeeRepository
+from services.attendance_service import AttendanceService
+
+logger = logging.getLogger(__name__)
+
+
+def _get_attendance_service(app):
+    """AttendanceService wired to this worker's caches"""
+    return AttendanceService(
+        attendance_repository=AttendanceRepository(
+            crud.attendance_crud_handler,
+            crud.attendance_summary_crud_handler
+        ),
+        employee_repository=EmployeeRepository(crud.employee_crud_handler),
+        open_session_cache=app.extensions.get('attendance_open_sessions'),
+        presence_index=app.extensions.get('attendance_presence_index'),
+        work_day_timezone=app.config.get('ATTENDANCE_WORK_DAY_TIMEZONE', 'UTC'),
+        partitioned=app.config.get('ATTENDANCE_PARTITIONED', False),
+        open_session_lookback_days=app.config.get('ATTENDANCE_OPEN_SESSION_LOOKBACK_DAYS')
+    )
+
+
+def close_stale_sessions(attendance_service: AttendanceService, max_session_hours: float, batch_size: int) -> int:
+    """Auto-close every session open longer than max_session_hours, one transaction per batch"""
+    total = 0
+    while True:
+        with session_scope() as session:
+            count = attendance_service.auto_close_stale_sessions(
+                db=session,
+                max_session_hours=max_session_hours,
+                limit=batch_size
+            )
+        total += count
+        if count < batch_size:
+            break
+    if total:
+        logger.info(f"Auto-closed {total} stale attendance sessions")
+    return total
+
+
+def maintain_attendance_partitions(months_ahead: int, retention_months: int, archive_schema=None) -> int:
+    """Keep attendance_record_t partitions ahead and detach expired ones, returns the number changed"""
+    with session_scope() as session:
+        created, detached = partitioning.maintain_partitions(
+            session,
+            months_ahead,
+            retention_months,
+            archive_schema,
+            table=partitioning.ATTENDANCE_TABLE
+        )
+    for name in created:
+        logger.info(f"Created attendance partition {name}")
+    for name in detached:
+        logger.info(f"Detached expired attendance partition {name}")
+    return len(created) + len(detached)
+
+
+def maintain_activity_partitions(months_ahead: int, retention_months: int, archive_schema=None) -> int:
+    """Keep user_activity_t partitions ahead and detach expired ones, returns the number changed"""
+    with session_scope() as session:
+        created, detached = partitioning.maintain_partitions(
+            session,
+            months_ahead,
+            retention_months,
+            archive_schema,
+            table=partitioning.ACTIVITY_TABLE
+        )
+    for name in created:
+        logger.info(f"Created activity partition {name}")
+    for name in detached:
+        logger.info(f"Detached expired activity partition {name}")
+    return len(created) + len(detached)
+
+
+def register_jobs(app, scheduler):
+    """Add the jobs enabled in the config to the scheduler"""
+    config = app.config
+    if config.get('ATTENDANCE_AUTO_CLOSE_ENABLED'):
+        scheduler.add_job(
+            'attendance-auto-close',
+            config['ATTENDANCE_AUTO_CLOSE_INTERVAL_SECONDS'],
+            lambda: close_stale_sessions(
+                _get_attendance_service(app),
+                config['ATTENDANCE_AUTO_CLOSE_AFTER_HOURS'],
+                config['ATTENDANCE_AUTO_CLOSE_BATCH_SIZE']
+            )
+        )
+    if config.get('ATTENDANCE_PARTITIONED'):
+        scheduler.add_job(
+            'attendance-partitions',
+            config['ATTENDANCE_PARTITION_INTERVAL_SECONDS'],
+            lambda: maintain_attendance_partitions(
+                config['ATTENDANCE_PARTITION_MONTHS_AHEAD'],
+                config['ATTENDANCE_RETENTION_MONTHS'],
+                config.get('ATTENDANCE_ARCHIVE_SCHEMA')
+            )
+        )
+    if config.get('USER_ACTIVITY_PARTITIONED'):
+        scheduler.add_job(
+            'activity-partitions',
+            config['USER_ACTIVITY_PARTITION_INTERVAL_SECONDS'],
+            lambda: maintain_activity_partitions(
+                config['USER_ACTIVITY_PARTITION_MONTHS_AHEAD'],
+                config['USER_ACTIVITY_RETENTION_MONTHS'],
+                config.get('USER_ACTIVITY_ARCHIVE_SCHEMA')
+            )
+        )
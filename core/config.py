@@ -21,6 +21,151 @@ class BaseConfig:
     AWS_SECRET_KEY = 'dummyK'
     AWS_REGION_NAME = '=ap-northeast-1'
 
+    # Read replicas serving the read-only routes, round-robin. Each worker
+    # checks them every CHECK_SECONDS and ejects those unreachable or more
+    # than MAX_LAG_SECONDS behind (None: lag not checked); with none healthy
+    # reads go to DATABASE_URL. A client that wrote reads from the primary
+    # for STICKY_SECONDS (cookie), so it sees its own writes.
+    DATABASE_REPLICA_URLS = []
+    DATABASE_REPLICA_CHECK_SECONDS = 5
+    DATABASE_REPLICA_MAX_LAG_SECONDS = 10
+    DATABASE_REPLICA_STICKY_SECONDS = 5
+
+    # Query instrumentation (GET /metrics). Statements taking SLOW_QUERY_MS or
+    # longer are logged with their parameter types. A request running one
+    # statement N_PLUS_ONE_THRESHOLD times or more is logged as a probable
+    # N+1. QUERY_HEADERS adds the request's query count and database time as
+    # X-DB-* response headers (development). None disables a check.
+    DATABASE_SLOW_QUERY_MS = None
+    DATABASE_N_PLUS_ONE_THRESHOLD = None
+    DATABASE_QUERY_HEADERS = False
+
+    # Time zone whose calendar day a session's clock_in counts towards
+    ATTENDANCE_WORK_DAY_TIMEZONE = 'UTC'
+
+    # Defaults of the attendance report (GET /attendance/report)
+    ATTENDANCE_SHIFT_START = '09:00'
+    ATTENDANCE_LATE_GRACE_MINUTES = 5
+    ATTENDANCE_DAILY_OVERTIME_HOURS = 8
+    ATTENDANCE_MAX_SESSION_HOURS = 16
+
+    # attendance_record_t partitioned by clock_in month (see datastore/partitioning.py).
+    # While enabled, a scheduled job keeps MONTHS_AHEAD partitions ahead every
+    # PARTITION_INTERVAL_SECONDS and applies the retention below.
+    ATTENDANCE_PARTITIONED = False
+    ATTENDANCE_PARTITION_MONTHS_AHEAD = 3
+    ATTENDANCE_PARTITION_INTERVAL_SECONDS = 21600
+    # Partitions older than this many months are detached and moved to the
+    # archive schema (dropped when the schema is None)
+    ATTENDANCE_RETENTION_MONTHS = 36
+    ATTENDANCE_ARCHIVE_SCHEMA = 'attendance_archive'
+    # Open sessions are only looked up this far back by clock_in, so open
+    # session queries prune to recent partitions (None: no bound)
+    ATTENDANCE_OPEN_SESSION_LOOKBACK_DAYS = None
+
+    # Rows fetched per server-side cursor round trip by the attendance export
+    ATTENDANCE_EXPORT_CHUNK_SIZE = 5000
+
+    # Per-worker cache of employee_id -> open attendance id. A hit sends a
+    # write-behind clock in through the synchronous insert, which decides
+    ATTENDANCE_OPEN_SESSION_CACHE_ENABLED = False
+    ATTENDANCE_OPEN_SESSION_CACHE_SIZE = 50000
+    ATTENDANCE_OPEN_SESSION_CACHE_TTL_SECONDS = 60
+
+    # Per-worker employee id -> status index for the attendance hot path
+    EMPLOYEE_STATUS_INDEX_ENABLED = False
+    EMPLOYEE_STATUS_INDEX_REFRESH_SECONDS = 30
+    EMPLOYEE_STATUS_INDEX_FULL_RELOAD_SECONDS = 3600
+
+    # Employees per INSERT ... ON CONFLICT statement of POST /employees/bulk
+    EMPLOYEE_UPSERT_CHUNK_SIZE = 1000
+
+    # Write-behind clock ins: acknowledged with 202 once validated against the
+    # employee status index and spooled, written in batches by a per-worker
+    # flusher. Needs EMPLOYEE_STATUS_INDEX_ENABLED (unknown employees fall
+    # back to the synchronous clock in).
+    ATTENDANCE_WRITE_BEHIND_ENABLED = False
+    ATTENDANCE_WRITE_BEHIND_SPOOL_DIR = '/var/spool/attendance-service/punches'
+    ATTENDANCE_WRITE_BEHIND_QUEUE_SIZE = 10000
+    ATTENDANCE_WRITE_BEHIND_BATCH_SIZE = 500
+    ATTENDANCE_WRITE_BEHIND_FLUSH_INTERVAL_MS = 200
+    ATTENDANCE_WRITE_BEHIND_ENQUEUE_TIMEOUT_MS = 50
+    ATTENDANCE_WRITE_BEHIND_FSYNC = True
+    # A 202 clock in is dropped when the employee turns out to be clocked in
+    # already or deleted; the worker that accepted it reports the drop on the
+    # employee's clock out and records for this long
+    ATTENDANCE_WRITE_BEHIND_DROPPED_TTL_SECONDS = 86400
+
+    # Per-worker set of employees currently clocked in (GET /attendance/present),
+    # reloaded from the open sessions every reconcile interval
+    ATTENDANCE_PRESENCE_INDEX_ENABLED = False
+    ATTENDANCE_PRESENCE_RECONCILE_SECONDS = 5
+
+    # Responses of attendance writes sent with an Idempotency-Key header are
+    # replayed to retries for IDEMPOTENCY_TTL_SECONDS. Kept per worker (LRU);
+    # IDEMPOTENCY_PERSISTED also stores them in idempotency_key_t so every
+    # worker sees them (purge with flask attendance purge-idempotency-keys).
+    IDEMPOTENCY_KEYS_ENABLED = True
+    IDEMPOTENCY_CACHE_SIZE = 20000
+    IDEMPOTENCY_TTL_SECONDS = 86400
+    IDEMPOTENCY_PERSISTED = False
+    # A claimed key whose request never finished is released after this long
+    IDEMPOTENCY_LOCK_SECONDS = 60
+
+    # Scheduled job closing sessions left open longer than AFTER_HOURS (forgotten
+    # clock outs) at clock_in + AFTER_HOURS, flagged auto_closed. Runs on one
+    # worker at a time every INTERVAL_SECONDS, BATCH_SIZE sessions per transaction.
+    ATTENDANCE_AUTO_CLOSE_ENABLED = False
+    ATTENDANCE_AUTO_CLOSE_AFTER_HOURS = 24
+    ATTENDANCE_AUTO_CLOSE_INTERVAL_SECONDS = 300
+    ATTENDANCE_AUTO_CLOSE_BATCH_SIZE = 1000
+
+    # Request activity (user_activity_t) is buffered per worker and written by a
+    # background thread, BATCH_SIZE rows per INSERT or every FLUSH_INTERVAL_MS;
+    # rows are dropped (and counted) while the buffer holds QUEUE_SIZE rows
+    USER_ACTIVITY_QUEUE_SIZE = 10000
+    USER_ACTIVITY_BATCH_SIZE = 500
+    USER_ACTIVITY_FLUSH_INTERVAL_MS = 1000
+    # With a spool directory, activity is appended to a local per-worker spool
+    # instead (segments sealed at SEGMENT_BYTES) and loaded into user_activity_t
+    # with COPY every FLUSH_INTERVAL_MS; rows are dropped past MAX_BYTES spooled.
+    # Left-over spools are loaded on the next start or by flask activity replay-spool.
+    USER_ACTIVITY_SPOOL_DIR = None
+    USER_ACTIVITY_SPOOL_SEGMENT_BYTES = 4 * 1024 * 1024
+    USER_ACTIVITY_SPOOL_MAX_BYTES = 512 * 1024 * 1024
+    USER_ACTIVITY_SPOOL_FSYNC = False
+
+    # Per-route hourly counts and latency histograms of every request
+    # (user_activity_hourly_t, GET /activity/rollups), added by each worker
+    # every ROLLUP_FLUSH_SECONDS
+    USER_ACTIVITY_ROLLUP_FLUSH_SECONDS = 10
+
+    # user_activity_t partitioned by user_activity_on month (convert with
+    # flask activity partitions convert). While enabled, a scheduled job keeps
+    # MONTHS_AHEAD partitions ahead and detaches partitions older than
+    # RETENTION_MONTHS, moving them to the archive schema (dropped when None).
+    USER_ACTIVITY_PARTITIONED = False
+    USER_ACTIVITY_PARTITION_MONTHS_AHEAD = 2
+    USER_ACTIVITY_RETENTION_MONTHS = 6
+    USER_ACTIVITY_ARCHIVE_SCHEMA = None
+    USER_ACTIVITY_PARTITION_INTERVAL_SECONDS = 21600
+
+    # Which requests are recorded in user_activity_t. The first rule applying to
+    # a request decides: endpoint is a glob over Flask endpoint names, methods
+    # (optional) limits the rule, errors_only rules apply to status >= 400 only,
+    # and sample_rate is the fraction logged. Unmatched requests are logged at
+    # USER_ACTIVITY_DEFAULT_SAMPLE_RATE.
+    USER_ACTIVITY_RULES = [
+        {'endpoint': '*', 'methods': ['OPTIONS'], 'sample_rate': 0},
+        {'endpoint': 'static', 'sample_rate': 0},
+        {'endpoint': 'auth.*', 'sample_rate': 1.0},
+        {'endpoint': '*', 'errors_only': True, 'sample_rate': 1.0},
+        {'endpoint': 'attendance.get_cache_stats', 'sample_rate': 0},
+        {'endpoint': 'metrics.*', 'sample_rate': 0},
+        {'endpoint': '*', 'methods': ['GET'], 'sample_rate': 0.01},
+    ]
+    USER_ACTIVITY_DEFAULT_SAMPLE_RATE = 1.0
+
 
 yaml = YAML(typ="safe", pure=True)
 
@@ -22,6 +22,10 @@ class DevelopmentConfig(BaseConfig):
     LOG_DIR = env.str("LOG_DIR", "/opt/logs/nemo/")
     db_pass = 'hackathon'
     DATABASE_URL = 'postgresql+psycopg2://postgres:' + db_pass + '@evokehackathondb.cuage4x4zyme.us-east-1.rds.amazonaws.com/evokehackathondb'
+    # Query count and database time as X-DB-* response headers, slow and N+1 query logging
+    DATABASE_QUERY_HEADERS = True
+    DATABASE_SLOW_QUERY_MS = 200
+    DATABASE_N_PLUS_ONE_THRESHOLD = 10
 
     def config_logger(self, dir_path):
         import logging.config
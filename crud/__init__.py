@@ -3,8 +3,12 @@ from .cities_crud_handler import cities_crud_handler
 from .countries_crud_handler import countries_crud_handler
 from .states_crud_handler import states_crud_handler
 from .attendance_crud_handler import attendance_crud_handler
+from .attendance_summary_crud_handler import attendance_summary_crud_handler
+from .idempotency_crud_handler import idempotency_crud_handler
+from .employee_crud_handler import employee_crud_handler
 from .profile_pic_crud_handler import profile_pic_crud_handler
 from .organization_crud_handler import organizations_crud_handler
 from .user_activity_crud_handler import user_activity_crud_handler
 
 
+from .user_activity_rollup_crud_handler import user_activity_rollup_crud_handler
@@ -1,12 +1,60 @@
 """
 Attendance CRUD Handler
 """
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from contextlib import contextmanager
+from typing import IO, List, Dict, Any, Iterator, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
+from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import (
+    BigInteger, Integer, Text, and_, case, cast, desc, exists, select, update, literal, null, true, tuple_, values, column, extract,
+    func, Date, DateTime, Float, Interval, Time, table, text
+)
+from sqlalchemy.dialects.postgresql import insert, UUID as PG_UUID
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from crud.base import CRUDBase
+from crud.attendance_summary_crud_handler import attendance_summary_crud_handler
 from models.attendance import AttendanceRecord
+from models.employee import Employee, EmployeeStatusEnum
+from exceptions.app_exceptions import NotFoundException
+
+# Advisory lock class serialising clock ins per employee when the open
+# session cannot be guarded by a unique index (partitioned table)
+OPEN_SESSION_LOCK_CLASS = 0x41545444
+
+# SQLSTATE of a foreign key violation (employee deleted since it was checked)
+FOREIGN_KEY_VIOLATION = '23503'
+
+# What insert_accepted_clock_ins did with each punch: written now, written by
+# an earlier attempt (replay), or dropped
+ACCEPTED_CLOCK_IN_OUTCOMES = ('inserted', 'stored', 'unknown_employee', 'already_clocked_in')
+
+
+# Temporary table historical imports are COPYed into before the merge
+IMPORT_STAGING = table(
+    'attendance_import_staging',
+    column('line', BigInteger),
+    column('employee_key', Text),
+    column('clock_in', DateTime(timezone=True)),
+    column('clock_out', DateTime(timezone=True))
+)
+
+
+def _open_session_lock_key(employee_id: UUID) -> int:
+    """Second advisory lock key (int4) of an employee's open session lock"""
+    return int.from_bytes(employee_id.bytes[:4], 'big', signed=True)
+
+
+@contextmanager
+def _employee_must_exist():
+    """Raise NotFoundException when an insert references an employee that no longer exists"""
+    try:
+        yield
+    except IntegrityError as e:
+        if getattr(e.orig, 'pgcode', None) != FOREIGN_KEY_VIOLATION:
+            raise
+        raise NotFoundException(message='Employee not found.') from e
 
 
 class AttendanceCrudHandler(CRUDBase[AttendanceRecord, None, None]):
@@ -19,21 +67,622 @@ class AttendanceCrudHandler(CRUDBase[AttendanceRecord, None, None]):
         return super().create(db, obj_in)
 
     def get_active_attendance_by_employee(
-        self, db: Session, employee_id: str
+        self, db: Session, employee_id: str, open_since: Optional[datetime] = None
     ) -> Optional[AttendanceRecord]:
         """Get active attendance record (clocked in but not clocked out) for an employee"""
+        query = db.query(self.model).filter(
+            and_(
+                AttendanceRecord.employee_id == employee_id,
+                AttendanceRecord.clock_out.is_(None)
+            )
+        )
+        if open_since is not None:
+            query = query.filter(AttendanceRecord.clock_in >= open_since)
+        return query.order_by(desc(AttendanceRecord.clock_in)).first()
+
+    def lock_open_sessions(self, db: Session, employee_ids: Sequence[UUID]) -> None:
+        """
+        Take the transaction-scoped open session lock of each employee.
+
+        Used instead of the uq_attendance_open_session ON CONFLICT guard
+        when attendance_record_t is partitioned. Must run as its own
+        statement before the insert so the insert's NOT EXISTS check sees
+        sessions committed by the previous lock holder. Keys are locked
+        in ascending order so concurrent batches cannot deadlock.
+        """
+        keys = sorted({_open_session_lock_key(employee_id) for employee_id in employee_ids})
+        if not keys:
+            return
+        key = values(column('key', Integer), name='lock_key').data([(k,) for k in keys])
+        db.execute(
+            select(func.pg_advisory_xact_lock(OPEN_SESSION_LOCK_CLASS, key.c.key))
+            .order_by(key.c.key)
+        ).all()
+
+    def clock_in(
+        self,
+        db: Session,
+        employee_id: UUID,
+        clock_in: datetime,
+        allowed_statuses: Sequence[EmployeeStatusEnum] = (EmployeeStatusEnum.ACTIVE,),
+        verify_employee: bool = True,
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> Optional[Row]:
+        """
+        Open an attendance session in a single round trip.
+
+        Verifies the employee and its status, skips the insert when an open
+        session already exists (ON CONFLICT on uq_attendance_open_session)
+        and returns the new row via RETURNING. Callers that already know the
+        employee is active (employee status index) pass verify_employee=False
+        to drop the employee lookup; the foreign key still guards existence
+        and a violation (employee deleted since) raises NotFoundException.
+
+        On a partitioned table (no unique open session index) pass
+        lock_employee=True: the employee's open session lock is taken first
+        and the insert is guarded by NOT EXISTS instead of ON CONFLICT.
+        open_since bounds the open session lookup by clock_in so the query
+        prunes to recent partitions.
+
+        Returns:
+            None if the employee does not exist, otherwise a row with the
+            inserted record columns (id is NULL when nothing was inserted),
+            the employee status (NULL when not verified) and
+            open_attendance_id set to the already open session, if any.
+        """
+        record = AttendanceRecord.__table__
+        if verify_employee:
+            employee = (
+                select(Employee.id, Employee.status)
+                .where(Employee.id == employee_id)
+                .cte('employee')
+            )
+            source = (
+                select(employee.c.id, literal(clock_in, DateTime(timezone=True)))
+                .where(employee.c.status.in_(allowed_statuses))
+            )
+        else:
+            employee = select(
+                literal(employee_id, PG_UUID(as_uuid=True)).label('id'),
+                null().label('status')
+            ).cte('employee')
+            source = select(employee.c.id, literal(clock_in, DateTime(timezone=True)))
+        inserted = insert(record)
+        if lock_employee:
+            self.lock_open_sessions(db, [employee_id])
+            source = source.where(~exists().where(_open_session_of(record, employee.c.id, open_since)))
+            inserted = inserted.from_select(['employee_id', 'clock_in'], source)
+        else:
+            inserted = inserted.from_select(['employee_id', 'clock_in'], source).on_conflict_do_nothing(
+                index_elements=[record.c.employee_id],
+                index_where=record.c.clock_out.is_(None)
+            )
+        inserted = inserted.returning(*record.c).cte('inserted')
+        open_record = record.alias('open_record')
+        stmt = (
+            select(
+                inserted.c.id,
+                employee.c.id.label('employee_id'),
+                employee.c.status,
+                inserted.c.clock_in,
+                inserted.c.clock_out,
+                inserted.c.created_at,
+                inserted.c.updated_at,
+                open_record.c.id.label('open_attendance_id')
+            )
+            .select_from(employee)
+            .outerjoin(inserted, true())
+            .outerjoin(open_record, _open_session_of(open_record, employee.c.id, open_since))
+        )
+        with _employee_must_exist():
+            return db.execute(stmt).first()
+
+    def clock_out(
+        self,
+        db: Session,
+        employee_id: UUID,
+        clock_out: datetime,
+        work_day_timezone: str = 'UTC',
+        open_since: Optional[datetime] = None
+    ) -> Optional[Row]:
+        """
+        Close the open attendance session in a single round trip.
+
+        One conditional UPDATE (clock_out IS NULL) closes the session and
+        returns the closed row with its duration in seconds; the daily
+        summary rollup is updated by a CTE of the same statement. The
+        rollup is referenced from the select list (summary_rows) rather
+        than attached with add_cte(), which SQLAlchemy 1.4 drops when the
+        outer select also reads the employee CTE. open_since bounds the
+        open session lookup by clock_in (partition pruning).
+
+        Returns:
+            None if the employee does not exist, otherwise a row with the
+            closed record columns and duration_seconds (id is NULL when the
+            employee had no open session).
+        """
+        record = AttendanceRecord.__table__
+        employee = (
+            select(Employee.id)
+            .where(Employee.id == employee_id)
+            .cte('employee')
+        )
+        closed = (
+            update(record)
+            .where(_open_session_of(record, employee.c.id, open_since))
+            .values(clock_out=clock_out)
+            .returning(
+                *record.c,
+                extract('epoch', record.c.clock_out - record.c.clock_in).label('duration_seconds')
+            )
+            .cte('closed')
+        )
+        rollup = attendance_summary_crud_handler.rollup_closed_cte(closed, work_day_timezone)
+        stmt = (
+            select(
+                closed.c.id,
+                employee.c.id.label('employee_id'),
+                closed.c.clock_in,
+                closed.c.clock_out,
+                closed.c.created_at,
+                closed.c.updated_at,
+                closed.c.duration_seconds,
+                select(func.count()).select_from(rollup).scalar_subquery().label('summary_rows')
+            )
+            .select_from(employee)
+            .outerjoin(closed, true())
+        )
+        return db.execute(stmt).first()
+
+    def bulk_clock_in(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, datetime]],
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> List[Row]:
+        """
+        Open sessions for many employees with one multi-row INSERT.
+
+        Each employee may appear at most once. Employees that already have
+        an open session are skipped, so only the created rows are returned.
+        With lock_employee=True (partitioned table) the employees' open
+        session locks are taken first and the insert is guarded by NOT
+        EXISTS bounded by open_since instead of ON CONFLICT. Raises
+        NotFoundException when an employee no longer exists.
+        """
+        if not punches:
+            return []
+        record = AttendanceRecord.__table__
+        if lock_employee:
+            self.lock_open_sessions(db, [employee_id for employee_id, _ in punches])
+            punch = _punch_values(punches, 'clock_in')
+            source = (
+                select(punch.c.employee_id, punch.c.clock_in)
+                .where(~exists().where(_open_session_of(record, punch.c.employee_id, open_since)))
+            )
+            stmt = (
+                insert(record)
+                .from_select(['employee_id', 'clock_in'], source)
+                .returning(*record.c)
+            )
+            with _employee_must_exist():
+                return db.execute(stmt).all()
+        stmt = (
+            insert(record)
+            .values([
+                {'employee_id': employee_id, 'clock_in': clock_in}
+                for employee_id, clock_in in punches
+            ])
+            .on_conflict_do_nothing(
+                index_elements=[record.c.employee_id],
+                index_where=record.c.clock_out.is_(None)
+            )
+            .returning(*record.c)
+        )
+        with _employee_must_exist():
+            return db.execute(stmt).all()
+
+    def insert_accepted_clock_ins(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, UUID, datetime]],
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> List[Row]:
+        """
+        Insert (id, employee_id, clock_in) clock ins acknowledged before being written.
+
+        The ids were handed out when the punches were accepted. Idempotent,
+        so a spool can be replayed: punches whose id is already stored,
+        whose employee has another open session or no longer exists are
+        skipped. Each employee may appear at most once. Raises
+        NotFoundException when an employee is deleted concurrently; a retry
+        skips it.
+
+        Returns:
+            (id, employee_id, outcome) of every punch, outcome being one of
+            ACCEPTED_CLOCK_IN_OUTCOMES
+        """
+        if not punches:
+            return []
+        record = AttendanceRecord.__table__
+        employee = Employee.__table__
+        punch = values(
+            column('id', PG_UUID(as_uuid=True)),
+            column('employee_id', PG_UUID(as_uuid=True)),
+            column('clock_in', DateTime(timezone=True)),
+            name='punch'
+        ).data(list(punches))
+        source = (
+            select(punch.c.id, punch.c.employee_id, punch.c.clock_in)
+            .join_from(punch, employee, employee.c.id == punch.c.employee_id)
+        )
+        if lock_employee:
+            self.lock_open_sessions(db, [employee_id for _, employee_id, _ in punches])
+            source = source.where(~exists().where(_open_session_of(record, punch.c.employee_id, open_since)))
+        inserted = (
+            insert(record)
+            .from_select(['id', 'employee_id', 'clock_in'], source)
+            .on_conflict_do_nothing()
+            .returning(record.c.id)
+            .cte('inserted')
+        )
+        # The outer select sees the table as it was before the insert, so a
+        # stored row with the punch's id was written by an earlier attempt
+        stored = record.alias('stored')
+        known = employee.alias('known')
+        stmt = (
+            select(
+                punch.c.id,
+                punch.c.employee_id,
+                case(
+                    (inserted.c.id.isnot(None), 'inserted'),
+                    (stored.c.id.isnot(None), 'stored'),
+                    (known.c.id.is_(None), 'unknown_employee'),
+                    else_='already_clocked_in'
+                ).label('outcome')
+            )
+            .select_from(punch)
+            .outerjoin(inserted, inserted.c.id == punch.c.id)
+            .outerjoin(stored, and_(stored.c.id == punch.c.id, stored.c.clock_in == punch.c.clock_in))
+            .outerjoin(known, known.c.id == punch.c.employee_id)
+        )
+        with _employee_must_exist():
+            return db.execute(stmt).all()
+
+    def bulk_clock_out(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, datetime]],
+        work_day_timezone: str = 'UTC',
+        open_since: Optional[datetime] = None
+    ) -> List[Row]:
+        """
+        Close the open sessions of many employees with one UPDATE ... FROM (VALUES ...).
+
+        Each employee may appear at most once. Only sessions that are open
+        and started no later than the clock out time are closed and returned;
+        the daily summary rollup is updated by a CTE of the same statement.
+        open_since bounds the open session lookup by clock_in.
+        """
+        if not punches:
+            return []
+        record = AttendanceRecord.__table__
+        punch = _punch_values(punches, 'clock_out')
+        closed = (
+            update(record)
+            .where(
+                and_(
+                    _open_session_of(record, punch.c.employee_id, open_since),
+                    record.c.clock_in <= punch.c.clock_out
+                )
+            )
+            .values(clock_out=punch.c.clock_out)
+            .returning(*record.c)
+            .cte('closed')
+        )
+        stmt = (
+            select(closed)
+            .add_cte(attendance_summary_crud_handler.rollup_closed_cte(closed, work_day_timezone))
+        )
+        return db.execute(stmt).all()
+
+    def auto_close_stale(
+        self,
+        db: Session,
+        opened_before: datetime,
+        max_session: timedelta,
+        limit: int = 1000
+    ) -> List[Row]:
+        """
+        Close up to limit sessions still open since before opened_before.
+
+        One set-based UPDATE: the oldest stale sessions are picked with
+        FOR UPDATE SKIP LOCKED (so concurrent runs and clock outs never
+        wait on each other), closed at clock_in + max_session and flagged
+        auto_closed. They are not folded into the daily summary rollup.
+
+        Returns:
+            (id, employee_id, clock_in, clock_out) of the closed sessions
+        """
+        record = AttendanceRecord.__table__
+        stale = (
+            select(record.c.id, record.c.clock_in)
+            .where(
+                and_(
+                    record.c.clock_out.is_(None),
+                    record.c.clock_in < opened_before
+                )
+            )
+            .order_by(record.c.clock_in)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte('stale')
+        )
+        closed = (
+            update(record)
+            .where(
+                and_(
+                    record.c.id == stale.c.id,
+                    record.c.clock_in == stale.c.clock_in,
+                    record.c.clock_out.is_(None)
+                )
+            )
+            .values(
+                clock_out=record.c.clock_in + literal(max_session, Interval),
+                auto_closed=True
+            )
+            .returning(record.c.id, record.c.employee_id, record.c.clock_in, record.c.clock_out)
+            .cte('closed')
+        )
+        return db.execute(select(closed)).all()
+
+    def get_records_page(
+        self,
+        db: Session,
+        limit: int,
+        employee_id: Optional[UUID] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[AttendanceRecord]:
+        """
+        Keyset page of attendance records, newest first.
+
+        Ordered by (clock_in, id) descending; after is the (clock_in, id) of
+        the last row of the previous page. Served by
+        ix_attendance_employee_clock_in / ix_attendance_clock_in_id, so the
+        cost does not grow with page depth the way OFFSET does.
+        """
+        query = db.query(self.model)
+        if employee_id is not None:
+            query = query.filter(AttendanceRecord.employee_id == employee_id)
+        if start is not None:
+            query = query.filter(AttendanceRecord.clock_in >= start)
+        if end is not None:
+            query = query.filter(AttendanceRecord.clock_in < end)
+        if after is not None:
+            query = query.filter(
+                tuple_(AttendanceRecord.clock_in, AttendanceRecord.id) < tuple_(*after)
+            )
         return (
-            db.query(self.model)
-            .filter(
+            query
+            .order_by(desc(AttendanceRecord.clock_in), desc(AttendanceRecord.id))
+            .limit(limit)
+            .all()
+        )
+
+    def iter_export_rows(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        employee_id: Optional[UUID] = None,
+        chunk_size: int = 5000
+    ) -> Iterator[Row]:
+        """
+        Stream attendance records in [start, end) with the employee code and name.
+
+        Rows come from a server-side cursor chunk_size at a time, ordered by
+        (clock_in, id), so memory stays constant however large the range.
+        duration_seconds is NULL for sessions that are still open.
+        """
+        record = AttendanceRecord.__table__
+        employee = Employee.__table__
+        stmt = (
+            select(
+                record.c.id,
+                record.c.employee_id,
+                employee.c.employee_code,
+                employee.c.first_name,
+                employee.c.last_name,
+                record.c.clock_in,
+                record.c.clock_out,
+                extract('epoch', record.c.clock_out - record.c.clock_in).label('duration_seconds')
+            )
+            .join_from(record, employee, record.c.employee_id == employee.c.id)
+            .where(
                 and_(
-                    AttendanceRecord.employee_id == employee_id,
-                    AttendanceRecord.clock_out.is_(None)
+                    record.c.clock_in >= start,
+                    record.c.clock_in < end
                 )
             )
-            .order_by(desc(AttendanceRecord.clock_in))
-            .first()
+            .order_by(record.c.clock_in, record.c.id)
         )
+        if employee_id is not None:
+            stmt = stmt.where(record.c.employee_id == employee_id)
+        result = db.execute(stmt, execution_options={'stream_results': True})
+        return iter(result.yield_per(chunk_size))
 
+    def get_present_sessions(
+        self,
+        db: Session,
+        open_since: Optional[datetime] = None,
+        employee_ids: Optional[Sequence[UUID]] = None
+    ) -> List[Row]:
+        """
+        Open sessions joined to the employee's code, name, city and country.
 
-attendance_crud_handler = AttendanceCrudHandler(AttendanceRecord)
+        Reads through the partial open session index, so the cost follows
+        the number of employees clocked in. open_since bounds the lookup by
+        clock_in (partition pruning); employee_ids restricts it.
+        """
+        record = AttendanceRecord.__table__
+        employee = Employee.__table__
+        stmt = (
+            select(
+                record.c.id.label('attendance_id'),
+                record.c.employee_id,
+                record.c.clock_in,
+                employee.c.employee_code,
+                employee.c.first_name,
+                employee.c.last_name,
+                employee.c.city,
+                employee.c.country
+            )
+            .join_from(record, employee, record.c.employee_id == employee.c.id)
+            .where(record.c.clock_out.is_(None))
+        )
+        if open_since is not None:
+            stmt = stmt.where(record.c.clock_in >= open_since)
+        if employee_ids is not None:
+            stmt = stmt.where(record.c.employee_id.in_(employee_ids))
+        return db.execute(stmt).all()
+
+    def iter_session_epochs(
+        self,
+        db: Session,
+        start: date,
+        end: date,
+        work_day_timezone: str = 'UTC',
+        employee_id: Optional[UUID] = None,
+        chunk_size: int = 50000
+    ) -> Iterator[List[Row]]:
+        """
+        Stream the sessions of work dates [start, end] as plain numbers for analytics.
 
+        Yields lists of up to chunk_size rows read from a server-side cursor:
+        (employee_id, clock_in, clock_out, work_day, start_seconds) where
+        clock_in / clock_out are epoch seconds (clock_out NaN while open or
+        auto-closed),
+        work_day is the local work date as days since 1970-01-01 and
+        start_seconds the local clock in time as seconds since midnight.
+        """
+        record = AttendanceRecord.__table__
+        local_clock_in = func.timezone(work_day_timezone, record.c.clock_in)
+        stmt = (
+            select(
+                record.c.employee_id,
+                cast(extract('epoch', record.c.clock_in), Float),
+                case(
+                    (record.c.auto_closed, cast(literal('NaN'), Float)),
+                    else_=func.coalesce(cast(extract('epoch', record.c.clock_out), Float), cast(literal('NaN'), Float))
+                ),
+                cast(cast(local_clock_in, Date) - cast(literal(date(1970, 1, 1)), Date), Integer),
+                cast(extract('epoch', cast(local_clock_in, Time)), Float)
+            )
+            .where(
+                and_(
+                    record.c.clock_in >= func.timezone(work_day_timezone, cast(start, DateTime)),
+                    record.c.clock_in < func.timezone(work_day_timezone, cast(end + timedelta(days=1), DateTime))
+                )
+            )
+        )
+        if employee_id is not None:
+            stmt = stmt.where(record.c.employee_id == employee_id)
+        result = db.execute(stmt, execution_options={'stream_results': True})
+        return result.partitions(chunk_size)
+
+    def copy_import_staging(self, db: Session, rows_file: IO[str]) -> None:
+        """
+        COPY CSV rows (line, employee_key, clock_in, clock_out) into the import staging table.
+
+        The staging table is temporary and dropped on commit, so load and
+        merge it within one transaction.
+        """
+        db.execute(text(
+            'CREATE TEMP TABLE IF NOT EXISTS attendance_import_staging '
+            '(line bigint, employee_key text, clock_in timestamptz, clock_out timestamptz) '
+            'ON COMMIT DROP'
+        ))
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                'COPY attendance_import_staging (line, employee_key, clock_in, clock_out) '
+                'FROM STDIN WITH (FORMAT csv)',
+                rows_file
+            )
+        finally:
+            cursor.close()
+
+    def merge_import_staging(self, db: Session, by_employee_code: bool = False) -> Tuple[int, List[Row]]:
+        """
+        Insert the staged rows whose employee exists with one set-based INSERT ... SELECT.
+
+        employee_key is matched against hr.employee_t.employee_code when
+        by_employee_code is set, otherwise against its id. Rows already
+        imported (same employee and clock_in) and rows conflicting with an
+        open session are skipped, so re-running an import is safe.
+
+        Returns:
+            The number of records inserted and the (line, employee_key)
+            rows whose employee does not exist.
+        """
+        record = AttendanceRecord.__table__
+        employee = Employee.__table__
+        staging = IMPORT_STAGING
+        if by_employee_code:
+            matches = employee.c.employee_code == staging.c.employee_key
+        else:
+            matches = employee.c.id == cast(staging.c.employee_key, PG_UUID(as_uuid=True))
+
+        unknown = db.execute(
+            select(staging.c.line, staging.c.employee_key)
+            .where(~exists().where(matches))
+            .order_by(staging.c.line)
+        ).all()
+
+        source = (
+            select(employee.c.id, staging.c.clock_in, staging.c.clock_out)
+            .distinct(employee.c.id, staging.c.clock_in)
+            .join_from(staging, employee, matches)
+            .where(
+                ~exists().where(
+                    and_(
+                        record.c.employee_id == employee.c.id,
+                        record.c.clock_in == staging.c.clock_in
+                    )
+                )
+            )
+        )
+        result = db.execute(
+            insert(record)
+            .from_select(['employee_id', 'clock_in', 'clock_out'], source)
+            .on_conflict_do_nothing()
+        )
+        return result.rowcount, unknown
+
+
+def _open_session_of(record, employee_id, open_since: Optional[datetime] = None):
+    """Condition matching the open session of employee_id in record (table or alias)"""
+    condition = and_(
+        record.c.employee_id == employee_id,
+        record.c.clock_out.is_(None)
+    )
+    if open_since is not None:
+        condition = and_(condition, record.c.clock_in >= open_since)
+    return condition
+
+
+def _punch_values(punches: Sequence[Tuple[UUID, datetime]], time_column: str):
+    """VALUES list 'punch' of (employee_id, <time_column>) rows"""
+    return values(
+        column('employee_id', PG_UUID(as_uuid=True)),
+        column(time_column, DateTime(timezone=True)),
+        name='punch'
+    ).data(list(punches))
+
+
+attendance_crud_handler = AttendanceCrudHandler(AttendanceRecord)
@@ -0,0 +1,125 @@
+"""
+Attendance Daily Summary CRUD Handler
+"""
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, cast, delete, extract, func, select, tuple_, Date, DateTime, Numeric
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.sql.selectable import CTE
+from crud.base import CRUDBase
+from models.attendance import AttendanceRecord
+from models.attendance_summary import AttendanceDailySummary
+
+
+class AttendanceSummaryCrudHandler(CRUDBase[AttendanceDailySummary, None, None]):
+    """CRUD operations for the Attendance Daily Summary rollup"""
+
+    def rollup_closed_cte(self, closed: CTE, timezone: str) -> CTE:
+        """
+        Data-modifying CTE folding just-closed sessions into the rollup.
+
+        closed is a CTE returning closed attendance rows (employee_id,
+        clock_in, clock_out). Attach the result to the statement that
+        closes them so the rollup is maintained in the same round trip and
+        transaction; it returns the employee_id of every summary row written.
+        """
+        summary = AttendanceDailySummary.__table__
+        work_date = cast(func.timezone(timezone, closed.c.clock_in), Date)
+        source = (
+            select(
+                closed.c.employee_id,
+                work_date,
+                func.min(closed.c.clock_in),
+                func.max(closed.c.clock_out),
+                cast(func.sum(extract('epoch', closed.c.clock_out - closed.c.clock_in)), Numeric(14, 3)),
+                func.count()
+            )
+            .group_by(closed.c.employee_id, work_date)
+        )
+        upsert = insert(summary).from_select(
+            ['employee_id', 'work_date', 'first_in', 'last_out', 'total_seconds', 'session_count'],
+            source
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[summary.c.employee_id, summary.c.work_date],
+            set_={
+                'first_in': func.least(summary.c.first_in, upsert.excluded.first_in),
+                'last_out': func.greatest(summary.c.last_out, upsert.excluded.last_out),
+                'total_seconds': summary.c.total_seconds + upsert.excluded.total_seconds,
+                'session_count': summary.c.session_count + upsert.excluded.session_count,
+                'updated_at': func.now()
+            }
+        )
+        return upsert.returning(summary.c.employee_id).cte('rollup')
+
+    def rebuild(
+        self, db: Session, start: date, end: date, timezone: str
+    ) -> int:
+        """
+        Recompute the rollup for work dates in [start, end] from attendance_record_t.
+
+        Returns the number of summary rows written.
+        """
+        summary = AttendanceDailySummary.__table__
+        record = AttendanceRecord.__table__
+        db.execute(
+            delete(summary).where(summary.c.work_date.between(start, end))
+        )
+        work_date = cast(func.timezone(timezone, record.c.clock_in), Date)
+        source = (
+            select(
+                record.c.employee_id,
+                work_date,
+                func.min(record.c.clock_in),
+                func.max(record.c.clock_out),
+                cast(func.sum(extract('epoch', record.c.clock_out - record.c.clock_in)), Numeric(14, 3)),
+                func.count()
+            )
+            .where(
+                and_(
+                    record.c.clock_out.isnot(None),
+                    # Auto-closed sessions are missing punches, not worked time
+                    record.c.auto_closed.is_(False),
+                    # Bounds on clock_in itself keep the scan on ix_attendance_clock_in_id
+                    record.c.clock_in >= func.timezone(timezone, cast(start, DateTime)),
+                    record.c.clock_in < func.timezone(timezone, cast(end + timedelta(days=1), DateTime))
+                )
+            )
+            .group_by(record.c.employee_id, work_date)
+        )
+        result = db.execute(
+            insert(summary).from_select(
+                ['employee_id', 'work_date', 'first_in', 'last_out', 'total_seconds', 'session_count'],
+                source
+            )
+        )
+        return result.rowcount
+
+    def get_page(
+        self,
+        db: Session,
+        start: date,
+        end: date,
+        limit: int,
+        employee_id: Optional[UUID] = None,
+        after: Optional[Tuple[date, UUID]] = None
+    ) -> List[AttendanceDailySummary]:
+        """Keyset page of daily summaries in [start, end], ordered by (work_date, employee_id)"""
+        query = db.query(self.model).filter(AttendanceDailySummary.work_date.between(start, end))
+        if employee_id is not None:
+            query = query.filter(AttendanceDailySummary.employee_id == employee_id)
+        if after is not None:
+            query = query.filter(
+                tuple_(AttendanceDailySummary.work_date, AttendanceDailySummary.employee_id) > tuple_(*after)
+            )
+        return (
+            query
+            .order_by(AttendanceDailySummary.work_date, AttendanceDailySummary.employee_id)
+            .limit(limit)
+            .all()
+        )
+
+
+attendance_summary_crud_handler = AttendanceSummaryCrudHandler(AttendanceDailySummary)
@@ -0,0 +1,108 @@
+"""
+Employee CRUD Handler
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import column, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from crud.base import CRUDBase
+from models.employee import Employee, EmployeeStatusEnum
+
+
+class EmployeeCrudHandler(CRUDBase[Employee, None, None]):
+    """CRUD operations for Employees"""
+
+    def get_statuses(
+        self, db: Session, ids: Iterable[UUID]
+    ) -> Dict[UUID, EmployeeStatusEnum]:
+        """Return id -> status for the ids that exist, in a single query"""
+        ids = list(ids)
+        if not ids:
+            return {}
+        return {
+            row.id: EmployeeStatusEnum(row.status)
+            for row in db.query(Employee.id, Employee.status).filter(Employee.id.in_(ids))
+        }
+
+    def get_status_rows(
+        self, db: Session, updated_since: Optional[datetime] = None, chunk_size: int = 10000
+    ) -> Iterator[Tuple[UUID, EmployeeStatusEnum, datetime]]:
+        """Stream (id, status, updated_at) rows, optionally only those updated since a time"""
+        query = db.query(Employee.id, Employee.status, Employee.updated_at)
+        if updated_since is not None:
+            query = query.filter(Employee.updated_at >= updated_since)
+        return iter(query.yield_per(chunk_size))
+
+    def get_page(
+        self,
+        db: Session,
+        columns: Sequence[str],
+        limit: int,
+        status: Optional[EmployeeStatusEnum] = None,
+        city: Optional[str] = None,
+        country: Optional[str] = None,
+        after: Optional[Tuple[str, UUID]] = None
+    ) -> List[Row]:
+        """
+        Keyset page of employees ordered by (last_name, id), selecting only columns.
+
+        last_name and id are always selected (they are the cursor); after is
+        the (last_name, id) of the last row of the previous page. Served by
+        ix_employee_last_name_id.
+        """
+        table = Employee.__table__
+        selected = list(dict.fromkeys(['last_name', 'id', *columns]))
+        conditions = []
+        if status is not None:
+            conditions.append(table.c.status == status)
+        if city is not None:
+            conditions.append(table.c.city == city)
+        if country is not None:
+            conditions.append(table.c.country == country)
+        if after is not None:
+            conditions.append(tuple_(table.c.last_name, table.c.id) > tuple_(*after))
+        stmt = (
+            select(*(table.c[name] for name in selected))
+            .where(*conditions)
+            .order_by(table.c.last_name, table.c.id)
+            .limit(limit)
+        )
+        return db.execute(stmt).all()
+
+    def get_by_code(self, db: Session, employee_code: str, columns: Sequence[str]) -> Optional[Row]:
+        """Select columns of the employee with this code (unique index lookup)"""
+        table = Employee.__table__
+        return db.execute(
+            select(*(table.c[name] for name in columns))
+            .where(table.c.employee_code == employee_code)
+        ).first()
+
+    def bulk_upsert(self, db: Session, rows: Sequence[Mapping[str, Any]]) -> List[bool]:
+        """
+        Insert or update employees by employee_code in one statement.
+
+        Every row must have the same keys, and codes must be unique within
+        the call. Existing rows whose values all match are not written (so
+        their updated_at does not move). Returns one flag per row written,
+        True for an insert and False for an update (xmax is 0 only for
+        freshly inserted tuples); rows not returned were unchanged.
+        """
+        if not rows:
+            return []
+        stmt = insert(Employee.__table__).values(list(rows))
+        updated = [name for name in rows[0] if name != 'employee_code']
+        current = Employee.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[current.employee_code],
+            set_={**{name: stmt.excluded[name] for name in updated}, 'updated_at': func.now()},
+            where=tuple_(*(current[name] for name in updated)).is_distinct_from(
+                tuple_(*(stmt.excluded[name] for name in updated))
+            )
+        ).returning(column('xmax') == 0)
+        return list(db.execute(stmt).scalars())
+
+
+employee_crud_handler = EmployeeCrudHandler(Employee)
@@ -0,0 +1,90 @@
+"""
+Idempotency Key CRUD Handler
+"""
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from crud.base import CRUDBase
+from models.idempotency import IdempotencyKey
+
+
+class IdempotencyCrudHandler(CRUDBase[IdempotencyKey, None, None]):
+    """CRUD operations for Idempotency Keys"""
+
+    def claim(
+        self, db: Session, scope: str, key: str, fingerprint: str, expires_at: datetime
+    ) -> Optional[Row]:
+        """
+        Claim a key for a request about to run.
+
+        Inserts the claim, or takes over an expired row (a stale claim or
+        a response past its TTL). Returns None when the key was claimed,
+        otherwise the live row (status_code NULL while another request
+        holds it).
+        """
+        table = IdempotencyKey.__table__
+        stmt = insert(table).values(
+            scope=scope,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.scope, table.c.key],
+            set_={
+                'fingerprint': stmt.excluded.fingerprint,
+                'status_code': None,
+                'response_body': None,
+                'created_at': func.now(),
+                'expires_at': stmt.excluded.expires_at
+            },
+            where=table.c.expires_at <= func.now()
+        ).returning(table.c.key)
+        if db.execute(stmt).first() is not None:
+            return None
+        return db.execute(
+            select(table.c.fingerprint, table.c.status_code, table.c.response_body)
+            .where(and_(table.c.scope == scope, table.c.key == key))
+        ).first()
+
+    def complete(
+        self, db: Session, scope: str, key: str, status_code: int, response_body: Any, expires_at: datetime
+    ) -> None:
+        """Store the response of a claimed key"""
+        table = IdempotencyKey.__table__
+        db.execute(
+            update(table)
+            .where(and_(table.c.scope == scope, table.c.key == key))
+            .values(status_code=status_code, response_body=response_body, expires_at=expires_at)
+        )
+
+    def release(self, db: Session, scope: str, key: str) -> None:
+        """Drop an unfinished claim so the request can be retried"""
+        table = IdempotencyKey.__table__
+        db.execute(
+            delete(table).where(
+                and_(table.c.scope == scope, table.c.key == key, table.c.status_code.is_(None))
+            )
+        )
+
+    def purge_expired(self, db: Session, limit: int = 10000) -> int:
+        """Delete up to limit expired keys, returns the number deleted"""
+        table = IdempotencyKey.__table__
+        expired = (
+            select(table.c.scope, table.c.key)
+            .where(table.c.expires_at <= func.now())
+            .limit(limit)
+            .subquery()
+        )
+        result = db.execute(
+            delete(table).where(
+                and_(table.c.scope == expired.c.scope, table.c.key == expired.c.key)
+            )
+        )
+        return result.rowcount
+
+
+idempotency_crud_handler = IdempotencyCrudHandler(IdempotencyKey)
@@ -1,6 +1,9 @@
+from datetime import datetime
 from operator import or_
-from typing import List, Dict, Any
-from sqlalchemy import func
+from typing import IO, List, Dict, Any, Optional, Sequence, Tuple
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
 from crud.base import CRUDBase
 from models.users import User, UserActivity
@@ -13,5 +16,75 @@ class UserActivityCrudHandler(CRUDBase[UserActivity, None, None]):
     ) -> User:
         return super().create(db, obj_in)
 
+    def create_many(self, db: Session, rows: Sequence[Dict[str, Any]]) -> int:
+        """Insert activity rows (keyed by model attribute) in one multi-row INSERT, returns the number inserted"""
+        if not rows:
+            return 0
+        columns = UserActivity.__mapper__.columns
+        db.execute(insert(UserActivity.__table__).values([
+            {columns[key].name: value for key, value in row.items()} for row in rows
+        ]))
+        return len(rows)
+
+    def copy_user_activity(self, db: Session, rows_file: IO[str]) -> int:
+        """
+        COPY CSV rows into user_activity_t, returns the number loaded.
+
+        Columns: user_id, activity_object, user_activity_on, endpoint,
+        request_path, request_method, response_status, duration_ms.
+        """
+        statement = (
+            'COPY user_activity_t (user_id, activity_object, user_activity_on, endpoint, '
+            'request_path, request_method, response_status, duration_ms) FROM STDIN WITH (FORMAT csv)'
+        )
+        dbapi_error = db.get_bind().dialect.dbapi.Error
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(statement, rows_file)
+            return cursor.rowcount
+        except dbapi_error as e:
+            # Raise the same exception types (IntegrityError, DataError, ...) as executed statements
+            raise DBAPIError.instance(statement, None, e, dbapi_error) from e
+        finally:
+            cursor.close()
+
+    def get_page(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        limit: int,
+        user_id: Optional[int] = None,
+        endpoint: Optional[str] = None,
+        method: Optional[str] = None,
+        status: Optional[int] = None,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """
+        Keyset page of activity in [start, end), newest first.
+
+        before is the (user_activity_on, id) of the last row of the previous
+        page. The time range prunes monthly partitions; user_id and endpoint
+        filters are served by their (column, user_activity_on) indexes.
+        """
+        activity = UserActivity.__table__
+        conditions = [activity.c.user_activity_on >= start, activity.c.user_activity_on < end]
+        if user_id is not None:
+            conditions.append(activity.c.user_id == user_id)
+        if endpoint is not None:
+            conditions.append(activity.c.endpoint == endpoint)
+        if method is not None:
+            conditions.append(activity.c.request_method == method)
+        if status is not None:
+            conditions.append(activity.c.response_status == status)
+        if before is not None:
+            conditions.append(tuple_(activity.c.user_activity_on, activity.c.id) < tuple_(*before))
+        return db.execute(
+            select(activity)
+            .where(*conditions)
+            .order_by(activity.c.user_activity_on.desc(), activity.c.id.desc())
+            .limit(limit)
+        ).all()
+
 
 user_activity_crud_handler = UserActivityCrudHandler(UserActivity)
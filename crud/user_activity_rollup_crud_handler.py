@@ -0,0 +1,72 @@
+"""
+User Activity Hourly Rollup CRUD Handler
+"""
+from datetime import datetime
+from typing import Any, List, Mapping, Optional, Sequence
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from crud.base import CRUDBase
+from models.activity_rollup import UserActivityHourly
+
+# Element-wise sum of the stored and the incoming latency histogram
+_ADD_LATENCY_BUCKETS = literal_column(
+    'ARRAY(SELECT coalesce(a, 0) + coalesce(b, 0) '
+    'FROM unnest(user_activity_hourly_t.latency_buckets, excluded.latency_buckets) '
+    'WITH ORDINALITY AS u(a, b, i) ORDER BY i)'
+)
+
+
+class UserActivityRollupCrudHandler(CRUDBase[UserActivityHourly, None, None]):
+    """CRUD operations for the hourly user activity rollup"""
+
+    def add_counts(self, db: Session, rows: Sequence[Mapping[str, Any]]) -> int:
+        """
+        Add per (hour, endpoint, method) counts to the rollup in one upsert.
+
+        Rows are written in key order, so workers flushing at the same time
+        lock the rollup rows in the same order. Returns the number of rows.
+        """
+        if not rows:
+            return 0
+        rollup = UserActivityHourly.__table__
+        rows = sorted(rows, key=lambda row: (row['hour'], row['endpoint'], row['method']))
+        stmt = insert(rollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[rollup.c.hour, rollup.c.endpoint, rollup.c.method],
+            set_={
+                'requests': rollup.c.requests + stmt.excluded.requests,
+                'client_errors': rollup.c.client_errors + stmt.excluded.client_errors,
+                'errors': rollup.c.errors + stmt.excluded.errors,
+                'duration_ms_total': rollup.c.duration_ms_total + stmt.excluded.duration_ms_total,
+                'latency_buckets': _ADD_LATENCY_BUCKETS,
+                'updated_at': func.now()
+            }
+        )
+        db.execute(stmt)
+        return len(rows)
+
+    def get_hourly(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        endpoint: Optional[str] = None,
+        method: Optional[str] = None
+    ) -> List[Row]:
+        """Rollup rows of the hours in [start, end), ordered by hour, endpoint and method"""
+        rollup = UserActivityHourly.__table__
+        conditions = [rollup.c.hour >= start, rollup.c.hour < end]
+        if endpoint is not None:
+            conditions.append(rollup.c.endpoint == endpoint)
+        if method is not None:
+            conditions.append(rollup.c.method == method)
+        return db.execute(
+            select(rollup)
+            .where(*conditions)
+            .order_by(rollup.c.hour, rollup.c.endpoint, rollup.c.method)
+        ).all()
+
+
+user_activity_rollup_crud_handler = UserActivityRollupCrudHandler(UserActivityHourly)
@@ -1,13 +1,42 @@
 from contextlib import contextmanager
+from functools import wraps
 
-from sqlalchemy.orm import sessionmaker
+from flask import g, has_request_context, request
+from sqlalchemy.orm import Session
 
-from datastore.session import SessionLocal
+from datastore.session import SessionLocal, replica_set
+
+# Set on responses to writes: the client reads from the primary while it is present
+PRIMARY_COOKIE = 'db_primary'
 
 
 @contextmanager
 def session_scope():
-    """Provide a transactional scope around a series of operations."""
+    """
+    Provide a transactional scope around a series of operations.
+
+    Inside a request this is the request's session (get_request_session):
+    authenticate, the view and the services share one session, connection
+    and transaction, committed after the view returns. An exception rolls
+    the request's transaction back. Outside a request (CLI, jobs, worker
+    threads) each scope is its own session and transaction.
+    """
+    if not has_request_context():
+        with new_session_scope() as session:
+            yield session
+        return
+
+    session = get_request_session()
+    try:
+        yield session
+    except:
+        session.rollback()
+        raise
+
+
+@contextmanager
+def new_session_scope():
+    """Own session and transaction, committed at the end of the scope, even inside a request."""
     session = SessionLocal()
     try:
         yield session
@@ -19,3 +48,55 @@ def session_scope():
         if session:
             session.close()
 
+
+def read_only(f):
+    """
+    Serve the view's request from a read replica (DATABASE_REPLICA_URLS).
+
+    Only for views that never write. The request's session is bound to the
+    next healthy replica, unless none is healthy or the client wrote in the
+    last DATABASE_REPLICA_STICKY_SECONDS (pin_primary).
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def get_request_session() -> Session:
+    """The session of the current request, opened on first use"""
+    session = g.get('db_session')
+    if session is None:
+        replica = None
+        if g.get('db_read_only') and replica_set is not None and PRIMARY_COOKIE not in request.cookies:
+            replica = replica_set.choose()
+        session = g.db_session = SessionLocal(bind=replica) if replica is not None else SessionLocal()
+    return session
+
+
+def commit_request_session() -> bool:
+    """Commit the current request's transaction, False when the request opened no session"""
+    session = g.get('db_session')
+    if session is None:
+        return False
+    try:
+        session.commit()
+    except:
+        session.rollback()
+        raise
+    return True
+
+
+def pin_primary(response, seconds: float) -> None:
+    """Send the client's reads to the primary for the next seconds, so it reads its own writes"""
+    if replica_set is not None:
+        response.set_cookie(PRIMARY_COOKIE, '1', max_age=int(seconds), httponly=True)
+
+
+def close_request_session() -> None:
+    """Close the current request's session, rolling back what was not committed"""
+    session = g.pop('db_session', None)
+    if session is not None:
+        session.close()
@@ -0,0 +1,311 @@
+"""
+Engine instrumentation - connection pool, query and per-route database statistics of this worker
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+from util.histogram import histogram_percentile
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (inclusive) of the checkout time histogram; one more bucket
+# counts the slower checkouts
+CHECKOUT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 30000)
+
+
+class RequestDbStats:
+    """Database work of one request"""
+    __slots__ = ('queries', 'query_ms', 'checkouts', 'checkout_ms', 'slow_queries', 'statements')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_ms = 0.0
+        self.checkouts = 0
+        self.checkout_ms = 0.0
+        self.slow_queries = 0
+        # Statement text -> executions, when statements are tracked
+        self.statements: Optional[Counter] = None
+
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least threshold times, most first: probable N+1 queries"""
+        if self.statements is None:
+            return []
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+def request_db_stats() -> Optional[RequestDbStats]:
+    """Database work of the current request so far, None outside a request"""
+    if not has_request_context():
+        return None
+    stats = g.get('db_stats')
+    if stats is None:
+        stats = g.db_stats = RequestDbStats()
+    return stats
+
+
+class EngineMetrics:
+    """
+    Connection pool and query statistics of one engine, since the worker started
+
+    A checkout is the time to get a connection from the pool: waiting for
+    one to be checked in while all are in use, opening a new one, and the
+    pre-ping of an idle one. Checkouts that gave up after pool_timeout
+    count as timeouts. Pre-ping failures are stale connections the pool
+    replaced. Connection age is taken at checkout. Queries are timed from
+    cursor execute to the result; those taking slow_query_ms or longer are
+    logged with the types of their parameters (never the values). With
+    track_statements each request counts its executions per statement text,
+    for the N+1 detection of RouteDbStats.
+    """
+
+    def __init__(self, engine: Engine, slow_query_ms: Optional[float] = None, track_statements: bool = False):
+        """Instrument the engine"""
+        self._engine = engine
+        self.slow_query_ms = slow_query_ms
+        self.track_statements = track_statements
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_ms_total = 0.0
+        self.checkout_ms_max = 0.0
+        self.checkout_buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+        self.checkout_timeouts = 0
+        self.pre_pings = 0
+        self.pre_ping_ms_total = 0.0
+        self.pre_ping_failures = 0
+        self.connections_opened = 0
+        self.invalidations = 0
+        self.connection_age_max_seconds = 0.0
+        self.queries = 0
+        self.query_ms_total = 0.0
+        self.slow_queries = 0
+
+        self._time_checkouts(engine.pool)
+        self._time_pre_pings(engine.dialect)
+        # Pool events stay with the pool it is recreated into; pool.connect does not
+        event.listen(engine, 'engine_disposed', lambda disposed: self._time_checkouts(disposed.pool))
+        event.listen(engine.pool, 'connect', self._on_connect)
+        event.listen(engine.pool, 'checkout', self._on_checkout)
+        event.listen(engine.pool, 'invalidate', self._on_invalidate)
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._on_error)
+
+    def stats(self) -> dict:
+        pool = self._engine.pool
+        return {
+            'pool_size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'checkouts': self.checkouts,
+            'checkout_timeouts': self.checkout_timeouts,
+            'checkout_ms': {
+                'mean': round(self.checkout_ms_total / self.checkouts, 3) if self.checkouts else None,
+                'p50': self._checkout_percentile(0.5),
+                'p95': self._checkout_percentile(0.95),
+                'p99': self._checkout_percentile(0.99),
+                'max': round(self.checkout_ms_max, 3)
+            },
+            'pre_pings': self.pre_pings,
+            'pre_ping_ms_mean': round(self.pre_ping_ms_total / self.pre_pings, 3) if self.pre_pings else None,
+            'pre_ping_failures': self.pre_ping_failures,
+            'connections_opened': self.connections_opened,
+            'invalidations': self.invalidations,
+            'connection_age_max_seconds': round(self.connection_age_max_seconds, 1),
+            'queries': self.queries,
+            'query_ms_mean': round(self.query_ms_total / self.queries, 3) if self.queries else None,
+            'slow_queries': self.slow_queries
+        }
+
+    def _checkout_percentile(self, q: float) -> Optional[float]:
+        value = histogram_percentile(self.checkout_buckets, q, CHECKOUT_BUCKETS_MS)
+        # Interpolating within the bucket can overshoot the slowest checkout
+        return round(min(value, self.checkout_ms_max), 3) if value is not None else None
+
+    def _time_checkouts(self, pool) -> None:
+        connect = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                connection = connect()
+            except exc.TimeoutError:
+                with self._lock:
+                    self.checkout_timeouts += 1
+                raise
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.checkouts += 1
+                self.checkout_ms_total += elapsed_ms
+                self.checkout_ms_max = max(self.checkout_ms_max, elapsed_ms)
+                self.checkout_buckets[bisect_left(CHECKOUT_BUCKETS_MS, elapsed_ms)] += 1
+            stats = request_db_stats()
+            if stats is not None:
+                stats.checkouts += 1
+                stats.checkout_ms += elapsed_ms
+            return connection
+
+        pool.connect = timed_connect
+
+    def _time_pre_pings(self, dialect) -> None:
+        do_ping = dialect.do_ping
+
+        def timed_ping(dbapi_connection):
+            started = time.perf_counter()
+            alive = False
+            try:
+                alive = do_ping(dbapi_connection)
+                return alive
+            finally:
+                with self._lock:
+                    self.pre_pings += 1
+                    self.pre_ping_ms_total += (time.perf_counter() - started) * 1000
+                    if not alive:
+                        self.pre_ping_failures += 1
+
+        dialect.do_ping = timed_ping
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        age = time.time() - connection_record.starttime
+        with self._lock:
+            self.connection_age_max_seconds = max(self.connection_age_max_seconds, age)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info['query_started'].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        slow = self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms
+        with self._lock:
+            self.queries += 1
+            self.query_ms_total += elapsed_ms
+            if slow:
+                self.slow_queries += 1
+        stats = request_db_stats()
+        if slow:
+            where = f' in {request.method} {request.endpoint}' if stats is not None else ''
+            logger.warning(
+                f"Slow query ({elapsed_ms:.1f} ms{where}): {_one_line(statement)} "
+                f"parameters {parameter_shape(parameters, executemany)}"
+            )
+        if stats is not None:
+            stats.queries += 1
+            stats.query_ms += elapsed_ms
+            if slow:
+                stats.slow_queries += 1
+            if self.track_statements:
+                if stats.statements is None:
+                    stats.statements = Counter()
+                stats.statements[statement] += 1
+
+    def _on_error(self, context) -> None:
+        # The failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.cursor is not None:
+            started = context.connection.info.get('query_started')
+            if started:
+                started.pop()
+
+
+class _RouteCounts:
+    __slots__ = (
+        'requests', 'queries', 'max_queries', 'query_ms_total', 'checkout_ms_total',
+        'slow_queries', 'n_plus_one'
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.query_ms_total = 0.0
+        self.checkout_ms_total = 0.0
+        self.slow_queries = 0
+        self.n_plus_one = 0
+
+
+class RouteDbStats:
+    """
+    Query count and database time per endpoint and method of this worker
+
+    With an n_plus_one_threshold, a request that ran one statement that
+    many times or more (e.g. a lookup per row of a list) is logged as a
+    probable N+1 and counted for its route.
+    """
+
+    def __init__(self, n_plus_one_threshold: Optional[int] = None):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._routes: Dict[Tuple[str, str], _RouteCounts] = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: Optional[str], method: str, stats: Optional[RequestDbStats]) -> None:
+        """Count one request and its database work"""
+        key = (endpoint or '', method)
+        repeated = []
+        if stats is not None and self.n_plus_one_threshold is not None:
+            repeated = stats.repeated_statements(self.n_plus_one_threshold)
+        for statement, count in repeated:
+            logger.warning(f"Probable N+1 in {method} {endpoint}: {count} x {_one_line(statement)}")
+        with self._lock:
+            counts = self._routes.get(key)
+            if counts is None:
+                counts = self._routes[key] = _RouteCounts()
+            counts.requests += 1
+            if stats is not None:
+                counts.queries += stats.queries
+                counts.max_queries = max(counts.max_queries, stats.queries)
+                counts.query_ms_total += stats.query_ms
+                counts.checkout_ms_total += stats.checkout_ms
+                counts.slow_queries += stats.slow_queries
+                if repeated:
+                    counts.n_plus_one += 1
+
+    def stats(self) -> List[dict]:
+        """Routes by total database time, most first"""
+        with self._lock:
+            routes = sorted(self._routes.items(), key=lambda item: -item[1].query_ms_total)
+            return [
+                {
+                    'endpoint': endpoint,
+                    'method': method,
+                    'requests': counts.requests,
+                    'queries_per_request': round(counts.queries / counts.requests, 2),
+                    'max_queries': counts.max_queries,
+                    'query_ms_per_request': round(counts.query_ms_total / counts.requests, 3),
+                    'checkout_ms_per_request': round(counts.checkout_ms_total / counts.requests, 3),
+                    'query_ms_total': round(counts.query_ms_total, 3),
+                    'slow_queries': counts.slow_queries,
+                    'n_plus_one_requests': counts.n_plus_one
+                }
+                for (endpoint, method), counts in routes
+            ]
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """The names and types of bound parameters, never their values"""
+    if executemany:
+        return f'{len(parameters)} x {parameter_shape(parameters[0])}' if parameters else '[]'
+    if isinstance(parameters, dict):
+        shape = '{' + ', '.join(f'{name}: {type(value).__name__}' for name, value in parameters.items()) + '}'
+    else:
+        shape = '(' + ', '.join(type(value).__name__ for value in parameters or ()) + ')'
+    return shape[:500]
+
+
+def _one_line(statement: str) -> str:
+    return ' '.join(statement.split())[:1000]
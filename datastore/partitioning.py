@@ -0,0 +1,254 @@
+"""
+Monthly range partitioning of attendance_record_t by clock_in and of
+user_activity_t by user_activity_on
+
+Partitions are named <table>_pYYYY_MM and cover [first of month, first of
+next month) in UTC. Partitions are not created on demand, so `flask --app
+manage attendance partitions ensure` has to run ahead of time (e.g. daily)
+to keep upcoming months available; user_activity_t partitions are kept
+ahead (and expired) by the activity-partitions scheduled job.
+"""
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+ATTENDANCE_TABLE = 'attendance_record_t'
+ACTIVITY_TABLE = 'user_activity_t'
+
+# Suffix of the original table (and its indexes) kept after conversion
+LEGACY_SUFFIX = '_unpartitioned'
+
+
+def month_start(value: date) -> date:
+    """First day of the month of value"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month months after (or before, if negative) month"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    """First day of the current UTC month"""
+    return month_start(datetime.now(timezone.utc).date())
+
+
+def partition_name(month: date, table: str = ATTENDANCE_TABLE) -> str:
+    """Name of the partition holding month"""
+    return f'{table}_p{month:%Y_%m}'
+
+
+def is_partitioned(db: Session, table: str = ATTENDANCE_TABLE) -> bool:
+    """Whether table is a partitioned table"""
+    return db.execute(
+        text('SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))'),
+        {'table': table}
+    ).scalar()
+
+
+def list_partitions(db: Session, table: str = ATTENDANCE_TABLE) -> List[Tuple[date, str]]:
+    """(month, name) of the monthly partitions attached to table, oldest first"""
+    names = db.execute(
+        text(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(:table)'
+        ),
+        {'table': table}
+    ).scalars().all()
+    pattern = re.compile(rf'^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$')
+    partitions = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def ensure_partitions(
+    db: Session, first_month: date, last_month: date, table: str = ATTENDANCE_TABLE
+) -> List[str]:
+    """
+    Create the missing monthly partitions from first_month to last_month (inclusive).
+
+    Returns the names of the partitions created.
+    """
+    existing = {name for _, name in list_partitions(db, table)}
+    created = []
+    month = month_start(first_month)
+    while month <= last_month:
+        name = partition_name(month, table)
+        if name not in existing:
+            db.execute(text(
+                f'CREATE TABLE {_quote(db, name)} PARTITION OF {_quote(db, table)} '
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def detach_expired_partitions(
+    db: Session,
+    before_month: date,
+    archive_schema: Optional[str] = None,
+    table: str = ATTENDANCE_TABLE
+) -> List[str]:
+    """
+    Detach the partitions of months before before_month.
+
+    Detached partitions are moved to archive_schema, or dropped when no
+    archive schema is given. Returns the names of the partitions detached.
+    """
+    expired = [name for month, name in list_partitions(db, table) if month < before_month]
+    if expired and archive_schema:
+        db.execute(text(f'CREATE SCHEMA IF NOT EXISTS {_quote(db, archive_schema)}'))
+    for name in expired:
+        db.execute(text(f'ALTER TABLE {_quote(db, table)} DETACH PARTITION {_quote(db, name)}'))
+        if archive_schema:
+            db.execute(text(f'ALTER TABLE {_quote(db, name)} SET SCHEMA {_quote(db, archive_schema)}'))
+        else:
+            db.execute(text(f'DROP TABLE {_quote(db, name)}'))
+    return expired
+
+
+def convert_attendance_table(db: Session, months_ahead: int) -> int:
+    """
+    Rebuild attendance_record_t as a table partitioned by clock_in month.
+
+    The existing table and its indexes are renamed with LEGACY_SUFFIX and
+    kept; a partitioned table with the same columns is created, partitions
+    from the oldest clock_in up to months_ahead months from now are added
+    and all rows are copied. The primary key becomes (id, clock_in) and
+    the unique open session index becomes a plain partial index, as
+    unique indexes of a partitioned table must contain the partition key;
+    run with ATTENDANCE_PARTITIONED enabled afterwards.
+
+    Holds an exclusive lock on the table for the whole copy, so run it in
+    a maintenance window. Returns the number of rows copied.
+    """
+    table = ATTENDANCE_TABLE
+    if is_partitioned(db, table):
+        raise ValueError(f'{table} is already partitioned.')
+    legacy = _set_aside(db, table)
+
+    db.execute(text(
+        f'CREATE TABLE {_quote(db, table)} (LIKE {_quote(db, legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        'PARTITION BY RANGE (clock_in)'
+    ))
+    db.execute(text(f'ALTER TABLE {_quote(db, table)} ADD PRIMARY KEY (id, clock_in)'))
+    db.execute(text(
+        f'ALTER TABLE {_quote(db, table)} ADD FOREIGN KEY (employee_id) '
+        'REFERENCES hr.employee_t (id) ON DELETE CASCADE'
+    ))
+    db.execute(text(
+        f'CREATE INDEX ix_attendance_open_session ON {_quote(db, table)} (employee_id) WHERE clock_out IS NULL'
+    ))
+    db.execute(text(f'CREATE INDEX ix_attendance_employee_clock_in ON {_quote(db, table)} (employee_id, clock_in)'))
+    db.execute(text(f'CREATE INDEX ix_attendance_clock_in_id ON {_quote(db, table)} (clock_in, id)'))
+
+    oldest = db.execute(text(
+        f"SELECT (min(clock_in) AT TIME ZONE 'UTC')::date FROM {_quote(db, legacy)}"
+    )).scalar()
+    ensure_partitions(db, month_start(oldest or current_month()), add_months(current_month(), months_ahead), table)
+
+    return db.execute(text(f'INSERT INTO {_quote(db, table)} SELECT * FROM {_quote(db, legacy)}')).rowcount
+
+
+def convert_activity_table(db: Session, months_ahead: int) -> int:
+    """
+    Rebuild user_activity_t as a table partitioned by user_activity_on month.
+
+    Like convert_attendance_table: the existing table is kept with
+    LEGACY_SUFFIX, the primary key becomes (id, user_activity_on) and
+    every row is copied. The promoted columns (endpoint, request_path,
+    request_method, response_status, duration_ms) are added to a table
+    created before they existed, and request_path, request_method and
+    response_status are backfilled from activity_object for old rows.
+
+    Holds an exclusive lock on the table for the whole copy, so run it in
+    a maintenance window. Returns the number of rows copied.
+    """
+    table = ACTIVITY_TABLE
+    if is_partitioned(db, table):
+        raise ValueError(f'{table} is already partitioned.')
+    for column, column_type in (
+        ('endpoint', 'varchar(100)'),
+        ('request_path', 'text'),
+        ('request_method', 'varchar(10)'),
+        ('response_status', 'smallint'),
+        ('duration_ms', 'double precision'),
+    ):
+        db.execute(text(f'ALTER TABLE {_quote(db, table)} ADD COLUMN IF NOT EXISTS {column} {column_type}'))
+    sequence = db.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': table}).scalar()
+    legacy = _set_aside(db, table)
+
+    db.execute(text(
+        f'CREATE TABLE {_quote(db, table)} (LIKE {_quote(db, legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        'PARTITION BY RANGE (user_activity_on)'
+    ))
+    db.execute(text(f'ALTER TABLE {_quote(db, table)} ALTER COLUMN user_activity_on SET NOT NULL'))
+    db.execute(text(f'ALTER TABLE {_quote(db, table)} ADD PRIMARY KEY (id, user_activity_on)'))
+    db.execute(text(f'ALTER TABLE {_quote(db, table)} ADD FOREIGN KEY (user_id) REFERENCES users_t (id)'))
+    if sequence:
+        # The id default keeps using the legacy table's sequence; move its ownership
+        db.execute(text(f'ALTER SEQUENCE {sequence} OWNED BY {_quote(db, table)}.id'))
+    db.execute(text(f'CREATE INDEX ix_user_activity_on_id ON {_quote(db, table)} (user_activity_on, id)'))
+    db.execute(text(f'CREATE INDEX ix_user_activity_user_on ON {_quote(db, table)} (user_id, user_activity_on)'))
+    db.execute(text(f'CREATE INDEX ix_user_activity_endpoint_on ON {_quote(db, table)} (endpoint, user_activity_on)'))
+
+    oldest = db.execute(text(
+        f"SELECT (min(user_activity_on) AT TIME ZONE 'UTC')::date FROM {_quote(db, legacy)}"
+    )).scalar()
+    ensure_partitions(db, month_start(oldest or current_month()), add_months(current_month(), months_ahead), table)
+
+    return db.execute(text(
+        f'INSERT INTO {_quote(db, table)} (id, user_id, activity_object, user_activity_on, endpoint, '
+        'request_path, request_method, response_status, duration_ms) '
+        'SELECT id, user_id, activity_object, coalesce(user_activity_on, now()), endpoint, '
+        "coalesce(request_path, activity_object->>'request_path'), "
+        "coalesce(request_method, activity_object->>'request_method_type'), "
+        "coalesce(response_status, substring(activity_object->>'response_status' from '^[0-9]{3}')::smallint), "
+        f'duration_ms FROM {_quote(db, legacy)}'
+    )).rowcount
+
+
+def maintain_partitions(
+    db: Session,
+    months_ahead: int,
+    retention_months: int,
+    archive_schema: Optional[str] = None,
+    table: str = ATTENDANCE_TABLE
+) -> Tuple[List[str], List[str]]:
+    """
+    Create the partitions up to months_ahead and detach those past retention_months.
+
+    Returns the names of the partitions created and detached.
+    """
+    month = current_month()
+    created = ensure_partitions(db, month, add_months(month, months_ahead), table)
+    detached = detach_expired_partitions(db, add_months(month, -retention_months), archive_schema, table)
+    return created, detached
+
+
+def _set_aside(db: Session, table: str) -> str:
+    """Rename table and its indexes with LEGACY_SUFFIX, returns the new table name"""
+    legacy = table + LEGACY_SUFFIX
+    indexes = db.execute(
+        text('SELECT indexname FROM pg_indexes WHERE tablename = :table AND schemaname = current_schema()'),
+        {'table': table}
+    ).scalars().all()
+    for index in indexes:
+        db.execute(text(f'ALTER INDEX {_quote(db, index)} RENAME TO {_quote(db, index + LEGACY_SUFFIX)}'))
+    db.execute(text(f'ALTER TABLE {_quote(db, table)} RENAME TO {_quote(db, legacy)}'))
+    return legacy
+
+
+def _quote(db: Session, identifier: str) -> str:
+    """Quote an identifier for the session's dialect"""
+    return db.get_bind().dialect.identifier_preparer.quote(identifier)
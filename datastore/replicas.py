@@ -0,0 +1,136 @@
+"""
+Read replicas - round-robin over the replica engines that pass their health check
+"""
+import atexit
+import logging
+import threading
+from itertools import count
+from typing import List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it has replayed all WAL
+# it received (an idle primary does not make a replica lag) or is not in recovery
+_LAG_SECONDS = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class _Replica:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.ejections = 0
+
+
+class ReplicaSet:
+    """
+    Read replicas of this worker
+
+    choose() returns the next healthy replica engine, round-robin, or None
+    when none is healthy (reads then go to the primary). A replica is
+    ejected as soon as one of its connections is lost or cannot be opened,
+    and by the health check thread, which every check_seconds measures
+    each replica's lag and ejects those unreachable or more than
+    max_lag_seconds behind. The health check puts a replica back once it
+    is reachable and caught up again.
+    """
+
+    def __init__(self, engines: List[Engine], check_seconds: float = 5, max_lag_seconds: Optional[float] = 10):
+        """Replica engines, how often they are health checked and the replication lag that ejects one"""
+        self._replicas = [_Replica(engine) for engine in engines]
+        self.check_seconds = check_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self._next = count()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        for replica in self._replicas:
+            event.listen(replica.engine, 'handle_error', self._on_error(replica))
+
+    def choose(self) -> Optional[Engine]:
+        """The next healthy replica engine, None when there is none"""
+        self.start()
+        healthy = [replica for replica in self._replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)].engine
+
+    def check(self) -> int:
+        """Check every replica once, returns the number healthy"""
+        for replica in self._replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    replica.lag_seconds = float(connection.execute(_LAG_SECONDS).scalar())
+            except Exception as e:
+                replica.lag_seconds = None
+                self._eject(replica, f'health check failed: {e}')
+            else:
+                if self.max_lag_seconds is not None and replica.lag_seconds > self.max_lag_seconds:
+                    self._eject(replica, f'{replica.lag_seconds:.1f}s behind the primary')
+                elif not replica.healthy:
+                    replica.healthy = True
+                    logger.info(f"ReplicaSet: {_name(replica)} is back")
+        return sum(replica.healthy for replica in self._replicas)
+
+    def start(self) -> None:
+        """Start the health check on first use in this process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='replica-health',
+                    daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> List[dict]:
+        return [
+            {
+                'replica': _name(replica),
+                'healthy': replica.healthy,
+                'lag_seconds': replica.lag_seconds,
+                'ejections': replica.ejections
+            }
+            for replica in self._replicas
+        ]
+
+    def _eject(self, replica: _Replica, reason: str) -> None:
+        if replica.healthy:
+            replica.healthy = False
+            replica.ejections += 1
+            logger.warning(f"ReplicaSet: ejected {_name(replica)}: {reason}")
+
+    def _on_error(self, replica: _Replica):
+        def handle_error(context):
+            # Lost connection, or a new one could not be opened
+            if context.is_disconnect or context.connection is None:
+                self._eject(replica, str(context.original_exception))
+        return handle_error
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.check()
+            except Exception:
+                logger.error("ReplicaSet: health check failed", exc_info=True)
+            if self._stop.wait(self.check_seconds):
+                return
+
+
+def _name(replica: _Replica) -> str:
+    url = replica.engine.url
+    return f"{url.host or url.query.get('host')}:{url.port or 5432}/{url.database}"
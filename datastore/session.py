@@ -2,6 +2,30 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app import load_config
+from datastore.instrumentation import EngineMetrics
+from datastore.replicas import ReplicaSet
 
-engine = create_engine(load_config().DATABASE_URL, pool_pre_ping=True, pool_size=20, max_overflow=0,pool_recycle=3600)
+config = load_config()
+engine_options = dict(pool_pre_ping=True, pool_size=20, max_overflow=0, pool_recycle=3600)
+
+engine = create_engine(config.DATABASE_URL, **engine_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Pool and query statistics per engine (GET /metrics)
+metrics_options = dict(
+    slow_query_ms=config.DATABASE_SLOW_QUERY_MS,
+    track_statements=config.DATABASE_N_PLUS_ONE_THRESHOLD is not None
+)
+engine_metrics = {'primary': EngineMetrics(engine, **metrics_options)}
+
+# Read-only requests (datastore.deps.read_only) are served by these when configured
+replica_set = None
+if config.DATABASE_REPLICA_URLS:
+    replica_engines = [create_engine(url, **engine_options) for url in config.DATABASE_REPLICA_URLS]
+    for index, replica_engine in enumerate(replica_engines):
+        engine_metrics[f'replica-{index}'] = EngineMetrics(replica_engine, **metrics_options)
+    replica_set = ReplicaSet(
+        replica_engines,
+        check_seconds=config.DATABASE_REPLICA_CHECK_SECONDS,
+        max_lag_seconds=config.DATABASE_REPLICA_MAX_LAG_SECONDS
+    )
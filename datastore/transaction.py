@@ -0,0 +1,35 @@
+"""
+Work deferred until a session's transaction commits
+"""
+import logging
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def after_commit(session: Session, callback: Callable, *args) -> None:
+    """
+    Call callback(*args) once the session's current transaction commits.
+
+    For in-memory state mirroring a write (caches, indexes): a rolled back
+    transaction drops its callbacks. They run in the order queued, after
+    the commit, and may not use the session; a failing one is logged.
+    """
+    session.info.setdefault('after_commit', []).append((callback, args))
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session: Session) -> None:
+    for callback, args in session.info.pop('after_commit', ()):
+        try:
+            callback(*args)
+        except Exception:
+            logger.exception(f"After commit callback {callback!r} failed")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _drop_after_commit(session: Session) -> None:
+    session.info.pop('after_commit', None)
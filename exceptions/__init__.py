@@ -8,6 +8,7 @@ from exceptions.app_exceptions import (
     UnauthorizedException,
     ForbiddenException,
     ConflictException,
+    ServiceUnavailableException,
     InternalServerException,
     DatabaseException
 )
@@ -19,6 +20,7 @@ __all__ = [
     'UnauthorizedException',
     'ForbiddenException',
     'ConflictException',
+    'ServiceUnavailableException',
     'InternalServerException',
     'DatabaseException',
 ]
@@ -70,6 +70,19 @@ class DatabaseException(AppException):
         super().__init__(message=message, status_code=500, payload=payload)
 
 
+class ServiceUnavailableException(AppException):
+    """Exception for temporarily overloaded or unavailable services (503)"""
+    
+    def __init__(
+        self,
+        message: str = "Service temporarily unavailable",
+        payload: Optional[Dict[str, Any]] = None,
+        retry_after: Optional[int] = None
+    ):
+        super().__init__(message=message, status_code=503, payload=payload)
+        self.retry_after = retry_after
+
+
 class InternalServerException(AppException):
     """Exception for internal server errors (500)"""
     
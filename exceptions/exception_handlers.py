@@ -14,6 +14,7 @@ from exceptions.app_exceptions import (
     UnauthorizedException,
     ForbiddenException,
     ConflictException,
+    ServiceUnavailableException,
     DatabaseException,
     InternalServerException
 )
@@ -60,6 +61,15 @@ def register_exception_handlers(app):
         logger.warning(f"ConflictException: {e.message}")
         return jsonify(e.to_dict()), e.status_code
     
+    @app.errorhandler(ServiceUnavailableException)
+    def handle_service_unavailable_exception(e: ServiceUnavailableException):
+        """Handle service unavailable exceptions"""
+        logger.warning(f"ServiceUnavailableException: {e.message}")
+        response = jsonify(e.to_dict())
+        if e.retry_after is not None:
+            response.headers['Retry-After'] = str(e.retry_after)
+        return response, e.status_code
+    
     @app.errorhandler(PydanticValidationError)
     def handle_pydantic_validation_error(e: PydanticValidationError):
         """Handle Pydantic validation errors"""
@@ -0,0 +1,82 @@
+"""
+User Activity Hourly Rollup Model - per-route request counts and latency histograms
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+from datastore.base_class import Base
+
+
+class UserActivityHourly(Base):
+    """
+    User Activity Hourly Rollup Model
+    Maps to user_activity_hourly_t table
+
+    Maintained incrementally by every worker (services/activity_rollup.py)
+    from all requests, including those sampled out of user_activity_t.
+    latency_buckets counts requests per LATENCY_BUCKETS_MS bucket
+    (util/histogram.py), so percentiles of any set of rows are computed by
+    adding the arrays.
+    """
+    __tablename__ = 'user_activity_hourly_t'
+    __table_args__ = (
+        Index('ix_user_activity_hourly_endpoint_hour', 'endpoint', 'hour'),
+    )
+
+    hour = Column(
+        "hour",
+        DateTime(timezone=True),
+        primary_key=True
+    )
+    endpoint = Column(
+        "endpoint",
+        String(100),
+        primary_key=True,
+        comment="Flask endpoint, empty for requests matching no route"
+    )
+    method = Column(
+        "method",
+        String(10),
+        primary_key=True
+    )
+    requests = Column(
+        "requests",
+        BigInteger,
+        nullable=False,
+        server_default='0'
+    )
+    client_errors = Column(
+        "client_errors",
+        BigInteger,
+        nullable=False,
+        server_default='0',
+        comment="Responses with status 4xx"
+    )
+    errors = Column(
+        "errors",
+        BigInteger,
+        nullable=False,
+        server_default='0',
+        comment="Responses with status 5xx"
+    )
+    duration_ms_total = Column(
+        "duration_ms_total",
+        Float,
+        nullable=False,
+        server_default='0'
+    )
+    latency_buckets = Column(
+        "latency_buckets",
+        ARRAY(BigInteger),
+        nullable=False
+    )
+    updated_at = Column(
+        "updated_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<UserActivityHourly(hour={self.hour}, endpoint='{self.endpoint}', method='{self.method}')>"
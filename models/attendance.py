@@ -1,7 +1,7 @@
 """
 Attendance Record Model - Attendance Record Table
 """
-from sqlalchemy import Column, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,6 +14,21 @@ class AttendanceRecord(Base):
     Maps to attendance.attendance_record_t table
     """
     __tablename__ = 'attendance_record_t'
+    __table_args__ = (
+        # At most one open session (clock_out IS NULL) per employee.
+        # Also the ON CONFLICT target of the single-statement clock in.
+        # Once the table is partitioned by clock_in month (datastore/partitioning.py)
+        # this is a plain partial index and clock ins take an advisory lock instead.
+        Index(
+            'uq_attendance_open_session',
+            'employee_id',
+            unique=True,
+            postgresql_where=text('clock_out IS NULL')
+        ),
+        # Keyset pagination of an employee's history and date range reports
+        Index('ix_attendance_employee_clock_in', 'employee_id', 'clock_in'),
+        Index('ix_attendance_clock_in_id', 'clock_in', 'id'),
+    )
    
     id = Column(
         "id",
@@ -24,9 +39,8 @@ class AttendanceRecord(Base):
     employee_id = Column(
         "employee_id",
         UUID(as_uuid=True),
-        ForeignKey('employee_t.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        ForeignKey('hr.employee_t.id', ondelete='CASCADE'),
+        nullable=False
     )
     clock_in = Column(
         "clock_in",
@@ -38,6 +52,14 @@ class AttendanceRecord(Base):
         DateTime(timezone=True),
         nullable=True
     )
+    auto_closed = Column(
+        "auto_closed",
+        Boolean,
+        nullable=False,
+        default=False,
+        server_default=text('false'),
+        comment="Closed by the stale session job, not by a clock out"
+    )
     created_at = Column(
         "created_at",
         DateTime(timezone=True),
@@ -68,6 +90,7 @@ class AttendanceRecord(Base):
             'employee_id': str(self.employee_id),
             'clock_in': self.clock_in.isoformat() if self.clock_in else None,
             'clock_out': self.clock_out.isoformat() if self.clock_out else None,
+            'auto_closed': self.auto_closed,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -0,0 +1,77 @@
+"""
+Attendance Daily Summary Model - per-employee, per-day rollup of closed sessions
+"""
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from datastore.base_class import Base
+
+
+class AttendanceDailySummary(Base):
+    """
+    Attendance Daily Summary Model
+    Maps to attendance_daily_summary_t table
+
+    Maintained incrementally whenever an AttendanceRecord is closed. A
+    session counts towards the work date of its clock_in in the configured
+    ATTENDANCE_WORK_DAY_TIMEZONE.
+    """
+    __tablename__ = 'attendance_daily_summary_t'
+    __table_args__ = (
+        Index('ix_attendance_summary_work_date', 'work_date', 'employee_id'),
+    )
+
+    employee_id = Column(
+        "employee_id",
+        UUID(as_uuid=True),
+        ForeignKey('hr.employee_t.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    work_date = Column(
+        "work_date",
+        Date,
+        primary_key=True
+    )
+    first_in = Column(
+        "first_in",
+        DateTime(timezone=True),
+        nullable=False
+    )
+    last_out = Column(
+        "last_out",
+        DateTime(timezone=True),
+        nullable=False
+    )
+    total_seconds = Column(
+        "total_seconds",
+        Numeric(14, 3),
+        nullable=False,
+        server_default='0'
+    )
+    session_count = Column(
+        "session_count",
+        Integer,
+        nullable=False,
+        server_default='0'
+    )
+    updated_at = Column(
+        "updated_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<AttendanceDailySummary(employee_id={self.employee_id}, work_date={self.work_date})>"
+
+    def serialize(self):
+        """Serialize daily summary to dictionary"""
+        return {
+            'employee_id': str(self.employee_id),
+            'work_date': self.work_date.isoformat() if self.work_date else None,
+            'first_in': self.first_in.isoformat() if self.first_in else None,
+            'last_out': self.last_out.isoformat() if self.last_out else None,
+            'total_seconds': float(self.total_seconds) if self.total_seconds is not None else None,
+            'session_count': self.session_count
+        }
@@ -3,7 +3,7 @@ Employee Model - HR Employee Table
 """
 import enum
 from datetime import date
-from sqlalchemy import Column, String, Date, DateTime, CheckConstraint
+from sqlalchemy import Column, String, Date, DateTime, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID, ENUM
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -25,6 +25,8 @@ class Employee(Base):
     """
     __tablename__ = 'employee_t'
     __table_args__ = (
+        # Keyset pagination of the employee directory
+        Index('ix_employee_last_name_id', 'last_name', 'id'),
         {'schema': 'hr'}
     )
 
@@ -90,7 +92,9 @@ class Employee(Base):
         DateTime(timezone=True),
         nullable=False,
         server_default=func.now(),
-        onupdate=func.now()
+        onupdate=func.now(),
+        index=True,
+        comment="Watermark for incremental refresh of the employee status index"
     )
 
     # Relationship to attendance records
@@ -0,0 +1,66 @@
+"""
+Idempotency Key Model - stored responses of idempotent write requests
+"""
+from sqlalchemy import Column, DateTime, Integer, String, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from datastore.base_class import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Idempotency Key Model
+    Maps to idempotency_key_t table
+
+    One row per (scope, key) sent in an Idempotency-Key header. While the
+    first request runs the row is a claim (status_code NULL) that expires
+    after the lock timeout; once it succeeded the response is stored until
+    expires_at and replayed to retries.
+    """
+    __tablename__ = 'idempotency_key_t'
+    __table_args__ = (
+        # Purge of expired keys
+        Index('ix_idempotency_key_expires_at', 'expires_at'),
+    )
+
+    scope = Column(
+        "scope",
+        String(255),
+        primary_key=True,
+        comment="HTTP method and path the key was sent to"
+    )
+    key = Column(
+        "key",
+        String(255),
+        primary_key=True
+    )
+    fingerprint = Column(
+        "fingerprint",
+        String(64),
+        nullable=False,
+        comment="SHA-256 of the request body"
+    )
+    status_code = Column(
+        "status_code",
+        Integer,
+        nullable=True
+    )
+    response_body = Column(
+        "response_body",
+        JSONB,
+        nullable=True
+    )
+    created_at = Column(
+        "created_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now()
+    )
+    expires_at = Column(
+        "expires_at",
+        DateTime(timezone=True),
+        nullable=False
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey(scope={self.scope}, key={self.key}, status_code={self.status_code})>"
@@ -5,7 +5,7 @@ from traceback import print_exc
 
 import jwt
 from flask import current_app
-from sqlalchemy import Column, DateTime, Integer, ForeignKey, Boolean, String, Text, func, JSON
+from sqlalchemy import Column, DateTime, Integer, ForeignKey, Boolean, String, Text, func, JSON, Float, Index, SmallInteger
 from sqlalchemy.orm import relationship
 
 from app import bcrypt
@@ -100,8 +100,28 @@ class User(Base):
 
 class UserActivity(Base):
     __tablename__ = 'user_activity_t'
+    __table_args__ = (
+        # Time range scans (newest first) and the activity API filters; once the
+        # table is partitioned by month (datastore/partitioning.py) each
+        # partition carries these indexes
+        Index('ix_user_activity_on_id', 'user_activity_on', 'id'),
+        Index('ix_user_activity_user_on', 'user_id', 'user_activity_on'),
+        Index('ix_user_activity_endpoint_on', 'endpoint', 'user_activity_on'),
+    )
 
     id = Column("id", Integer, primary_key=True)
     user_id = Column("user_id", Integer, ForeignKey('users_t.id'), nullable=False)
     user_activity = Column("activity_object", JSON, nullable=False)
-    user_activity_on = Column("user_activity_on", DateTime(timezone=True), default=func.now())
+    user_activity_on = Column(
+        "user_activity_on",
+        DateTime(timezone=True),
+        nullable=False,
+        default=func.now(),
+        server_default=func.now()
+    )
+    # Promoted from activity_object so they can be filtered and indexed
+    endpoint = Column("endpoint", String(100), nullable=True, comment="Flask endpoint (blueprint.view)")
+    request_path = Column("request_path", Text, nullable=True)
+    request_method = Column("request_method", String(10), nullable=True)
+    response_status = Column("response_status", SmallInteger, nullable=True)
+    duration_ms = Column("duration_ms", Float, nullable=True)
@@ -3,11 +3,23 @@ Repository layer - Data access abstractions and implementations
 """
 from repositories.user_repository import IUserRepository, UserRepository
 from repositories.organization_repository import IOrganizationRepository, OrganizationRepository
+from repositories.attendance_repository import IAttendanceRepository, AttendanceRepository
+from repositories.employee_repository import IEmployeeRepository, EmployeeRepository
+from repositories.idempotency_repository import IIdempotencyRepository, IdempotencyRepository
+from repositories.user_activity_repository import IUserActivityRepository, UserActivityRepository
 
 __all__ = [
     'IUserRepository',
     'UserRepository',
     'IOrganizationRepository',
     'OrganizationRepository',
+    'IAttendanceRepository',
+    'AttendanceRepository',
+    'IEmployeeRepository',
+    'EmployeeRepository',
+    'IIdempotencyRepository',
+    'IdempotencyRepository',
+    'IUserActivityRepository',
+    'UserActivityRepository',
 ]
 
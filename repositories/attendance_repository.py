@@ -0,0 +1,369 @@
+"""
+Attendance Repository Interface and Implementation
+Following Interface Segregation and Dependency Inversion Principles
+"""
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy.engine import Row
+from models.attendance import AttendanceRecord
+from models.attendance_summary import AttendanceDailySummary
+from models.employee import EmployeeStatusEnum
+
+
+class IAttendanceRepository(ABC):
+    """Interface for Attendance Repository - Interface Segregation Principle"""
+    
+    @abstractmethod
+    def clock_in(
+        self,
+        db: Session,
+        employee_id: UUID,
+        clock_in: datetime,
+        allowed_statuses: Sequence[EmployeeStatusEnum],
+        verify_employee: bool = True,
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> Optional[Row]:
+        """Open an attendance session for an employee"""
+        pass
+    
+    @abstractmethod
+    def clock_out(
+        self,
+        db: Session,
+        employee_id: UUID,
+        clock_out: datetime,
+        work_day_timezone: str,
+        open_since: Optional[datetime] = None
+    ) -> Optional[Row]:
+        """Close the open attendance session of an employee and update the daily rollup"""
+        pass
+    
+    @abstractmethod
+    def bulk_clock_in(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, datetime]],
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> List[Row]:
+        """Open sessions for many employees, skipping those already clocked in"""
+        pass
+    
+    @abstractmethod
+    def insert_accepted_clock_ins(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, UUID, datetime]],
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> List[Row]:
+        """Idempotently insert write-behind clock ins with their preassigned ids, returns each punch's outcome"""
+        pass
+    
+    @abstractmethod
+    def bulk_clock_out(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, datetime]],
+        work_day_timezone: str,
+        open_since: Optional[datetime] = None
+    ) -> List[Row]:
+        """Close the open sessions of many employees and update the daily rollup"""
+        pass
+    
+    @abstractmethod
+    def get_records_page(
+        self,
+        db: Session,
+        limit: int,
+        employee_id: Optional[UUID] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[AttendanceRecord]:
+        """Get a keyset page of attendance records, newest first"""
+        pass
+    
+    @abstractmethod
+    def iter_export_rows(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        employee_id: Optional[UUID] = None,
+        chunk_size: int = 5000
+    ) -> Iterator[Row]:
+        """Stream attendance records with employee code and name, oldest first"""
+        pass
+    
+    @abstractmethod
+    def auto_close_stale(
+        self,
+        db: Session,
+        opened_before: datetime,
+        max_session: timedelta,
+        limit: int = 1000
+    ) -> List[Row]:
+        """Close a batch of sessions open since before opened_before, flagged auto_closed"""
+        pass
+    
+    @abstractmethod
+    def get_present_sessions(
+        self,
+        db: Session,
+        open_since: Optional[datetime] = None,
+        employee_ids: Optional[Sequence[UUID]] = None
+    ) -> List[Row]:
+        """Open sessions with the employee's code, name and location"""
+        pass
+    
+    @abstractmethod
+    def iter_session_epochs(
+        self,
+        db: Session,
+        start: date,
+        end: date,
+        work_day_timezone: str,
+        employee_id: Optional[UUID] = None,
+        chunk_size: int = 50000
+    ) -> Iterator[List[Row]]:
+        """Stream the sessions of a work date range as epoch seconds, in chunks"""
+        pass
+    
+    @abstractmethod
+    def copy_import_staging(self, db: Session, rows_file: IO[str]) -> None:
+        """COPY historical attendance rows into the import staging table"""
+        pass
+    
+    @abstractmethod
+    def merge_import_staging(self, db: Session, by_employee_code: bool = False) -> Tuple[int, List[Row]]:
+        """Insert the staged rows of existing employees, returns (inserted, unknown employee rows)"""
+        pass
+    
+    @abstractmethod
+    def get_daily_summary_page(
+        self,
+        db: Session,
+        start: date,
+        end: date,
+        limit: int,
+        employee_id: Optional[UUID] = None,
+        after: Optional[Tuple[date, UUID]] = None
+    ) -> List[AttendanceDailySummary]:
+        """Get a keyset page of the daily worked-hours rollup"""
+        pass
+    
+    @abstractmethod
+    def rebuild_daily_summary(self, db: Session, start: date, end: date, work_day_timezone: str) -> int:
+        """Recompute the daily rollup for a work date range"""
+        pass
+
+
+class AttendanceRepository(IAttendanceRepository):
+    """Attendance Repository Implementation - Single Responsibility Principle"""
+    
+    def __init__(self, crud_handler, summary_crud_handler):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._crud_handler = crud_handler
+        self._summary_crud_handler = summary_crud_handler
+    
+    def clock_in(
+        self,
+        db: Session,
+        employee_id: UUID,
+        clock_in: datetime,
+        allowed_statuses: Sequence[EmployeeStatusEnum],
+        verify_employee: bool = True,
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> Optional[Row]:
+        """Open an attendance session for an employee"""
+        return self._crud_handler.clock_in(
+            db=db,
+            employee_id=employee_id,
+            clock_in=clock_in,
+            allowed_statuses=allowed_statuses,
+            verify_employee=verify_employee,
+            open_since=open_since,
+            lock_employee=lock_employee
+        )
+    
+    def clock_out(
+        self,
+        db: Session,
+        employee_id: UUID,
+        clock_out: datetime,
+        work_day_timezone: str,
+        open_since: Optional[datetime] = None
+    ) -> Optional[Row]:
+        """Close the open attendance session of an employee and update the daily rollup"""
+        return self._crud_handler.clock_out(
+            db=db,
+            employee_id=employee_id,
+            clock_out=clock_out,
+            work_day_timezone=work_day_timezone,
+            open_since=open_since
+        )
+    
+    def bulk_clock_in(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, datetime]],
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> List[Row]:
+        """Open sessions for many employees, skipping those already clocked in"""
+        return self._crud_handler.bulk_clock_in(
+            db=db,
+            punches=punches,
+            open_since=open_since,
+            lock_employee=lock_employee
+        )
+    
+    def insert_accepted_clock_ins(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, UUID, datetime]],
+        open_since: Optional[datetime] = None,
+        lock_employee: bool = False
+    ) -> List[Row]:
+        """Idempotently insert write-behind clock ins with their preassigned ids, returns each punch's outcome"""
+        return self._crud_handler.insert_accepted_clock_ins(
+            db=db,
+            punches=punches,
+            open_since=open_since,
+            lock_employee=lock_employee
+        )
+    
+    def bulk_clock_out(
+        self,
+        db: Session,
+        punches: Sequence[Tuple[UUID, datetime]],
+        work_day_timezone: str,
+        open_since: Optional[datetime] = None
+    ) -> List[Row]:
+        """Close the open sessions of many employees and update the daily rollup"""
+        return self._crud_handler.bulk_clock_out(
+            db=db,
+            punches=punches,
+            work_day_timezone=work_day_timezone,
+            open_since=open_since
+        )
+    
+    def get_records_page(
+        self,
+        db: Session,
+        limit: int,
+        employee_id: Optional[UUID] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[AttendanceRecord]:
+        """Get a keyset page of attendance records, newest first"""
+        return self._crud_handler.get_records_page(
+            db=db,
+            limit=limit,
+            employee_id=employee_id,
+            start=start,
+            end=end,
+            after=after
+        )
+    
+    def iter_export_rows(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        employee_id: Optional[UUID] = None,
+        chunk_size: int = 5000
+    ) -> Iterator[Row]:
+        """Stream attendance records with employee code and name, oldest first"""
+        return self._crud_handler.iter_export_rows(
+            db=db,
+            start=start,
+            end=end,
+            employee_id=employee_id,
+            chunk_size=chunk_size
+        )
+    
+    def auto_close_stale(
+        self,
+        db: Session,
+        opened_before: datetime,
+        max_session: timedelta,
+        limit: int = 1000
+    ) -> List[Row]:
+        """Close a batch of sessions open since before opened_before, flagged auto_closed"""
+        return self._crud_handler.auto_close_stale(
+            db=db,
+            opened_before=opened_before,
+            max_session=max_session,
+            limit=limit
+        )
+    
+    def get_present_sessions(
+        self,
+        db: Session,
+        open_since: Optional[datetime] = None,
+        employee_ids: Optional[Sequence[UUID]] = None
+    ) -> List[Row]:
+        """Open sessions with the employee's code, name and location"""
+        return self._crud_handler.get_present_sessions(
+            db=db,
+            open_since=open_since,
+            employee_ids=employee_ids
+        )
+    
+    def iter_session_epochs(
+        self,
+        db: Session,
+        start: date,
+        end: date,
+        work_day_timezone: str,
+        employee_id: Optional[UUID] = None,
+        chunk_size: int = 50000
+    ) -> Iterator[List[Row]]:
+        """Stream the sessions of a work date range as epoch seconds, in chunks"""
+        return self._crud_handler.iter_session_epochs(
+            db=db,
+            start=start,
+            end=end,
+            work_day_timezone=work_day_timezone,
+            employee_id=employee_id,
+            chunk_size=chunk_size
+        )
+    
+    def copy_import_staging(self, db: Session, rows_file: IO[str]) -> None:
+        """COPY historical attendance rows into the import staging table"""
+        self._crud_handler.copy_import_staging(db=db, rows_file=rows_file)
+    
+    def merge_import_staging(self, db: Session, by_employee_code: bool = False) -> Tuple[int, List[Row]]:
+        """Insert the staged rows of existing employees, returns (inserted, unknown employee rows)"""
+        return self._crud_handler.merge_import_staging(db=db, by_employee_code=by_employee_code)
+    
+    def get_daily_summary_page(
+        self,
+        db: Session,
+        start: date,
+        end: date,
+        limit: int,
+        employee_id: Optional[UUID] = None,
+        after: Optional[Tuple[date, UUID]] = None
+    ) -> List[AttendanceDailySummary]:
+        """Get a keyset page of the daily worked-hours rollup"""
+        return self._summary_crud_handler.get_page(
+            db=db,
+            start=start,
+            end=end,
+            limit=limit,
+            employee_id=employee_id,
+            after=after
+        )
+    
+    def rebuild_daily_summary(self, db: Session, start: date, end: date, work_day_timezone: str) -> int:
+        """Recompute the daily rollup for a work date range"""
+        return self._summary_crud_handler.rebuild(db=db, start=start, end=end, timezone=work_day_timezone)
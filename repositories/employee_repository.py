@@ -0,0 +1,98 @@
+"""
+Employee Repository Interface and Implementation
+Following Interface Segregation and Dependency Inversion Principles
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from models.employee import EmployeeStatusEnum
+
+
+class IEmployeeRepository(ABC):
+    """Interface for Employee Repository - Interface Segregation Principle"""
+    
+    @abstractmethod
+    def get_statuses(self, db: Session, employee_ids: Iterable[UUID]) -> Dict[UUID, EmployeeStatusEnum]:
+        """Get the status of each existing employee"""
+        pass
+    
+    @abstractmethod
+    def get_status_rows(
+        self, db: Session, updated_since: Optional[datetime] = None
+    ) -> Iterator[Tuple[UUID, EmployeeStatusEnum, datetime]]:
+        """Stream (id, status, updated_at) for all employees or those updated since a time"""
+        pass
+    
+    @abstractmethod
+    def get_page(
+        self,
+        db: Session,
+        columns: Sequence[str],
+        limit: int,
+        status: Optional[EmployeeStatusEnum] = None,
+        city: Optional[str] = None,
+        country: Optional[str] = None,
+        after: Optional[Tuple[str, UUID]] = None
+    ) -> List[Row]:
+        """Keyset page of employees ordered by (last_name, id), selecting only columns"""
+        pass
+    
+    @abstractmethod
+    def get_by_code(self, db: Session, employee_code: str, columns: Sequence[str]) -> Optional[Row]:
+        """Select columns of the employee with this code"""
+        pass
+    
+    @abstractmethod
+    def bulk_upsert(self, db: Session, rows: Sequence[Mapping[str, Any]]) -> List[bool]:
+        """Insert or update employees by employee_code, True per inserted row, False per updated row"""
+        pass
+
+
+class EmployeeRepository(IEmployeeRepository):
+    """Employee Repository Implementation - Single Responsibility Principle"""
+    
+    def __init__(self, crud_handler):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._crud_handler = crud_handler
+    
+    def get_statuses(self, db: Session, employee_ids: Iterable[UUID]) -> Dict[UUID, EmployeeStatusEnum]:
+        """Get the status of each existing employee"""
+        return self._crud_handler.get_statuses(db=db, ids=employee_ids)
+    
+    def get_status_rows(
+        self, db: Session, updated_since: Optional[datetime] = None
+    ) -> Iterator[Tuple[UUID, EmployeeStatusEnum, datetime]]:
+        """Stream (id, status, updated_at) for all employees or those updated since a time"""
+        return self._crud_handler.get_status_rows(db=db, updated_since=updated_since)
+    
+    def get_page(
+        self,
+        db: Session,
+        columns: Sequence[str],
+        limit: int,
+        status: Optional[EmployeeStatusEnum] = None,
+        city: Optional[str] = None,
+        country: Optional[str] = None,
+        after: Optional[Tuple[str, UUID]] = None
+    ) -> List[Row]:
+        """Keyset page of employees ordered by (last_name, id), selecting only columns"""
+        return self._crud_handler.get_page(
+            db=db,
+            columns=columns,
+            limit=limit,
+            status=status,
+            city=city,
+            country=country,
+            after=after
+        )
+    
+    def get_by_code(self, db: Session, employee_code: str, columns: Sequence[str]) -> Optional[Row]:
+        """Select columns of the employee with this code"""
+        return self._crud_handler.get_by_code(db=db, employee_code=employee_code, columns=columns)
+    
+    def bulk_upsert(self, db: Session, rows: Sequence[Mapping[str, Any]]) -> List[bool]:
+        """Insert or update employees by employee_code, True per inserted row, False per updated row"""
+        return self._crud_handler.bulk_upsert(db=db, rows=rows)
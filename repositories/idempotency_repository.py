@@ -0,0 +1,78 @@
+"""
+Idempotency Repository Interface and Implementation
+Following Interface Segregation and Dependency Inversion Principles
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.engine import Row
+
+
+class IIdempotencyRepository(ABC):
+    """Interface for Idempotency Repository - Interface Segregation Principle"""
+
+    @abstractmethod
+    def claim(
+        self, db: Session, scope: str, key: str, fingerprint: str, expires_at: datetime
+    ) -> Optional[Row]:
+        """Claim a key, None when claimed, otherwise the live row"""
+        pass
+
+    @abstractmethod
+    def complete(
+        self, db: Session, scope: str, key: str, status_code: int, response_body: Any, expires_at: datetime
+    ) -> None:
+        """Store the response of a claimed key"""
+        pass
+
+    @abstractmethod
+    def release(self, db: Session, scope: str, key: str) -> None:
+        """Drop an unfinished claim"""
+        pass
+
+    @abstractmethod
+    def purge_expired(self, db: Session, limit: int = 10000) -> int:
+        """Delete expired keys, returns the number deleted"""
+        pass
+
+
+class IdempotencyRepository(IIdempotencyRepository):
+    """Idempotency Repository Implementation - Single Responsibility Principle"""
+
+    def __init__(self, crud_handler):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._crud_handler = crud_handler
+
+    def claim(
+        self, db: Session, scope: str, key: str, fingerprint: str, expires_at: datetime
+    ) -> Optional[Row]:
+        """Claim a key, None when claimed, otherwise the live row"""
+        return self._crud_handler.claim(
+            db=db,
+            scope=scope,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=expires_at
+        )
+
+    def complete(
+        self, db: Session, scope: str, key: str, status_code: int, response_body: Any, expires_at: datetime
+    ) -> None:
+        """Store the response of a claimed key"""
+        self._crud_handler.complete(
+            db=db,
+            scope=scope,
+            key=key,
+            status_code=status_code,
+            response_body=response_body,
+            expires_at=expires_at
+        )
+
+    def release(self, db: Session, scope: str, key: str) -> None:
+        """Drop an unfinished claim"""
+        self._crud_handler.release(db=db, scope=scope, key=key)
+
+    def purge_expired(self, db: Session, limit: int = 10000) -> int:
+        """Delete expired keys, returns the number deleted"""
+        return self._crud_handler.purge_expired(db=db, limit=limit)
@@ -0,0 +1,113 @@
+"""
+User Activity Repository Interface and Implementation
+Following Interface Segregation and Dependency Inversion Principles
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import IO, Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+
+class IUserActivityRepository(ABC):
+    """Interface for User Activity Repository - Interface Segregation Principle"""
+
+    @abstractmethod
+    def create_many(self, db: Session, rows: Sequence[Dict[str, Any]]) -> int:
+        """Insert activity rows, returns the number inserted"""
+        pass
+
+    @abstractmethod
+    def copy_user_activity(self, db: Session, rows_file: IO[str]) -> int:
+        """Bulk-load CSV activity rows, returns the number loaded"""
+        pass
+
+    @abstractmethod
+    def get_page(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        limit: int,
+        user_id: Optional[int] = None,
+        endpoint: Optional[str] = None,
+        method: Optional[str] = None,
+        status: Optional[int] = None,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """Keyset page of activity in [start, end), newest first"""
+        pass
+
+    @abstractmethod
+    def add_hourly_counts(self, db: Session, rows: Sequence[Mapping[str, Any]]) -> int:
+        """Add per (hour, endpoint, method) counts to the hourly rollup"""
+        pass
+
+    @abstractmethod
+    def get_hourly(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        endpoint: Optional[str] = None,
+        method: Optional[str] = None
+    ) -> List[Row]:
+        """Hourly rollup rows of the hours in [start, end)"""
+        pass
+
+
+class UserActivityRepository(IUserActivityRepository):
+    """User Activity Repository Implementation - Single Responsibility Principle"""
+
+    def __init__(self, crud_handler, rollup_crud_handler):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._crud_handler = crud_handler
+        self._rollup_crud_handler = rollup_crud_handler
+
+    def create_many(self, db: Session, rows: Sequence[Dict[str, Any]]) -> int:
+        """Insert activity rows, returns the number inserted"""
+        return self._crud_handler.create_many(db=db, rows=rows)
+
+    def copy_user_activity(self, db: Session, rows_file: IO[str]) -> int:
+        """Bulk-load CSV activity rows, returns the number loaded"""
+        return self._crud_handler.copy_user_activity(db=db, rows_file=rows_file)
+
+    def get_page(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        limit: int,
+        user_id: Optional[int] = None,
+        endpoint: Optional[str] = None,
+        method: Optional[str] = None,
+        status: Optional[int] = None,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """Keyset page of activity in [start, end), newest first"""
+        return self._crud_handler.get_page(
+            db=db,
+            start=start,
+            end=end,
+            limit=limit,
+            user_id=user_id,
+            endpoint=endpoint,
+            method=method,
+            status=status,
+            before=before
+        )
+
+    def add_hourly_counts(self, db: Session, rows: Sequence[Mapping[str, Any]]) -> int:
+        """Add per (hour, endpoint, method) counts to the hourly rollup"""
+        return self._rollup_crud_handler.add_counts(db=db, rows=rows)
+
+    def get_hourly(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        endpoint: Optional[str] = None,
+        method: Optional[str] = None
+    ) -> List[Row]:
+        """Hourly rollup rows of the hours in [start, end)"""
+        return self._rollup_crud_handler.get_hourly(db=db, start=start, end=end, endpoint=endpoint, method=method)
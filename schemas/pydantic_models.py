@@ -1,9 +1,10 @@
 """
 Pydantic models for request and response validation
 """
-from datetime import datetime
-from typing import Optional, List, Any, Dict
-from pydantic import BaseModel, Field, EmailStr, validator
+from datetime import date, datetime, time, timezone
+from typing import Optional, List, Any, Dict, Literal
+from uuid import UUID
+from pydantic import BaseModel, Field, EmailStr, validator, field_validator, model_validator
 
 
 # ==================== REQUEST MODELS ====================
@@ -86,6 +87,208 @@ class UpdateOrganizationRequest(BaseModel):
     position_id: int = Field(..., gt=0, description="Position ID")
 
 
+def _default_to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat timestamps without an offset as UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _to_upper(value: Optional[str]) -> Optional[str]:
+    """Normalize case-insensitive codes such as HTTP methods"""
+    return value.upper() if value else value
+
+
+class PunchRequest(BaseModel):
+    """Single clock in / clock out punch from a badge gateway"""
+    employee_id: UUID = Field(..., description="Employee ID")
+    timestamp: datetime = Field(..., description="Punch time, UTC if no offset is given")
+    direction: Literal['in', 'out'] = Field(..., description="Punch direction: in or out")
+
+    _timestamp_utc = field_validator('timestamp')(_default_to_utc)
+
+
+class BatchPunchRequest(BaseModel):
+    """Request model for applying buffered punches in one transaction"""
+    gateway_id: Optional[str] = Field(None, description="Gateway / door controller ID")
+    punches: List[PunchRequest] = Field(..., min_length=1, max_length=5000, description="Punches")
+
+
+class AttendanceRecordsQuery(BaseModel):
+    """Query parameters for keyset-paginated attendance history"""
+    from_: Optional[datetime] = Field(None, alias='from', description="Clock in on or after, UTC if no offset")
+    to: Optional[datetime] = Field(None, description="Clock in before, UTC if no offset")
+    limit: int = Field(100, ge=1, le=1000, description="Page size")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+
+    _range_utc = field_validator('from_', 'to')(_default_to_utc)
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.from_ is not None and self.to is not None and self.to < self.from_:
+            raise ValueError("'to' must not be before 'from'")
+        return self
+
+
+class AttendanceSummaryQuery(BaseModel):
+    """Query parameters for the daily worked-hours summary"""
+    from_: date = Field(..., alias='from', description="First work date")
+    to: date = Field(..., description="Last work date (inclusive)")
+    employee_id: Optional[UUID] = Field(None, description="Only this employee")
+    limit: int = Field(500, ge=1, le=5000, description="Page size")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.to < self.from_:
+            raise ValueError("'to' must not be before 'from'")
+        return self
+
+
+class AttendanceExportQuery(BaseModel):
+    """Query parameters for the streaming attendance export"""
+    from_: datetime = Field(..., alias='from', description="Clock in on or after, UTC if no offset")
+    to: datetime = Field(..., description="Clock in before, UTC if no offset")
+    employee_id: Optional[UUID] = Field(None, description="Only this employee")
+    format: Literal['csv', 'ndjson'] = Field('csv', description="Export format: csv or ndjson")
+
+    _range_utc = field_validator('from_', 'to')(_default_to_utc)
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.to <= self.from_:
+            raise ValueError("'to' must be after 'from'")
+        return self
+
+
+class AttendanceReportQuery(BaseModel):
+    """Query parameters for the hours, overtime and lateness report"""
+    from_: date = Field(..., alias='from', description="First work date")
+    to: date = Field(..., description="Last work date (inclusive)")
+    employee_id: Optional[UUID] = Field(None, description="Only this employee")
+    shift_start: Optional[time] = Field(None, description="Local shift start, later first clock ins are late")
+    late_grace_minutes: Optional[int] = Field(None, ge=0, description="Minutes after shift start still on time")
+    daily_overtime_hours: Optional[float] = Field(None, gt=0, description="Worked hours per day before overtime")
+    max_session_hours: Optional[float] = Field(None, gt=0, description="Longer or older open sessions count as a missing punch")
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.to < self.from_:
+            raise ValueError("'to' must not be before 'from'")
+        return self
+
+
+class AttendancePresenceQuery(BaseModel):
+    """Query parameters for the currently clocked in headcount and roster"""
+    group_by: Optional[Literal['city', 'country']] = Field(None, description="Also count per city or country")
+    city: Optional[str] = Field(None, description="Only employees of this city")
+    country: Optional[str] = Field(None, description="Only employees of this country")
+    limit: int = Field(100, ge=0, le=5000, description="Roster page size, 0 for counts only")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+
+
+# Columns an employee projection may select; the default is the compact set
+EMPLOYEE_FIELDS = (
+    'id', 'employee_code', 'first_name', 'last_name', 'date_of_birth', 'email',
+    'city', 'country', 'status', 'created_at', 'updated_at'
+)
+DEFAULT_EMPLOYEE_FIELDS = ('id', 'employee_code', 'first_name', 'last_name', 'status')
+
+
+def _parse_employee_fields(value):
+    """Comma-separated fields parameter -> tuple of known employee fields"""
+    if value is None or isinstance(value, tuple):
+        return value
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in EMPLOYEE_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"fields must be a comma-separated subset of {', '.join(EMPLOYEE_FIELDS)}")
+    return fields
+
+
+class EmployeeFieldsQuery(BaseModel):
+    """Query parameters selecting the columns of an employee projection"""
+    fields: Optional[Any] = Field(None, description="Comma-separated columns to return")
+
+    _fields = field_validator('fields', mode='before')(_parse_employee_fields)
+
+
+class EmployeeListQuery(EmployeeFieldsQuery):
+    """Query parameters for the keyset-paginated employee directory"""
+    status: Optional[Literal['ACTIVE', 'INACTIVE', 'TERMINATED', 'ON_LEAVE']] = Field(None, description="Only this status")
+    city: Optional[str] = Field(None, description="Only employees of this city")
+    country: Optional[str] = Field(None, description="Only employees of this country")
+    limit: int = Field(100, ge=1, le=1000, description="Page size")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+
+
+class EmployeeUpsertRow(BaseModel):
+    """One employee of an HRIS sync, matched on employee_code"""
+    employee_code: str = Field(..., min_length=1, max_length=50, description="Employee code")
+    first_name: str = Field(..., min_length=1, max_length=100, description="First name")
+    last_name: str = Field(..., min_length=1, max_length=100, description="Last name")
+    date_of_birth: date = Field(..., description="Date of birth")
+    email: EmailStr = Field(..., description="Email address")
+    city: Optional[str] = Field(None, max_length=100, description="City")
+    country: Optional[str] = Field(None, max_length=100, description="Country")
+    status: Literal['ACTIVE', 'INACTIVE', 'TERMINATED', 'ON_LEAVE'] = Field('ACTIVE', description="Employee status")
+
+
+class EmployeeBulkUpsertRequest(BaseModel):
+    """Request model for inserting or updating employees by employee_code"""
+    employees: List[EmployeeUpsertRow] = Field(..., min_length=1, max_length=10000, description="Employees")
+
+    @model_validator(mode='after')
+    def check_unique_codes(self):
+        # ON CONFLICT cannot update the same row twice in one statement
+        seen, duplicates = set(), set()
+        for row in self.employees:
+            if row.employee_code in seen:
+                duplicates.add(row.employee_code)
+            seen.add(row.employee_code)
+        if duplicates:
+            raise ValueError(f"employee_code must be unique within a request: {', '.join(sorted(duplicates))}")
+        return self
+
+
+class ActivityQuery(BaseModel):
+    """Query parameters for the keyset-paginated user activity log"""
+    from_: datetime = Field(..., alias='from', description="Activity on or after, UTC if no offset")
+    to: datetime = Field(..., description="Activity before, UTC if no offset")
+    user_id: Optional[int] = Field(None, gt=0, description="Only this user")
+    endpoint: Optional[str] = Field(None, description="Only this Flask endpoint, e.g. attendance.clock_in")
+    method: Optional[str] = Field(None, description="Only this HTTP method")
+    status: Optional[int] = Field(None, ge=100, le=599, description="Only this response status")
+    limit: int = Field(100, ge=1, le=1000, description="Page size")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page")
+
+    _range_utc = field_validator('from_', 'to')(_default_to_utc)
+    _method_upper = field_validator('method')(_to_upper)
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.to <= self.from_:
+            raise ValueError("'to' must be after 'from'")
+        return self
+
+
+class ActivityRollupQuery(BaseModel):
+    """Query parameters for the hourly request rollup"""
+    from_: datetime = Field(..., alias='from', description="First hour, UTC if no offset")
+    to: datetime = Field(..., description="End of the range (exclusive), UTC if no offset")
+    endpoint: Optional[str] = Field(None, description="Only this Flask endpoint")
+    method: Optional[str] = Field(None, description="Only this HTTP method")
+    interval: Literal['hour', 'total'] = Field('total', description="One row per route per hour, or per route for the range")
+
+    _range_utc = field_validator('from_', 'to')(_default_to_utc)
+    _method_upper = field_validator('method')(_to_upper)
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.to <= self.from_:
+            raise ValueError("'to' must be after 'from'")
+        return self
+
 class UploadProfileRequest(BaseModel):
     """Request model for uploading profile"""
     username: str = Field(..., min_length=1, description="Username")
@@ -155,6 +358,8 @@ class AttendanceData(BaseModel):
     employee_id: Optional[str] = None
     clock_in: Optional[datetime] = None
     clock_out: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    auto_closed: Optional[bool] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -163,9 +368,158 @@ class AttendanceData(BaseModel):
         extra = 'ignore'
 
 
+class AttendanceListResponse(BaseModel):
+    """Response model for a page of attendance records"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Records and next_cursor")
+
+
+class AttendanceSummaryData(BaseModel):
+    """Daily worked-hours rollup of one employee"""
+    employee_id: str
+    work_date: date
+    first_in: datetime
+    last_out: datetime
+    total_seconds: float
+    session_count: int
+
+
+class AttendanceSummaryResponse(BaseModel):
+    """Response model for a page of daily summaries"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Summaries and next_cursor")
+
+
+class AttendanceReportRow(BaseModel):
+    """Hours, overtime and lateness of one employee over a report range"""
+    employee_id: str
+    total_seconds: float
+    session_count: int
+    days_worked: int
+    overtime_seconds: float
+    late_arrivals: int
+    missing_punches: int
+
+
+class AttendanceReportResponse(BaseModel):
+    """Response model for the attendance report"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Per-employee rows and report parameters")
+
+
+class PresentEmployeeData(BaseModel):
+    """An employee who is clocked in, with the open session"""
+    employee_id: str
+    attendance_id: str
+    clock_in: datetime
+    employee_code: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+
+
+class AttendancePresenceResponse(BaseModel):
+    """Response model for the currently clocked in headcount and roster"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Count, groups, roster page and next_cursor")
+
+
 class AttendanceResponse(BaseModel):
     """Response model for attendance operations"""
     status: str = Field(..., description="Status")
     message: str = Field(..., description="Message")
     data: Optional[AttendanceData] = Field(None, description="Attendance data")
 
+
+class PunchResult(BaseModel):
+    """Outcome of a single punch in a batch"""
+    index: int = Field(..., description="Position of the punch in the request")
+    employee_id: str = Field(..., description="Employee ID")
+    direction: str = Field(..., description="Punch direction")
+    status: Literal['created', 'closed', 'conflict', 'not_found', 'inactive'] = Field(..., description="Outcome")
+    attendance_id: Optional[str] = Field(None, description="Attendance record ID")
+
+
+class BatchPunchResponse(BaseModel):
+    """Response model for batch punches"""
+    status: str = Field(..., description="Status")
+    message: str = Field(..., description="Message")
+    data: Dict[str, Any] = Field(..., description="Per-punch results and counts")
+
+
+# ==================== EMPLOYEE MODELS ====================
+
+class EmployeeData(BaseModel):
+    """Employee projection; only the requested fields are set"""
+    id: Optional[str] = None
+    employee_code: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    date_of_birth: Optional[date] = None
+    email: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class EmployeeListResponse(BaseModel):
+    """Response model for a page of the employee directory"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Employees and next_cursor")
+
+
+class EmployeeResponse(BaseModel):
+    """Response model for a single employee"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Employee projection")
+
+
+class EmployeeBulkUpsertResponse(BaseModel):
+    """Response model for a bulk employee upsert"""
+    status: str = Field(..., description="Status")
+    message: str = Field(..., description="Message")
+    data: Dict[str, int] = Field(..., description="inserted, updated and unchanged counts")
+
+
+# ==================== ACTIVITY MODELS ====================
+
+class ActivityData(BaseModel):
+    """One recorded request"""
+    id: int
+    user_id: Optional[int] = None
+    user_activity_on: datetime
+    endpoint: Optional[str] = None
+    request_path: Optional[str] = None
+    request_method: Optional[str] = None
+    response_status: Optional[int] = None
+    duration_ms: Optional[float] = None
+    details: Optional[Dict[str, Any]] = Field(None, description="Full activity object")
+
+
+class ActivityListResponse(BaseModel):
+    """Response model for a page of the user activity log"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Activity and next_cursor")
+
+
+class ActivityRollupData(BaseModel):
+    """Request counts and latency of one route (per hour, or for the whole range)"""
+    hour: Optional[datetime] = None
+    endpoint: str
+    method: str
+    requests: int
+    client_errors: int
+    errors: int
+    mean_ms: Optional[float] = None
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+
+
+class ActivityRollupResponse(BaseModel):
+    """Response model for the hourly request rollup"""
+    status: str = Field(..., description="Status")
+    data: Dict[str, Any] = Field(..., description="Rollup rows")
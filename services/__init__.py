@@ -4,10 +4,20 @@ Service layer - Business logic
 from services.auth_service import AuthService
 from services.user_service import UserService
 from services.organization_service import OrganizationService
+from services.attendance_service import AttendanceService
+from services.attendance_report_service import AttendanceReportService
+from services.attendance_import_service import AttendanceImportService
+from services.employee_service import EmployeeService
+from services.activity_service import ActivityService
 
 __all__ = [
     'AuthService',
     'UserService',
     'OrganizationService',
+    'AttendanceService',
+    'AttendanceReportService',
+    'AttendanceImportService',
+    'EmployeeService',
+    'ActivityService',
 ]
 
@@ -0,0 +1,214 @@
+"""
+Activity Log Spool - record request activity to local disk, load it with COPY
+Following Single Responsibility Principle
+"""
+import atexit
+import csv
+import io
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from util.spool import Spool, read_segment
+
+logger = logging.getLogger(__name__)
+
+# Activity row keys, spooled as a JSON array in the column order of
+# copy_user_activity
+_COLUMNS = (
+    'user_id', 'user_activity', 'user_activity_on', 'endpoint',
+    'request_path', 'request_method', 'response_status', 'duration_ms'
+)
+
+
+class ActivityLogSpool:
+    """
+    Append-only local spool of user activity rows
+
+    record() appends the row to this worker's spool (util.spool, length
+    prefixed, segments sealed at segment_bytes) and never touches the
+    database. Every flush_interval_ms a loader thread seals the current
+    segment and bulk-loads the sealed segments into user_activity_t with
+    COPY, one transaction per segment, deleting each once loaded. While
+    the database is unavailable segments accumulate and loading is retried
+    with backoff; past max_bytes of spooled data new rows are dropped.
+    Rows without a user_id (anonymous requests) are never spooled, user_id
+    being NOT NULL. A segment rejected by the database (e.g. a user_id that
+    does not exist) is split in halves and each loaded again in a
+    savepoint of the same transaction, down to the single rejected rows,
+    which are dropped; the rest commits together, so a segment that fails
+    otherwise midway is retried without loading any row twice.
+
+    At exit the spool is loaded once more; whatever is left (and the spool
+    of a worker that crashed) is loaded by the next worker that starts, or
+    by flask activity replay-spool.
+    """
+
+    def __init__(
+        self,
+        repository,
+        session_factory,
+        spool_dir: str,
+        segment_bytes: int = 4 * 1024 * 1024,
+        max_bytes: int = 512 * 1024 * 1024,
+        flush_interval_ms: int = 1000,
+        fsync: bool = False
+    ):
+        """Spool location, segment and total size bounds, load interval and fsync of the spooled rows"""
+        self._repository = repository
+        self._session_factory = session_factory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval_ms / 1000
+        self._spool = Spool(spool_dir, segment_records=None, fsync=fsync, segment_bytes=segment_bytes)
+        # Guards the spool, appended to by request threads and acknowledged by the loader
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.flush_errors = 0
+
+    def record(self, row: Dict[str, Any]) -> bool:
+        """Append an activity row to the spool, False when it is full or the row has no user"""
+        if row.get('user_id') is None:
+            self.skipped += 1
+            return False
+        self.start()
+        record = json.dumps([row.get(column) for column in _COLUMNS], default=_isoformat).encode()
+        with self._lock:
+            if self._closed or self._spool.size >= self.max_bytes:
+                self.dropped += 1
+                return False
+            try:
+                self._spool.append(record)
+            except OSError:
+                # Activity is best effort: never fail the request over it
+                self.dropped += 1
+                logger.error("ActivityLogSpool: appending to the spool failed", exc_info=True)
+                return False
+            self.recorded += 1
+        return True
+
+    def start(self) -> None:
+        """Open the spool and start the loader on first use in this process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._spool.open()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='activity-log-spool',
+                    daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10) -> None:
+        """Load what is spooled and stop the loader"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            'spooled_bytes': self._spool.size,
+            'max_bytes': self.max_bytes,
+            'recorded': self.recorded,
+            'written': self.written,
+            'dropped': self.dropped,
+            'skipped': self.skipped,
+            'replayed': self.replayed,
+            'rejected': self.rejected,
+            'flush_errors': self.flush_errors
+        }
+
+    def replay_orphans(self) -> int:
+        """Load the spools of exited or crashed workers, returns the number of rows"""
+        replayed = self._spool.recover_orphans(self.load)
+        self.replayed += replayed
+        return replayed
+
+    def _run(self) -> None:
+        try:
+            self.replay_orphans()
+        except Exception:
+            self.flush_errors += 1
+            logger.error("ActivityLogSpool: spool replay failed", exc_info=True)
+        backoff = self.flush_interval
+        while not self._stop.wait(backoff):
+            backoff = self.flush_interval if self._flush() else min(backoff * 2, 30)
+        self._flush()
+        with self._lock:
+            self._closed = True
+            self._spool.close()
+
+    def _flush(self) -> bool:
+        """Load the sealed segments oldest first, False when loading failed"""
+        with self._lock:
+            self._spool.rotate()
+            segments = self._spool.sealed_segments()
+        for path, records in segments:
+            try:
+                self.load(list(read_segment(path)))
+            except Exception:
+                self.flush_errors += 1
+                logger.error(f"ActivityLogSpool: loading {path} failed", exc_info=True)
+                return False
+            with self._lock:
+                self._spool.acknowledge(records)
+        return True
+
+    def load(self, records: List[bytes]) -> int:
+        """COPY spooled records into user_activity_t in one transaction, leaving out the rows it rejects"""
+        with self._session_factory() as db:
+            try:
+                loaded = self._repository.copy_user_activity(db=db, rows_file=_to_csv(records))
+            except (IntegrityError, DataError):
+                # Nothing is committed until every half is loaded, so any
+                # other failure leaves the whole segment to be retried
+                db.rollback()
+                loaded = self._load_halves(db, records)
+        self.written += loaded
+        return loaded
+
+    def _load_halves(self, db, records: List[bytes]) -> int:
+        """COPY the records in a savepoint, halving them down to the single rejected rows"""
+        savepoint = db.begin_nested()
+        try:
+            loaded = self._repository.copy_user_activity(db=db, rows_file=_to_csv(records))
+        except (IntegrityError, DataError):
+            savepoint.rollback()
+            if len(records) == 1:
+                self.rejected += 1
+                logger.warning(f"ActivityLogSpool: dropped a row rejected by the database: {records[0][:500]!r}")
+                return 0
+            middle = len(records) // 2
+            return self._load_halves(db, records[:middle]) + self._load_halves(db, records[middle:])
+        savepoint.commit()
+        return loaded
+
+
+def _to_csv(records: List[bytes]) -> io.StringIO:
+    """Spooled records as CSV in the column order of copy_user_activity"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        values = json.loads(record)
+        values[1] = json.dumps(values[1])
+        writer.writerow(values)
+    buffer.seek(0)
+    return buffer
+
+
+def _isoformat(value):
+    return value.isoformat()
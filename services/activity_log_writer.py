@@ -0,0 +1,153 @@
+"""
+Activity Log Writer - record request activity off the request path
+Following Single Responsibility Principle
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogWriter:
+    """
+    Bounded in-process buffer of user activity rows
+
+    record() only appends to the buffer; a background thread writes the
+    buffer to user_activity_t in one multi-row INSERT per batch
+    (batch_size rows, or whatever is buffered after flush_interval_ms).
+    Activity is best effort: when the buffer is full new rows are dropped,
+    and a batch whose write fails is discarded, both counted in stats().
+    Rows without a user_id (anonymous requests) are skipped, user_id being
+    NOT NULL. A batch the database rejects (IntegrityError, DataError) is
+    retried row by row, so only the offending rows are lost. What is
+    buffered is written when the worker exits.
+    """
+
+    def __init__(
+        self,
+        repository,
+        session_factory,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 1000
+    ):
+        """Buffer bound and batching of the rows written through the repository"""
+        self._repository = repository
+        self._session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        # (row, buffered at), oldest first
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.failed = 0
+        self.flush_errors = 0
+
+    def record(self, row: Dict[str, Any]) -> bool:
+        """Buffer an activity row without waiting, False when the buffer is full or the row has no user"""
+        if row.get('user_id') is None:
+            self.skipped += 1
+            return False
+        self.start()
+        with self._condition:
+            if len(self._buffer) >= self.max_size:
+                self.dropped += 1
+                return False
+            self._buffer.append((row, time.monotonic()))
+            self.recorded += 1
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify_all()
+        return True
+
+    def start(self) -> None:
+        """Start the writer thread on first use in this process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='activity-log-writer',
+                    daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10) -> None:
+        """Write what is buffered and stop the writer thread"""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            'buffered': len(self._buffer),
+            'max_size': self.max_size,
+            'recorded': self.recorded,
+            'written': self.written,
+            'dropped': self.dropped,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'flush_errors': self.flush_errors
+        }
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                with self._session_factory() as db:
+                    self.written += self._repository.create_many(db=db, rows=batch)
+            except (IntegrityError, DataError):
+                self._write_rows(batch)
+            except Exception:
+                self.flush_errors += 1
+                self.failed += len(batch)
+                logger.error(f"ActivityLogWriter: writing {len(batch)} activity rows failed", exc_info=True)
+                self._stop.wait(self.flush_interval)
+
+    def _write_rows(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a rejected batch one row per transaction, dropping the rows the database rejects"""
+        rejected = []
+        for row in batch:
+            try:
+                with self._session_factory() as db:
+                    self.written += self._repository.create_many(db=db, rows=[row])
+            except (IntegrityError, DataError) as e:
+                self.failed += 1
+                rejected.append(str(e.orig).splitlines()[0])
+        if rejected:
+            logger.warning(
+                f"ActivityLogWriter: dropped {len(rejected)} of {len(batch)} activity rows rejected "
+                f"by the database, first: {rejected[0]}"
+            )
+
+    def _next_batch(self) -> Optional[List[Dict[str, Any]]]:
+        """Take a full batch, or what is buffered after the flush interval; None once stopped and empty"""
+        with self._condition:
+            while True:
+                if self._buffer:
+                    age = time.monotonic() - self._buffer[0][1]
+                    if len(self._buffer) >= self.batch_size or age >= self.flush_interval or self._stop.is_set():
+                        return [self._buffer.popleft()[0] for _ in range(min(self.batch_size, len(self._buffer)))]
+                    self._condition.wait(self.flush_interval - age)
+                elif self._stop.is_set():
+                    return None
+                else:
+                    self._condition.wait()
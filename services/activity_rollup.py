@@ -0,0 +1,156 @@
+"""
+Activity Rollup - per-worker hourly request counts, flushed to user_activity_hourly_t
+Following Single Responsibility Principle
+"""
+import atexit
+import logging
+import threading
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from util.histogram import LATENCY_BUCKETS_MS
+
+logger = logging.getLogger(__name__)
+
+
+class _Counts:
+    __slots__ = ('requests', 'client_errors', 'errors', 'duration_ms_total', 'latency_buckets')
+
+    def __init__(self):
+        self.requests = 0
+        self.client_errors = 0
+        self.errors = 0
+        self.duration_ms_total = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def merge(self, other: '_Counts') -> None:
+        self.requests += other.requests
+        self.client_errors += other.client_errors
+        self.errors += other.errors
+        self.duration_ms_total += other.duration_ms_total
+        self.latency_buckets = [a + b for a, b in zip(self.latency_buckets, other.latency_buckets)]
+
+
+class ActivityRollup:
+    """
+    Hourly request counts of this worker, per endpoint and method
+
+    add() is called for every request (before activity sampling) and only
+    updates an in-memory counter. A background thread adds the counters to
+    user_activity_hourly_t every flush_seconds with one upsert, so the
+    rollup is exact while user_activity_t is sampled. Counters whose flush
+    failed are kept and retried with the next flush; the rest is flushed
+    when the worker exits.
+    """
+
+    def __init__(self, repository, session_factory, flush_seconds: float = 10):
+        """How often the pending counts are added through the repository"""
+        self._repository = repository
+        self._session_factory = session_factory
+        self.flush_seconds = flush_seconds
+        # (hour, endpoint, method) -> counts not flushed yet
+        self._pending: Dict[Tuple[datetime, str, str], _Counts] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def add(
+        self,
+        endpoint: Optional[str],
+        method: str,
+        status_code: int,
+        duration_ms: Optional[float],
+        at: Optional[datetime] = None
+    ) -> None:
+        """Count one request"""
+        self.start()
+        hour = (at or datetime.now(timezone.utc)).replace(minute=0, second=0, microsecond=0)
+        key = (hour, endpoint or '', method)
+        with self._lock:
+            counts = self._pending.get(key)
+            if counts is None:
+                counts = self._pending[key] = _Counts()
+            counts.requests += 1
+            if status_code >= 500:
+                counts.errors += 1
+            elif status_code >= 400:
+                counts.client_errors += 1
+            if duration_ms is not None:
+                counts.duration_ms_total += duration_ms
+                counts.latency_buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def flush(self) -> int:
+        """Add the pending counters to the rollup table, returns the number of rows written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows: List[dict] = [
+            {
+                'hour': hour,
+                'endpoint': endpoint,
+                'method': method,
+                'requests': counts.requests,
+                'client_errors': counts.client_errors,
+                'errors': counts.errors,
+                'duration_ms_total': counts.duration_ms_total,
+                'latency_buckets': counts.latency_buckets
+            }
+            for (hour, endpoint, method), counts in pending.items()
+        ]
+        try:
+            with self._session_factory() as db:
+                self._repository.add_hourly_counts(db=db, rows=rows)
+        except Exception:
+            with self._lock:
+                for key, counts in pending.items():
+                    current = self._pending.get(key)
+                    if current is None:
+                        self._pending[key] = counts
+                    else:
+                        current.merge(counts)
+            raise
+        self.flushed += len(rows)
+        return len(rows)
+
+    def start(self) -> None:
+        """Start the flusher on first use in this process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='activity-rollup',
+                    daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10) -> None:
+        """Flush the pending counters and stop the flusher"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            'pending': len(self._pending),
+            'flushed': self.flushed,
+            'flush_errors': self.flush_errors
+        }
+
+    def _run(self) -> None:
+        while True:
+            stopping = self._stop.wait(self.flush_seconds)
+            try:
+                self.flush()
+            except Exception:
+                self.flush_errors += 1
+                logger.error("ActivityRollup: flushing the hourly rollup failed", exc_info=True)
+            if stopping:
+                return
@@ -0,0 +1,142 @@
+"""
+Activity Service - Business Logic Layer
+Following Single Responsibility Principle
+"""
+from datetime import datetime
+from typing import Dict, Tuple
+from sqlalchemy.orm import Session
+from schemas.pydantic_models import (
+    ActivityData,
+    ActivityListResponse,
+    ActivityQuery,
+    ActivityRollupData,
+    ActivityRollupQuery,
+    ActivityRollupResponse,
+)
+from repositories.user_activity_repository import IUserActivityRepository
+from util.histogram import histogram_percentile
+from util.pagination import encode_cursor, decode_cursor
+
+
+class ActivityService:
+    """Activity Service - Single Responsibility: Handle user activity queries"""
+
+    def __init__(self, user_activity_repository: IUserActivityRepository):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._user_activity_repository = user_activity_repository
+
+    def list_activity(self, db: Session, query: ActivityQuery) -> ActivityListResponse:
+        """
+        Get a keyset page of recorded requests in a time range, newest first
+
+        Only sampled requests are recorded (USER_ACTIVITY_RULES); use the
+        rollup for counts.
+
+        Raises:
+            ValidationException: If the cursor is malformed
+        """
+        before = decode_cursor(query.cursor, datetime, int) if query.cursor else None
+        rows = self._user_activity_repository.get_page(
+            db=db,
+            start=query.from_,
+            end=query.to,
+            limit=query.limit + 1,
+            user_id=query.user_id,
+            endpoint=query.endpoint,
+            method=query.method,
+            status=query.status,
+            before=before
+        )
+
+        next_cursor = None
+        if len(rows) > query.limit:
+            rows = rows[:query.limit]
+            next_cursor = encode_cursor(rows[-1].user_activity_on, rows[-1].id)
+
+        return ActivityListResponse(
+            status='success',
+            data={
+                'activity': [
+                    ActivityData(
+                        id=row.id,
+                        user_id=row.user_id,
+                        user_activity_on=row.user_activity_on,
+                        endpoint=row.endpoint,
+                        request_path=row.request_path,
+                        request_method=row.request_method,
+                        response_status=row.response_status,
+                        duration_ms=row.duration_ms,
+                        details=row.activity_object
+                    ).model_dump(mode='json')
+                    for row in rows
+                ],
+                'next_cursor': next_cursor
+            }
+        )
+
+    def get_rollups(self, db: Session, query: ActivityRollupQuery) -> ActivityRollupResponse:
+        """
+        Get request counts, error counts and latency percentiles per route
+
+        With interval 'hour' there is one row per route and hour; with
+        'total' the hours of the range are merged (histograms added) into
+        one row per route, busiest first.
+        """
+        rows = self._user_activity_repository.get_hourly(
+            db=db,
+            start=query.from_,
+            end=query.to,
+            endpoint=query.endpoint,
+            method=query.method
+        )
+        if query.interval == 'total':
+            merged: Dict[Tuple[str, str], dict] = {}
+            for row in rows:
+                total = merged.get((row.endpoint, row.method))
+                if total is None:
+                    merged[(row.endpoint, row.method)] = {
+                        'hour': None,
+                        'endpoint': row.endpoint,
+                        'method': row.method,
+                        'requests': row.requests,
+                        'client_errors': row.client_errors,
+                        'errors': row.errors,
+                        'duration_ms_total': row.duration_ms_total,
+                        'latency_buckets': list(row.latency_buckets)
+                    }
+                    continue
+                total['requests'] += row.requests
+                total['client_errors'] += row.client_errors
+                total['errors'] += row.errors
+                total['duration_ms_total'] += row.duration_ms_total
+                total['latency_buckets'] = [a + b for a, b in zip(total['latency_buckets'], row.latency_buckets)]
+            rows = sorted(merged.values(), key=lambda total: -total['requests'])
+        else:
+            rows = [row._asdict() for row in rows]
+
+        return ActivityRollupResponse(
+            status='success',
+            data={'routes': [_to_rollup_data(row).model_dump(mode='json') for row in rows]}
+        )
+
+
+def _to_rollup_data(row: dict) -> ActivityRollupData:
+    """Counts and latency percentiles of a rollup row (or merged rows)"""
+    buckets = row['latency_buckets']
+    timed = sum(buckets)
+    return ActivityRollupData(
+        hour=row['hour'],
+        endpoint=row['endpoint'],
+        method=row['method'],
+        requests=row['requests'],
+        client_errors=row['client_errors'],
+        errors=row['errors'],
+        mean_ms=round(row['duration_ms_total'] / timed, 3) if timed else None,
+        p50_ms=_round(histogram_percentile(buckets, 0.5)),
+        p95_ms=_round(histogram_percentile(buckets, 0.95)),
+        p99_ms=_round(histogram_percentile(buckets, 0.99))
+    )
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
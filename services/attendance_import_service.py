@@ -0,0 +1,191 @@
+"""
+Attendance Import Service - bulk load of historical punches
+Following Single Responsibility Principle
+"""
+import csv
+import io
+from datetime import date, datetime, timezone
+from typing import IO, Dict, Iterator, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from dateutil import parser as date_parser, tz
+
+from datastore import partitioning
+from repositories.attendance_repository import IAttendanceRepository
+from exceptions.app_exceptions import ValidationException
+
+# Columns of the rejected rows file
+REJECT_COLUMNS = ('line', 'employee_key', 'clock_in', 'clock_out', 'reason')
+
+
+class ImportChunkResult(NamedTuple):
+    """Outcome of one imported chunk"""
+    lines: int                      # data lines read
+    inserted: int                   # attendance records created
+    skipped: int                    # already imported or conflicting with an open session
+    rejected: int                   # invalid rows and rows of unknown employees
+    first_work_date: Optional[date]
+    last_work_date: Optional[date]
+
+
+class AttendanceImportService:
+    """Attendance Import Service - Single Responsibility: Load historical attendance in bulk"""
+
+    def __init__(
+        self,
+        attendance_repository: IAttendanceRepository,
+        session_factory,
+        work_day_timezone: str = 'UTC',
+        partitioned: bool = False,
+        chunk_size: int = 100000
+    ):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._attendance_repository = attendance_repository
+        # Context manager yielding a Session; each chunk is one transaction
+        self._session_factory = session_factory
+        # Work dates of imported sessions, for rebuilding the daily rollup
+        self._work_day_tz = tz.gettz(work_day_timezone)
+        # Create missing monthly partitions for the imported range
+        self._partitioned = partitioned
+        self._chunk_size = chunk_size
+
+    def import_csv(
+        self, source: IO[str], rejects: IO[str], default_timezone: str = 'UTC'
+    ) -> Iterator[ImportChunkResult]:
+        """
+        Import a CSV file of historical sessions
+
+        The header must have employee_id or employee_code, clock_in and
+        clock_out (ISO 8601, default_timezone when there is no offset).
+        Sessions without a clock_out are rejected rather than imported as
+        open sessions, which would keep the employee clocked in. Rows are validated while reading, COPYed into a staging
+        table chunk_size at a time and merged with one INSERT ... SELECT
+        joined to hr.employee_t per chunk, each chunk in its own transaction.
+        Invalid rows and rows of unknown employees are written to rejects.
+
+        Returns:
+            Iterator of ImportChunkResult, one per committed chunk
+
+        Raises:
+            ValidationException: If the header lacks a required column
+        """
+        reader = csv.DictReader(source)
+        fields = reader.fieldnames or []
+        if 'employee_id' in fields:
+            key_column = 'employee_id'
+        elif 'employee_code' in fields:
+            key_column = 'employee_code'
+        else:
+            raise ValidationException(message='Import file needs an employee_id or employee_code column.')
+        if 'clock_in' not in fields or 'clock_out' not in fields:
+            raise ValidationException(message='Import file needs clock_in and clock_out columns.')
+
+        naive_tz = tz.gettz(default_timezone)
+        reject_writer = csv.writer(rejects)
+        chunk = _ImportChunk()
+        for row in reader:
+            line = reader.line_num
+            key = (row.get(key_column) or '').strip()
+            raw_in = (row.get('clock_in') or '').strip()
+            raw_out = (row.get('clock_out') or '').strip()
+            chunk.lines += 1
+            try:
+                if key_column == 'employee_id':
+                    key = _parse_uuid(key)
+                elif not key:
+                    raise ValueError('missing employee_code')
+                clock_in = _parse_timestamp(raw_in, naive_tz, 'clock_in')
+                if not raw_out:
+                    raise ValueError('missing clock_out')
+                clock_out = _parse_timestamp(raw_out, naive_tz, 'clock_out')
+                if clock_out < clock_in:
+                    raise ValueError('clock_out before clock_in')
+            except ValueError as e:
+                reject_writer.writerow((line, key, raw_in, raw_out, str(e) or 'invalid value'))
+                chunk.rejected += 1
+                continue
+
+            chunk.add(line, key, clock_in, clock_out, (raw_in, raw_out), self._work_day_tz)
+            if chunk.staged >= self._chunk_size:
+                yield self._flush(chunk, key_column, reject_writer)
+                chunk = _ImportChunk()
+        if chunk.lines:
+            yield self._flush(chunk, key_column, reject_writer)
+
+    def _flush(self, chunk: '_ImportChunk', key_column: str, reject_writer) -> ImportChunkResult:
+        """COPY and merge one chunk in a single transaction"""
+        inserted = 0
+        unknown = []
+        if chunk.staged:
+            chunk.buffer.seek(0)
+            with self._session_factory() as db:
+                if self._partitioned:
+                    partitioning.ensure_partitions(
+                        db,
+                        partitioning.month_start(chunk.first_clock_in.astimezone(timezone.utc).date()),
+                        partitioning.month_start(chunk.last_clock_in.astimezone(timezone.utc).date())
+                    )
+                self._attendance_repository.copy_import_staging(db=db, rows_file=chunk.buffer)
+                inserted, unknown = self._attendance_repository.merge_import_staging(
+                    db=db, by_employee_code=key_column == 'employee_code'
+                )
+        for line, key in unknown:
+            raw_in, raw_out = chunk.raw[line]
+            reject_writer.writerow((line, key, raw_in, raw_out, 'unknown employee'))
+        return ImportChunkResult(
+            lines=chunk.lines,
+            inserted=inserted,
+            skipped=chunk.staged - len(unknown) - inserted,
+            rejected=chunk.rejected + len(unknown),
+            first_work_date=chunk.first_work_date,
+            last_work_date=chunk.last_work_date
+        )
+
+
+class _ImportChunk:
+    """Validated rows of one chunk, as COPY CSV, plus what the result needs"""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.raw: Dict[int, Tuple[str, str]] = {}
+        self.lines = 0
+        self.staged = 0
+        self.rejected = 0
+        self.first_clock_in: Optional[datetime] = None
+        self.last_clock_in: Optional[datetime] = None
+        self.first_work_date: Optional[date] = None
+        self.last_work_date: Optional[date] = None
+
+    def add(self, line, key, clock_in, clock_out, raw, work_day_tz) -> None:
+        self.writer.writerow((line, key, clock_in.isoformat(), clock_out.isoformat()))
+        self.raw[line] = raw
+        self.staged += 1
+        if self.first_clock_in is None or clock_in < self.first_clock_in:
+            self.first_clock_in = clock_in
+        if self.last_clock_in is None or clock_in > self.last_clock_in:
+            self.last_clock_in = clock_in
+        work_date = clock_in.astimezone(work_day_tz).date()
+        if self.first_work_date is None or work_date < self.first_work_date:
+            self.first_work_date = work_date
+        if self.last_work_date is None or work_date > self.last_work_date:
+            self.last_work_date = work_date
+
+
+def _parse_uuid(value: str) -> str:
+    """Normalise an employee_id"""
+    try:
+        return str(UUID(value))
+    except ValueError:
+        raise ValueError('invalid employee_id')
+
+
+def _parse_timestamp(value: str, naive_tz, name: str) -> datetime:
+    """Parse an ISO 8601 timestamp, attaching naive_tz when it has no offset"""
+    try:
+        parsed = date_parser.isoparse(value)
+    except (ValueError, OverflowError):
+        raise ValueError(f'invalid {name}')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=naive_tz)
+    return parsed
@@ -0,0 +1,209 @@
+"""
+Attendance Report Service - vectorized hours, overtime and lateness analytics
+Following Single Responsibility Principle
+"""
+from datetime import datetime, time, timezone
+from typing import Dict, List, NamedTuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from repositories.attendance_repository import IAttendanceRepository
+from schemas.pydantic_models import AttendanceReportQuery, AttendanceReportResponse, AttendanceReportRow
+
+
+class SessionArrays(NamedTuple):
+    """Sessions of a report range, one array element per session"""
+    employee_ids: List[UUID]      # employee of each employee_index value
+    employee_index: np.ndarray    # int64, index into employee_ids
+    clock_in: np.ndarray          # float64 epoch seconds
+    clock_out: np.ndarray         # float64 epoch seconds, NaN while open
+    work_day: np.ndarray          # int64 local work date, days since 1970-01-01
+    start_seconds: np.ndarray     # float64 local clock in time, seconds since midnight
+
+
+class ReportTotals(NamedTuple):
+    """Per-employee report columns, indexed like SessionArrays.employee_ids"""
+    total_seconds: np.ndarray
+    session_count: np.ndarray
+    days_worked: np.ndarray
+    overtime_seconds: np.ndarray
+    late_arrivals: np.ndarray
+    missing_punches: np.ndarray
+
+
+def compute_report(
+    sessions: SessionArrays,
+    shift_start_seconds: float,
+    daily_overtime_seconds: float,
+    max_session_seconds: float,
+    as_of: float
+) -> ReportTotals:
+    """
+    Compute per-employee totals of a report range without a Python loop per session.
+
+    - total_seconds: worked time of closed sessions
+    - days_worked / overtime_seconds: work dates with any session, and time
+      worked beyond daily_overtime_seconds on each of them
+    - late_arrivals: work dates whose first clock in is after shift_start_seconds
+    - missing_punches: sessions still open max_session_seconds after clock in
+      (as of as_of) or closed only after more than max_session_seconds
+    """
+    employees = len(sessions.employee_ids)
+    employee_index = sessions.employee_index
+    closed = ~np.isnan(sessions.clock_out)
+    duration = np.where(closed, sessions.clock_out - sessions.clock_in, 0.0)
+
+    total_seconds = np.bincount(employee_index, weights=duration, minlength=employees)
+    session_count = np.bincount(employee_index, minlength=employees)
+    missing = (~closed & (sessions.clock_in < as_of - max_session_seconds)) | (duration > max_session_seconds)
+    missing_punches = np.bincount(employee_index[missing], minlength=employees)
+
+    # One group per (employee, work date); sorting by start time within the
+    # group puts each day's first clock in at the group's first position
+    if len(employee_index):
+        first_day = sessions.work_day.min()
+        days = sessions.work_day.max() - first_day + 1
+        day_key = employee_index * days + (sessions.work_day - first_day)
+    else:
+        days = 1
+        day_key = employee_index
+    order = np.lexsort((sessions.start_seconds, day_key))
+    day_keys, first, group = np.unique(day_key[order], return_index=True, return_inverse=True)
+    day_employee = day_keys // days
+    day_seconds = np.bincount(group, weights=duration[order], minlength=len(day_keys))
+    first_start = sessions.start_seconds[order][first]
+
+    days_worked = np.bincount(day_employee, minlength=employees)
+    overtime_seconds = np.bincount(
+        day_employee, weights=np.maximum(day_seconds - daily_overtime_seconds, 0.0), minlength=employees
+    )
+    late_arrivals = np.bincount(day_employee[first_start > shift_start_seconds], minlength=employees)
+
+    return ReportTotals(
+        total_seconds=total_seconds,
+        session_count=session_count,
+        days_worked=days_worked,
+        overtime_seconds=overtime_seconds,
+        late_arrivals=late_arrivals,
+        missing_punches=missing_punches
+    )
+
+
+class AttendanceReportService:
+    """Attendance Report Service - Single Responsibility: Compute attendance analytics"""
+
+    def __init__(
+        self,
+        attendance_repository: IAttendanceRepository,
+        work_day_timezone: str = 'UTC',
+        shift_start: time = time(9, 0),
+        late_grace_minutes: int = 5,
+        daily_overtime_hours: float = 8,
+        max_session_hours: float = 16,
+        chunk_size: int = 50000
+    ):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._attendance_repository = attendance_repository
+        self._work_day_timezone = work_day_timezone
+        # Defaults of the report parameters a query does not set
+        self._shift_start = shift_start
+        self._late_grace_minutes = late_grace_minutes
+        self._daily_overtime_hours = daily_overtime_hours
+        self._max_session_hours = max_session_hours
+        # Rows fetched per server-side cursor round trip
+        self._chunk_size = chunk_size
+
+    def get_report(self, db: Session, query: AttendanceReportQuery) -> AttendanceReportResponse:
+        """
+        Per-employee worked hours, overtime, late arrivals and missing punches
+
+        Sessions of the work date range are loaded into NumPy arrays and
+        aggregated in vectorized form.
+
+        Returns:
+            AttendanceReportResponse with one row per employee with sessions
+            in the range (ordered by employee_id) and the parameters used
+        """
+        shift_start = query.shift_start or self._shift_start
+        late_grace_minutes = _default(query.late_grace_minutes, self._late_grace_minutes)
+        daily_overtime_hours = query.daily_overtime_hours or self._daily_overtime_hours
+        max_session_hours = query.max_session_hours or self._max_session_hours
+
+        sessions = self.load_sessions(db, query)
+        totals = compute_report(
+            sessions,
+            shift_start_seconds=_seconds_since_midnight(shift_start) + late_grace_minutes * 60,
+            daily_overtime_seconds=daily_overtime_hours * 3600,
+            max_session_seconds=max_session_hours * 3600,
+            as_of=datetime.now(timezone.utc).timestamp()
+        )
+
+        rows = [
+            AttendanceReportRow(
+                employee_id=str(employee_id),
+                total_seconds=round(float(totals.total_seconds[i]), 3),
+                session_count=int(totals.session_count[i]),
+                days_worked=int(totals.days_worked[i]),
+                overtime_seconds=round(float(totals.overtime_seconds[i]), 3),
+                late_arrivals=int(totals.late_arrivals[i]),
+                missing_punches=int(totals.missing_punches[i])
+            )
+            for i, employee_id in sorted(enumerate(sessions.employee_ids), key=lambda item: item[1])
+        ]
+        return AttendanceReportResponse(
+            status='success',
+            data={
+                'employees': rows,
+                'parameters': {
+                    'from': query.from_.isoformat(),
+                    'to': query.to.isoformat(),
+                    'work_day_timezone': self._work_day_timezone,
+                    'shift_start': shift_start.isoformat(),
+                    'late_grace_minutes': late_grace_minutes,
+                    'daily_overtime_hours': daily_overtime_hours,
+                    'max_session_hours': max_session_hours
+                }
+            }
+        )
+
+    def load_sessions(self, db: Session, query: AttendanceReportQuery) -> SessionArrays:
+        """Load the sessions of the query's work date range into SessionArrays"""
+        employee_positions: Dict[UUID, int] = {}
+        indexes = []
+        chunks = []
+        for rows in self._attendance_repository.iter_session_epochs(
+            db=db,
+            start=query.from_,
+            end=query.to,
+            work_day_timezone=self._work_day_timezone,
+            employee_id=query.employee_id,
+            chunk_size=self._chunk_size
+        ):
+            indexes.append(np.fromiter(
+                (employee_positions.setdefault(row[0], len(employee_positions)) for row in rows),
+                dtype=np.int64,
+                count=len(rows)
+            ))
+            chunks.append(np.array([tuple(row[1:]) for row in rows], dtype=np.float64))
+
+        values = np.concatenate(chunks) if chunks else np.empty((0, 4))
+        return SessionArrays(
+            employee_ids=list(employee_positions),
+            employee_index=np.concatenate(indexes) if indexes else np.empty(0, dtype=np.int64),
+            clock_in=values[:, 0],
+            clock_out=values[:, 1],
+            work_day=values[:, 2].astype(np.int64),
+            start_seconds=values[:, 3]
+        )
+
+
+def _default(value, default):
+    """value, or default when value is None"""
+    return default if value is None else value
+
+
+def _seconds_since_midnight(value: time) -> float:
+    """Seconds from midnight to a time of day"""
+    return value.hour * 3600 + value.minute * 60 + value.second
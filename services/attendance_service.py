@@ -0,0 +1,714 @@
+"""
+Attendance Service - Business Logic Layer
+Following Single Responsibility Principle
+"""
+import csv
+import io
+import json
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy.orm import Session
+from datastore.transaction import after_commit
+from schemas.pydantic_models import (
+    AttendanceData,
+    AttendanceExportQuery,
+    AttendanceListResponse,
+    AttendancePresenceQuery,
+    AttendancePresenceResponse,
+    AttendanceRecordsQuery,
+    AttendanceResponse,
+    AttendanceSummaryData,
+    AttendanceSummaryQuery,
+    AttendanceSummaryResponse,
+    BatchPunchRequest,
+    BatchPunchResponse,
+    PresentEmployeeData,
+    PunchResult,
+)
+from repositories.attendance_repository import IAttendanceRepository
+from repositories.employee_repository import IEmployeeRepository
+from models.employee import EmployeeStatusEnum
+from services.employee_status_index import EmployeeStatusIndex
+from services.presence_index import PresenceIndex, PresentSession, roster_key
+from services.punch_write_behind import PunchWriteBehindQueue
+from util.pagination import encode_cursor, decode_cursor
+from util.ttl_cache import TTLCache
+from exceptions.app_exceptions import (
+    NotFoundException,
+    ConflictException,
+    ForbiddenException,
+    ServiceUnavailableException,
+)
+
+# Employee statuses allowed to open an attendance session
+CLOCK_IN_STATUSES = (EmployeeStatusEnum.ACTIVE,)
+
+# Columns of the attendance export, in CSV order
+EXPORT_COLUMNS = (
+    'attendance_id', 'employee_id', 'employee_code', 'first_name', 'last_name',
+    'clock_in', 'clock_out', 'duration_seconds'
+)
+
+# How long a clock out waits for the employee's queued clock in to be written
+WRITE_BEHIND_WAIT_SECONDS = 2
+
+# Export output is yielded to the WSGI server in chunks of about this size
+_EXPORT_FLUSH_BYTES = 64 * 1024
+
+
+class AttendanceService:
+    """Attendance Service - Single Responsibility: Handle attendance business logic"""
+    
+    def __init__(
+        self,
+        attendance_repository: IAttendanceRepository,
+        employee_repository: IEmployeeRepository,
+        open_session_cache: Optional[TTLCache] = None,
+        employee_status_index: Optional[EmployeeStatusIndex] = None,
+        work_day_timezone: str = 'UTC',
+        partitioned: bool = False,
+        open_session_lookback_days: Optional[int] = None,
+        punch_queue: Optional[PunchWriteBehindQueue] = None,
+        presence_index: Optional[PresenceIndex] = None
+    ):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._attendance_repository = attendance_repository
+        self._employee_repository = employee_repository
+        # employee_id -> open attendance id, written through once a clock in
+        # commits and evicted on clock out. A hint only: other workers' clock
+        # outs do not evict it
+        self._open_session_cache = open_session_cache
+        # employee_id -> status, lets known employees skip the employee lookup
+        self._employee_status_index = employee_status_index
+        # Time zone in which a session's clock_in decides its work date
+        self._work_day_timezone = work_day_timezone
+        # attendance_record_t is partitioned by clock_in month: no unique
+        # open session index, clock ins are serialised per employee instead
+        self._partitioned = partitioned
+        # Open sessions are looked up only this far back (partition pruning)
+        self._open_session_lookback_days = open_session_lookback_days
+        # Write-behind mode: clock ins are acknowledged and written in batches
+        self._punch_queue = punch_queue
+        # Employees currently clocked in, updated once a clock in/out commits
+        self._presence_index = presence_index
+    
+    def clock_in(self, db: Session, employee_id: str) -> AttendanceResponse:
+        """
+        Clock in an employee
+        
+        Returns:
+            AttendanceResponse with the new attendance record
+            
+        Raises:
+            ValueError: If employee_id is not a valid UUID
+            NotFoundException: If employee does not exist
+            ForbiddenException: If employee is not active
+            ConflictException: If employee is already clocked in
+            ServiceUnavailableException: If a queued clock in is not written in time
+        """
+        employee_uuid = UUID(employee_id)
+        status = self._get_indexed_status(employee_uuid)
+        if status is not None and status not in CLOCK_IN_STATUSES:
+            raise _not_active(status)
+        
+        self._wait_queued_clock_ins([employee_uuid])
+        try:
+            row = self._attendance_repository.clock_in(
+                db=db,
+                employee_id=employee_uuid,
+                clock_in=datetime.now(timezone.utc),
+                allowed_statuses=CLOCK_IN_STATUSES,
+                verify_employee=status is None,
+                open_since=self._open_since(),
+                lock_employee=self._partitioned
+            )
+        except NotFoundException:
+            # Deleted since the status index saw it
+            self._discard_indexed([employee_uuid])
+            raise
+        
+        if row is None:
+            raise NotFoundException(message='Employee not found.')
+        
+        if row.status is not None and EmployeeStatusEnum(row.status) not in CLOCK_IN_STATUSES:
+            raise _not_active(EmployeeStatusEnum(row.status))
+        
+        if row.id is None:
+            self._cache_open_session(employee_uuid, row.open_attendance_id)
+            raise _already_clocked_in(row.open_attendance_id)
+        
+        after_commit(db, self._cache_open_session, employee_uuid, row.id)
+        after_commit(db, self._mark_present, employee_uuid, row.id, row.clock_in)
+        return AttendanceResponse(
+            status='success',
+            message='Successfully clocked in.',
+            data=_to_attendance_data(row)
+        )
+    
+    def accept_clock_in(self, employee_id: str) -> Optional[AttendanceResponse]:
+        """
+        Acknowledge a clock in without a database round trip (write-behind mode)
+        
+        The employee is validated against the status index, then the
+        punch is queued with a preassigned attendance id. A queued punch is
+        dropped at write time if an open session turns out to exist already
+        or the employee was deleted; the drop is then reported by this
+        worker's clock_out and get_records of the employee.
+        The open-session cache is per worker and may be stale, so a hit
+        only sends the punch through clock_in, whose insert decides.
+        
+        Returns:
+            AttendanceResponse with the accepted punch, or None when it has
+            to go through clock_in: write-behind is disabled, the employee
+            is not in the status index or may already be clocked in
+            
+        Raises:
+            ValueError: If employee_id is not a valid UUID
+            ForbiddenException: If employee is not active
+            ConflictException: If employee is already clocked in
+            ServiceUnavailableException: If the punch queue is full
+        """
+        if self._punch_queue is None:
+            return None
+        employee_uuid = UUID(employee_id)
+        status = self._get_indexed_status(employee_uuid)
+        if status is None:
+            return None
+        if status not in CLOCK_IN_STATUSES:
+            raise _not_active(status)
+        
+        if self._punch_queue.is_pending(employee_uuid):
+            raise _already_clocked_in(None)
+        if self._get_cached_open_session(employee_uuid):
+            return None
+        
+        attendance_id = uuid4()
+        clock_in = datetime.now(timezone.utc)
+        if not self._punch_queue.enqueue(attendance_id, employee_uuid, clock_in):
+            raise ServiceUnavailableException(
+                message='Too many punches right now. Please retry shortly.',
+                retry_after=1
+            )
+        self._cache_open_session(employee_uuid, attendance_id)
+        self._mark_present(employee_uuid, attendance_id, clock_in)
+        return AttendanceResponse(
+            status='success',
+            message='Clock in accepted.',
+            data=AttendanceData(id=str(attendance_id), employee_id=employee_id, clock_in=clock_in)
+        )
+    
+    def clock_out(self, db: Session, employee_id: str) -> AttendanceResponse:
+        """
+        Clock out an employee
+        
+        Returns:
+            AttendanceResponse with the closed attendance record and its duration
+            
+        Raises:
+            ValueError: If employee_id is not a valid UUID
+            NotFoundException: If employee does not exist
+            ConflictException: If employee is not clocked in
+            ServiceUnavailableException: If a queued clock in is not written in time
+        """
+        employee_uuid = UUID(employee_id)
+        self._wait_queued_clock_ins([employee_uuid])
+        self._evict_open_session(employee_uuid)
+        row = self._attendance_repository.clock_out(
+            db=db,
+            employee_id=employee_uuid,
+            clock_out=datetime.now(timezone.utc),
+            work_day_timezone=self._work_day_timezone,
+            open_since=self._open_since()
+        )
+        
+        if row is None:
+            raise NotFoundException(
+                message='Employee not found.',
+                payload=self._dropped_clock_in_payload(employee_uuid)
+            )
+        
+        if row.id is None:
+            raise ConflictException(
+                message='Employee is not clocked in. Please clock in first.',
+                payload=self._dropped_clock_in_payload(employee_uuid)
+            )
+        
+        after_commit(db, self._mark_absent, employee_uuid)
+        attendance_data = _to_attendance_data(row)
+        attendance_data.duration_seconds = float(row.duration_seconds)
+        return AttendanceResponse(
+            status='success',
+            message='Successfully clocked out.',
+            data=attendance_data
+        )
+    
+    def apply_punches(self, db: Session, batch: BatchPunchRequest) -> BatchPunchResponse:
+        """
+        Apply buffered gateway punches in the caller's transaction
+        
+        Employees are checked against the status index, falling back to one
+        query for ids it does not know. Punches are then applied in
+        rounds: round k holds the k-th punch (by timestamp) of every
+        employee, so each round is one multi-row INSERT for clock ins and
+        one multi-row UPDATE for clock outs while per-employee order is kept.
+        
+        Returns:
+            BatchPunchResponse with one PunchResult per punch, in request order
+            
+        Raises:
+            NotFoundException: If an employee is deleted while the batch is
+                applied (a retry reports its punches as not_found)
+        """
+        punches = batch.punches
+        statuses = self._get_statuses(db, {punch.employee_id for punch in punches})
+        
+        results: List[PunchResult] = [None] * len(punches)
+        queues = defaultdict(list)
+        for index in sorted(range(len(punches)), key=lambda i: punches[i].timestamp):
+            punch = punches[index]
+            status = statuses.get(punch.employee_id)
+            if status is None:
+                results[index] = _punch_result(index, punch, 'not_found')
+            elif punch.direction == 'in' and status not in CLOCK_IN_STATUSES:
+                results[index] = _punch_result(index, punch, 'inactive')
+            else:
+                queues[punch.employee_id].append(index)
+        
+        self._wait_queued_clock_ins(queues)
+        open_since = self._open_since()
+        rounds = max((len(queue) for queue in queues.values()), default=0)
+        for position in range(rounds):
+            clock_ins = {}
+            clock_outs = {}
+            for employee_id, queue in queues.items():
+                if position < len(queue):
+                    index = queue[position]
+                    target = clock_ins if punches[index].direction == 'in' else clock_outs
+                    target[employee_id] = index
+            
+            try:
+                created = self._attendance_repository.bulk_clock_in(
+                    db=db,
+                    punches=[(employee_id, punches[i].timestamp) for employee_id, i in clock_ins.items()],
+                    open_since=open_since,
+                    lock_employee=self._partitioned
+                )
+            except NotFoundException:
+                # One of them was deleted since the status index saw it; a
+                # retried batch looks them up and reports it as not_found
+                self._discard_indexed(clock_ins)
+                raise
+            closed = self._attendance_repository.bulk_clock_out(
+                db=db,
+                punches=[(employee_id, punches[i].timestamp) for employee_id, i in clock_outs.items()],
+                work_day_timezone=self._work_day_timezone,
+                open_since=open_since
+            )
+            for row in created:
+                after_commit(db, self._cache_open_session, row.employee_id, row.id)
+                after_commit(db, self._mark_present, row.employee_id, row.id, row.clock_in)
+            for employee_id in clock_outs:
+                self._evict_open_session(employee_id)
+            for row in closed:
+                after_commit(db, self._mark_absent, row.employee_id)
+            for rows, pending, status in ((created, clock_ins, 'created'), (closed, clock_outs, 'closed')):
+                for row in rows:
+                    index = pending.pop(row.employee_id)
+                    results[index] = _punch_result(index, punches[index], status, row.id)
+                for index in pending.values():
+                    results[index] = _punch_result(index, punches[index], 'conflict')
+        
+        counts = defaultdict(int)
+        for result in results:
+            counts[result.status] += 1
+        
+        return BatchPunchResponse(
+            status='success',
+            message=f'Processed {len(punches)} punches.',
+            data={
+                'gateway_id': batch.gateway_id,
+                'counts': dict(counts),
+                'results': [result.model_dump(exclude_none=True) for result in results]
+            }
+        )
+    
+    def get_records(
+        self,
+        db: Session,
+        query: AttendanceRecordsQuery,
+        employee_id: Optional[str] = None
+    ) -> AttendanceListResponse:
+        """
+        Get a keyset page of attendance records, newest first
+        
+        Returns:
+            AttendanceListResponse with the records and the cursor of the
+            next page (None on the last page)
+            
+        Raises:
+            ValueError: If employee_id is not a valid UUID
+            ValidationException: If the cursor is malformed
+        """
+        after = decode_cursor(query.cursor, datetime, UUID) if query.cursor else None
+        records = self._attendance_repository.get_records_page(
+            db=db,
+            limit=query.limit + 1,
+            employee_id=UUID(employee_id) if employee_id else None,
+            start=query.from_,
+            end=query.to,
+            after=after
+        )
+        
+        next_cursor = None
+        if len(records) > query.limit:
+            records = records[:query.limit]
+            next_cursor = encode_cursor(records[-1].clock_in, records[-1].id)
+        
+        data = {
+            'records': [_to_attendance_data(record) for record in records],
+            'next_cursor': next_cursor
+        }
+        if employee_id:
+            data.update(self._dropped_clock_in_payload(UUID(employee_id)) or {})
+        return AttendanceListResponse(status='success', data=data)
+    
+    def export_records(
+        self, db: Session, query: AttendanceExportQuery, chunk_size: int = 5000
+    ) -> Iterator[str]:
+        """
+        Stream attendance records in a clock in range as CSV or NDJSON
+        
+        Rows are read from a server-side cursor and written out as they
+        arrive, so memory use does not depend on the size of the range.
+        The generator must be consumed while db is open.
+        
+        Returns:
+            Iterator of text chunks (CSV with a header row, or one JSON
+            object per line)
+        """
+        rows = self._attendance_repository.iter_export_rows(
+            db=db,
+            start=query.from_,
+            end=query.to,
+            employee_id=query.employee_id,
+            chunk_size=chunk_size
+        )
+        buffer = io.StringIO()
+        if query.format == 'csv':
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            write = writer.writerow
+        else:
+            def write(values):
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))))
+                buffer.write('\n')
+        
+        for row in rows:
+            write(_to_export_values(row))
+            if buffer.tell() >= _EXPORT_FLUSH_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def get_daily_summary(self, db: Session, query: AttendanceSummaryQuery) -> AttendanceSummaryResponse:
+        """
+        Get a keyset page of per-employee, per-day worked-hours totals
+        
+        Reads only the incrementally maintained rollup, never the raw
+        attendance records.
+        
+        Raises:
+            ValidationException: If the cursor is malformed
+        """
+        after = decode_cursor(query.cursor, date, UUID) if query.cursor else None
+        summaries = self._attendance_repository.get_daily_summary_page(
+            db=db,
+            start=query.from_,
+            end=query.to,
+            limit=query.limit + 1,
+            employee_id=query.employee_id,
+            after=after
+        )
+        
+        next_cursor = None
+        if len(summaries) > query.limit:
+            summaries = summaries[:query.limit]
+            next_cursor = encode_cursor(summaries[-1].work_date, summaries[-1].employee_id)
+        
+        return AttendanceSummaryResponse(
+            status='success',
+            data={
+                'summaries': [AttendanceSummaryData(**summary.serialize()) for summary in summaries],
+                'next_cursor': next_cursor
+            }
+        )
+    
+    def get_presence(self, db: Session, query: AttendancePresenceQuery) -> AttendancePresenceResponse:
+        """
+        Count and list the employees currently clocked in
+        
+        Served from the presence index when enabled, querying the database
+        only for details of employees clocked in since its last reconcile;
+        otherwise read from the open sessions. Groups are ordered by count,
+        the roster by last name, first name and employee id.
+        
+        Raises:
+            ValidationException: If the cursor is malformed
+        """
+        sessions, reconciled_at = self._get_present_sessions(db)
+        if query.city is not None:
+            sessions = [session for session in sessions if session.city == query.city]
+        if query.country is not None:
+            sessions = [session for session in sessions if session.country == query.country]
+        
+        groups = None
+        if query.group_by:
+            counts = Counter(getattr(session, query.group_by) for session in sessions)
+            groups = [
+                {query.group_by: key, 'count': count}
+                for key, count in sorted(counts.items(), key=lambda item: (-item[1], item[0] or ''))
+            ]
+        
+        page = []
+        next_cursor = None
+        if query.limit:
+            start = 0
+            if query.cursor:
+                after = decode_cursor(query.cursor, str, str, str)
+                start = next((i for i, session in enumerate(sessions) if roster_key(session) > after), len(sessions))
+            page = sessions[start:start + query.limit]
+            if start + query.limit < len(sessions):
+                next_cursor = encode_cursor(*roster_key(page[-1]))
+        
+        return AttendancePresenceResponse(
+            status='success',
+            data={
+                'count': len(sessions),
+                'groups': groups,
+                'employees': [_to_present_employee_data(session) for session in page],
+                'next_cursor': next_cursor,
+                'reconciled_at': reconciled_at
+            }
+        )
+    
+    def auto_close_stale_sessions(self, db: Session, max_session_hours: float, limit: int = 1000) -> int:
+        """
+        Close one batch of sessions left open longer than max_session_hours
+        
+        Sessions are closed at clock_in + max_session_hours and flagged
+        auto_closed, so they count as missing punches rather than worked
+        time. Call repeatedly, one transaction each, until it returns less
+        than limit.
+        
+        Returns:
+            Number of sessions closed
+        """
+        max_session = timedelta(hours=max_session_hours)
+        rows = self._attendance_repository.auto_close_stale(
+            db=db,
+            opened_before=datetime.now(timezone.utc) - max_session,
+            max_session=max_session,
+            limit=limit
+        )
+        for row in rows:
+            self._evict_open_session(row.employee_id)
+            after_commit(db, self._mark_absent, row.employee_id)
+        return len(rows)
+    
+    def rebuild_daily_summary(self, db: Session, start: date, end: date) -> int:
+        """Recompute the daily rollup for work dates in [start, end], returns rows written"""
+        return self._attendance_repository.rebuild_daily_summary(
+            db=db,
+            start=start,
+            end=end,
+            work_day_timezone=self._work_day_timezone
+        )
+    
+    def get_open_session_cache_stats(self) -> Optional[dict]:
+        """Hit/miss counters of the open-session cache, None when disabled"""
+        if self._open_session_cache is None:
+            return None
+        return self._open_session_cache.stats()
+    
+    def get_employee_status_index_stats(self) -> Optional[dict]:
+        """Load state and size of the employee status index, None when disabled"""
+        if self._employee_status_index is None:
+            return None
+        return self._employee_status_index.stats()
+    
+    def _get_indexed_status(self, employee_id: UUID) -> Optional[EmployeeStatusEnum]:
+        if self._employee_status_index is None:
+            return None
+        return self._employee_status_index.get_status(employee_id)
+    
+    def _discard_indexed(self, employee_ids) -> None:
+        if self._employee_status_index is not None:
+            self._employee_status_index.discard(employee_ids)
+    
+    def _get_statuses(self, db: Session, employee_ids: set) -> dict:
+        """Statuses from the index, querying the database only for unknown ids"""
+        statuses = {}
+        unknown = set()
+        for employee_id in employee_ids:
+            status = self._get_indexed_status(employee_id)
+            if status is None:
+                unknown.add(employee_id)
+            else:
+                statuses[employee_id] = status
+        if unknown:
+            statuses.update(self._employee_repository.get_statuses(db=db, employee_ids=unknown))
+        return statuses
+    
+    def _wait_queued_clock_ins(self, employee_ids) -> None:
+        """Make sure queued write-behind clock ins of employee_ids are written first"""
+        if self._punch_queue is None:
+            return
+        pending = [employee_id for employee_id in employee_ids if self._punch_queue.is_pending(employee_id)]
+        if pending and not self._punch_queue.wait_written(pending, WRITE_BEHIND_WAIT_SECONDS):
+            raise ServiceUnavailableException(
+                message='Clock in is still being recorded. Please retry shortly.',
+                retry_after=1
+            )
+    
+    def get_presence_index_stats(self) -> Optional[dict]:
+        """Size and reconcile state of the presence index, None when disabled"""
+        if self._presence_index is None:
+            return None
+        return self._presence_index.stats()
+    
+    def _get_present_sessions(self, db: Session) -> Tuple[List[PresentSession], datetime]:
+        """Open sessions sorted by roster_key, and when they were read from the database"""
+        roster = self._presence_index.roster() if self._presence_index is not None else None
+        if roster is None:
+            rows = self._attendance_repository.get_present_sessions(db=db, open_since=self._open_since())
+            return sorted(map(PresentSession.from_row, rows), key=roster_key), datetime.now(timezone.utc)
+        missing = self._presence_index.missing_details()
+        if missing:
+            self._presence_index.apply(self._attendance_repository.get_present_sessions(
+                db=db,
+                open_since=self._open_since(),
+                employee_ids=missing
+            ))
+            roster = self._presence_index.roster()
+        return roster, self._presence_index.reconciled_at
+    
+    def _mark_present(self, employee_id: UUID, attendance_id: UUID, clock_in: datetime) -> None:
+        if self._presence_index is not None:
+            self._presence_index.mark_in(employee_id, attendance_id, clock_in)
+    
+    def _mark_absent(self, employee_id: UUID) -> None:
+        if self._presence_index is not None:
+            self._presence_index.mark_out(employee_id)
+    
+    def _dropped_clock_in_payload(self, employee_id: UUID) -> Optional[dict]:
+        """{'dropped_clock_in': ...} when this worker dropped the employee's last accepted clock in"""
+        dropped = self._punch_queue.get_dropped(employee_id) if self._punch_queue is not None else None
+        if dropped is None:
+            return None
+        return {
+            'dropped_clock_in': {
+                'attendance_id': str(dropped.attendance_id),
+                'clock_in': dropped.clock_in.isoformat(),
+                'reason': dropped.reason
+            }
+        }
+    
+    def get_punch_queue_stats(self) -> Optional[dict]:
+        """Counters of the write-behind punch queue, None when disabled"""
+        if self._punch_queue is None:
+            return None
+        return self._punch_queue.stats()
+    
+    def _open_since(self) -> Optional[datetime]:
+        """Lower clock_in bound of open session lookups, None for unbounded"""
+        if not self._open_session_lookback_days:
+            return None
+        return datetime.now(timezone.utc) - timedelta(days=self._open_session_lookback_days)
+    
+    def _get_cached_open_session(self, employee_id: UUID) -> Optional[UUID]:
+        if self._open_session_cache is None:
+            return None
+        return self._open_session_cache.get(employee_id)
+    
+    def _cache_open_session(self, employee_id: UUID, attendance_id: Optional[UUID]) -> None:
+        if self._open_session_cache is not None and attendance_id:
+            self._open_session_cache.set(employee_id, attendance_id)
+    
+    def _evict_open_session(self, employee_id: UUID) -> None:
+        if self._open_session_cache is not None:
+            self._open_session_cache.pop(employee_id)
+
+
+def _not_active(status: EmployeeStatusEnum) -> ForbiddenException:
+    """Build the ForbiddenException for an employee that may not clock in"""
+    return ForbiddenException(
+        message=f'Employee is {status.value} and cannot clock in.',
+        payload={'status': status.value}
+    )
+
+
+def _already_clocked_in(open_attendance_id: Optional[UUID]) -> ConflictException:
+    """Build the ConflictException for a duplicate clock in"""
+    payload = None
+    if open_attendance_id:
+        payload = {'attendance_id': str(open_attendance_id)}
+    return ConflictException(
+        message='Employee is already clocked in. Please clock out first.',
+        payload=payload
+    )
+
+
+def _punch_result(index: int, punch, status: str, attendance_id=None) -> PunchResult:
+    """Build the PunchResult for a punch"""
+    return PunchResult(
+        index=index,
+        employee_id=str(punch.employee_id),
+        direction=punch.direction,
+        status=status,
+        attendance_id=str(attendance_id) if attendance_id else None
+    )
+
+
+def _to_attendance_data(row) -> AttendanceData:
+    """Build AttendanceData from an attendance row"""
+    return AttendanceData(
+        id=str(row.id),
+        employee_id=str(row.employee_id),
+        clock_in=row.clock_in,
+        clock_out=row.clock_out,
+        auto_closed=getattr(row, 'auto_closed', None),
+        created_at=row.created_at,
+        updated_at=row.updated_at
+    )
+
+
+def _to_present_employee_data(session: PresentSession) -> PresentEmployeeData:
+    """Build PresentEmployeeData from a presence roster entry"""
+    return PresentEmployeeData(
+        employee_id=str(session.employee_id),
+        attendance_id=str(session.attendance_id),
+        clock_in=session.clock_in,
+        employee_code=session.employee_code,
+        first_name=session.first_name,
+        last_name=session.last_name,
+        city=session.city,
+        country=session.country
+    )
+
+
+def _to_export_values(row) -> tuple:
+    """Build the EXPORT_COLUMNS values of an export row"""
+    return (
+        str(row.id),
+        str(row.employee_id),
+        row.employee_code,
+        row.first_name,
+        row.last_name,
+        row.clock_in.isoformat(),
+        row.clock_out.isoformat() if row.clock_out else None,
+        float(row.duration_seconds) if row.duration_seconds is not None else None
+    )
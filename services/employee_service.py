@@ -0,0 +1,145 @@
+"""
+Employee Service - Business Logic Layer
+Following Single Responsibility Principle
+"""
+from typing import Sequence
+from uuid import UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from schemas.pydantic_models import (
+    DEFAULT_EMPLOYEE_FIELDS,
+    EmployeeBulkUpsertRequest,
+    EmployeeBulkUpsertResponse,
+    EmployeeData,
+    EmployeeFieldsQuery,
+    EmployeeListQuery,
+    EmployeeListResponse,
+    EmployeeResponse,
+)
+from repositories.employee_repository import IEmployeeRepository
+from models.employee import EmployeeStatusEnum
+from util.pagination import encode_cursor, decode_cursor
+from exceptions.app_exceptions import ConflictException, NotFoundException
+
+# SQLSTATE of a unique violation (e.g. an email used by another employee)
+UNIQUE_VIOLATION = '23505'
+
+
+class EmployeeService:
+    """Employee Service - Single Responsibility: Handle employee directory business logic"""
+
+    def __init__(self, employee_repository: IEmployeeRepository):
+        """Dependency Injection - Dependency Inversion Principle"""
+        self._employee_repository = employee_repository
+
+    def list_employees(self, db: Session, query: EmployeeListQuery) -> EmployeeListResponse:
+        """
+        Get a keyset page of employees ordered by last name, then id
+
+        Only the requested fields (query.fields, default the compact set)
+        are selected and returned.
+
+        Returns:
+            EmployeeListResponse with the employees and the cursor of the
+            next page (None on the last page)
+
+        Raises:
+            ValidationException: If the cursor is malformed
+        """
+        fields = query.fields or DEFAULT_EMPLOYEE_FIELDS
+        after = decode_cursor(query.cursor, str, UUID) if query.cursor else None
+        rows = self._employee_repository.get_page(
+            db=db,
+            columns=fields,
+            limit=query.limit + 1,
+            status=EmployeeStatusEnum(query.status) if query.status else None,
+            city=query.city,
+            country=query.country,
+            after=after
+        )
+
+        next_cursor = None
+        if len(rows) > query.limit:
+            rows = rows[:query.limit]
+            next_cursor = encode_cursor(rows[-1].last_name, rows[-1].id)
+
+        return EmployeeListResponse(
+            status='success',
+            data={
+                'employees': [_to_projection(row, fields) for row in rows],
+                'next_cursor': next_cursor
+            }
+        )
+
+    def get_by_code(self, db: Session, employee_code: str, query: EmployeeFieldsQuery) -> EmployeeResponse:
+        """
+        Get an employee by employee_code (as read from a badge)
+
+        Raises:
+            NotFoundException: If no employee has this code
+        """
+        fields = query.fields or DEFAULT_EMPLOYEE_FIELDS
+        row = self._employee_repository.get_by_code(db=db, employee_code=employee_code, columns=fields)
+        if row is None:
+            raise NotFoundException(message='Employee not found.')
+        return EmployeeResponse(
+            status='success',
+            data=_to_projection(row, fields)
+        )
+
+    def bulk_upsert(
+        self, db: Session, request: EmployeeBulkUpsertRequest, chunk_size: int = 1000
+    ) -> EmployeeBulkUpsertResponse:
+        """
+        Insert or update employees matched on employee_code (HRIS sync)
+
+        Rows are written chunk_size per INSERT ... ON CONFLICT DO UPDATE
+        statement, all in the caller's transaction. Rows identical to the
+        stored employee are skipped by the database and counted as
+        unchanged.
+
+        Returns:
+            EmployeeBulkUpsertResponse with inserted, updated and unchanged counts
+
+        Raises:
+            ConflictException: If a row violates a unique constraint other than
+                employee_code (e.g. an email used by another employee)
+        """
+        rows = [
+            {**employee.model_dump(), 'status': EmployeeStatusEnum(employee.status)}
+            for employee in request.employees
+        ]
+        inserted = updated = 0
+        for start in range(0, len(rows), chunk_size):
+            try:
+                written = self._employee_repository.bulk_upsert(db=db, rows=rows[start:start + chunk_size])
+            except IntegrityError as e:
+                if getattr(e.orig, 'pgcode', None) != UNIQUE_VIOLATION:
+                    raise
+                diag = e.orig.diag
+                raise ConflictException(
+                    message=f'Employee conflicts with an existing one: {diag.message_detail}',
+                    payload={'constraint': diag.constraint_name, 'detail': diag.message_detail}
+                )
+            inserted += sum(written)
+            updated += len(written) - sum(written)
+
+        return EmployeeBulkUpsertResponse(
+            status='success',
+            message=f'{len(rows)} employees synced.',
+            data={
+                'inserted': inserted,
+                'updated': updated,
+                'unchanged': len(rows) - inserted - updated
+            }
+        )
+
+
+def _to_projection(row, fields: Sequence[str]) -> dict:
+    """JSON-ready dict of the requested fields of an employee row"""
+    values = {field: getattr(row, field) for field in fields}
+    if values.get('id') is not None:
+        values['id'] = str(values['id'])
+    if isinstance(values.get('status'), EmployeeStatusEnum):
+        values['status'] = values['status'].value
+    return EmployeeData(**values).model_dump(mode='json', exclude_unset=True)
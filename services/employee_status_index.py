@@ -0,0 +1,142 @@
+"""
+Employee Status Index - in-process employee id -> status lookup
+Following Single Responsibility Principle
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+from models.employee import EmployeeStatusEnum
+
+logger = logging.getLogger(__name__)
+
+# Statuses are stored as small ints (their position in the enum)
+_STATUSES = list(EmployeeStatusEnum)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+
+class EmployeeStatusIndex:
+    """
+    Preloaded, periodically refreshed index of employee id -> status
+
+    Keys are the 16 raw UUID bytes and values small ints, which keeps a
+    roster of a few hundred thousand employees to a few tens of MB. A
+    background thread does a full load, then incremental refreshes of rows
+    whose updated_at moved past the last seen watermark, and a periodic
+    full reload to drop deleted employees.
+
+    Incremental refreshes cannot see deletions: a deleted employee stays
+    in the index until the next full reload (full_reload_seconds), unless
+    a clock in hits the attendance foreign key first and discards it.
+    Callers must treat an indexed status as a hint for existence.
+    """
+    
+    def __init__(
+        self,
+        repository,
+        session_factory,
+        refresh_seconds: float = 30,
+        full_reload_seconds: float = 3600,
+        overlap_seconds: float = 60
+    ):
+        """Refresh and full reload intervals of the statuses read through the repository"""
+        self._repository = repository
+        self._session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self.full_reload_seconds = full_reload_seconds
+        # Re-read a window before the watermark so rows committed late with
+        # an older updated_at are not missed
+        self.overlap_seconds = overlap_seconds
+        self._statuses: Dict[bytes, int] = {}
+        self._watermark: Optional[datetime] = None
+        self._loaded_at: Optional[float] = None
+        self._refreshed_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.refresh_errors = 0
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+    
+    def get_status(self, employee_id: UUID) -> Optional[EmployeeStatusEnum]:
+        """Status of an employee, None when unknown or not loaded yet"""
+        self.start()
+        code = self._statuses.get(employee_id.bytes)
+        return None if code is None else _STATUSES[code]
+    
+    def discard(self, employee_ids: Iterable[UUID]) -> None:
+        """Drop employees found deleted, they are looked up again until the next load"""
+        for employee_id in employee_ids:
+            self._statuses.pop(employee_id.bytes, None)
+    
+    def load(self, db) -> None:
+        """Replace the index with a full load of the roster"""
+        statuses = {}
+        watermark = None
+        for employee_id, status, updated_at in self._repository.get_status_rows(db=db):
+            statuses[employee_id.bytes] = _STATUS_CODES[EmployeeStatusEnum(status)]
+            if watermark is None or updated_at > watermark:
+                watermark = updated_at
+        self._statuses = statuses
+        self._watermark = watermark
+        self._loaded_at = self._refreshed_at = time.monotonic()
+        logger.info(f"EmployeeStatusIndex: loaded {len(statuses)} employees")
+    
+    def refresh(self, db) -> int:
+        """Apply rows changed since the last watermark, returns the number of rows read"""
+        if self._watermark is None:
+            self.load(db)
+            return len(self._statuses)
+        
+        since = self._watermark - timedelta(seconds=self.overlap_seconds)
+        count = 0
+        for employee_id, status, updated_at in self._repository.get_status_rows(db=db, updated_since=since):
+            self._statuses[employee_id.bytes] = _STATUS_CODES[EmployeeStatusEnum(status)]
+            if updated_at > self._watermark:
+                self._watermark = updated_at
+            count += 1
+        self._refreshed_at = time.monotonic()
+        return count
+    
+    def start(self) -> None:
+        """Start the background refresher on first use in this process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='employee-status-index',
+                    daemon=True
+                )
+                self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+    
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            'loaded': self.is_loaded,
+            'size': len(self._statuses),
+            'watermark': self._watermark.isoformat() if self._watermark else None,
+            'seconds_since_refresh': round(now - self._refreshed_at, 1) if self._refreshed_at else None,
+            'refresh_errors': self.refresh_errors
+        }
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self._session_factory() as session:
+                    if not self.is_loaded or time.monotonic() - self._loaded_at >= self.full_reload_seconds:
+                        self.load(session)
+                    else:
+                        self.refresh(session)
+            except Exception:
+                self.refresh_errors += 1
+                logger.error("EmployeeStatusIndex: refresh failed", exc_info=True)
+            self._stop.wait(self.refresh_seconds)
@@ -0,0 +1,149 @@
+"""
+Idempotency Store - responses of write requests sent with an Idempotency-Key
+Following Single Responsibility Principle
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple, Optional, Tuple
+
+from util.ttl_cache import TTLCache
+from exceptions.app_exceptions import ConflictException, ValidationException
+
+logger = logging.getLogger(__name__)
+
+
+class StoredResponse(NamedTuple):
+    """Response recorded for a key; status_code is None while the first request runs"""
+    fingerprint: str
+    status_code: Optional[int] = None
+    body: Any = None
+
+
+class IdempotencyStore:
+    """
+    Bounded store of (scope, key) -> response, replayed to retries
+
+    Responses live in a per-worker LRU cache with a TTL. With a repository
+    they are also persisted to idempotency_key_t, so a retry that reaches
+    another worker (or arrives after a restart) is replayed as well, and a
+    key is claimed in the database before the request runs so concurrent
+    retries on different workers cannot both execute it. A claim whose
+    request died is taken over after lock_seconds.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        repository=None,
+        session_factory=None,
+        lock_seconds: float = 60
+    ):
+        """Per-worker response cache; with a repository, keys are also claimed and stored in the database"""
+        self._cache = cache
+        self._repository = repository
+        self._session_factory = session_factory
+        self.ttl_seconds = cache.ttl_seconds
+        self.lock_seconds = lock_seconds
+        # Makes the cache lookup and the in-progress claim one step
+        self._lock = threading.Lock()
+        self.replays = 0
+
+    def begin(self, scope: str, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Claim a key before running its request
+
+        Returns:
+            None when the request should run, otherwise the stored response
+            to replay
+
+        Raises:
+            ConflictException: If a request with the key is still running
+            ValidationException: If the key was used with a different body
+        """
+        cache_key = (scope, key)
+        with self._lock:
+            stored = self._cache.get(cache_key)
+            if stored is None:
+                self._cache.set(cache_key, StoredResponse(fingerprint))
+        if stored is not None:
+            return self._replay(stored, fingerprint)
+        if self._repository is None:
+            return None
+
+        try:
+            with self._session_factory() as db:
+                row = self._repository.claim(
+                    db=db,
+                    scope=scope,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=_now() + timedelta(seconds=self.lock_seconds)
+                )
+        except Exception:
+            self._cache.pop(cache_key)
+            raise
+        if row is None:
+            return None
+        # Claimed or answered by another worker
+        self._cache.pop(cache_key)
+        stored = StoredResponse(row.fingerprint, row.status_code, row.response_body)
+        if stored.status_code is not None:
+            self._cache.set(cache_key, stored)
+        return self._replay(stored, fingerprint)
+
+    def complete(self, scope: str, key: str, fingerprint: str, status_code: int, body: Any) -> None:
+        """Record the response of a request that ran"""
+        self._cache.set((scope, key), StoredResponse(fingerprint, status_code, body))
+        if self._repository is None:
+            return
+        try:
+            with self._session_factory() as db:
+                self._repository.complete(
+                    db=db,
+                    scope=scope,
+                    key=key,
+                    status_code=status_code,
+                    response_body=body,
+                    expires_at=_now() + timedelta(seconds=self.ttl_seconds)
+                )
+        except Exception:
+            # The write itself is committed; only other workers miss the replay
+            logger.error(f"IdempotencyStore: storing the response of {scope} {key} failed", exc_info=True)
+
+    def release(self, scope: str, key: str) -> None:
+        """Forget a claim whose request failed, so a retry runs it again"""
+        self._cache.pop((scope, key))
+        if self._repository is None:
+            return
+        try:
+            with self._session_factory() as db:
+                self._repository.release(db=db, scope=scope, key=key)
+        except Exception:
+            logger.error(f"IdempotencyStore: releasing {scope} {key} failed", exc_info=True)
+
+    def purge_expired(self, db, limit: int = 10000) -> int:
+        """Delete expired persisted keys, returns the number deleted"""
+        if self._repository is None:
+            return 0
+        return self._repository.purge_expired(db=db, limit=limit)
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats.update({
+            'persisted': self._repository is not None,
+            'replays': self.replays
+        })
+        return stats
+
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise ValidationException(message='Idempotency-Key was already used with a different request.')
+        if stored.status_code is None:
+            raise ConflictException(message='A request with this Idempotency-Key is still in progress.')
+        self.replays += 1
+        return stored
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
@@ -0,0 +1,201 @@
+"""
+Presence Index - in-process set of employees currently clocked in
+Following Single Responsibility Principle
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+class PresentSession(NamedTuple):
+    """Open session of a present employee, with the employee fields the roster shows"""
+    employee_id: UUID
+    attendance_id: UUID
+    clock_in: datetime
+    employee_code: Optional[str] = None     # None until the employee's details are known
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row) -> 'PresentSession':
+        """Build from a get_present_sessions row"""
+        return cls(
+            employee_id=row.employee_id,
+            attendance_id=row.attendance_id,
+            clock_in=row.clock_in,
+            employee_code=row.employee_code,
+            first_name=row.first_name,
+            last_name=row.last_name,
+            city=row.city,
+            country=row.country
+        )
+
+
+class PresenceIndex:
+    """
+    Incrementally maintained set of open sessions, periodically reconciled
+
+    Clock ins and clock outs handled by this worker update the set as they
+    happen. A background thread reloads the open sessions from the database
+    (ix_attendance_open_session, so the cost follows the number of present
+    employees, not the table) every reconcile_seconds, which picks up other
+    workers' punches, rolled back transactions and sessions closed outside
+    the API. Changes made while a reload runs are re-applied on top of it.
+    """
+
+    def __init__(
+        self,
+        repository,
+        session_factory,
+        reconcile_seconds: float = 5,
+        open_session_lookback_days: Optional[int] = None
+    ):
+        """Reload interval and lookback of the open sessions read through the repository"""
+        self._repository = repository
+        self._session_factory = session_factory
+        self.reconcile_seconds = reconcile_seconds
+        self._open_session_lookback_days = open_session_lookback_days
+        self._sessions: Dict[UUID, PresentSession] = {}
+        # Local changes made while a reload is running, None otherwise
+        self._changes: Optional[List[Tuple[UUID, Optional[PresentSession]]]] = None
+        # Sessions sorted by (last_name, first_name, employee_id), rebuilt on demand
+        self._roster: Optional[List[PresentSession]] = None
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+        self._reconciled_at: Optional[datetime] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.reconcile_errors = 0
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def reconciled_at(self) -> Optional[datetime]:
+        """When the set was last reloaded from the database"""
+        return self._reconciled_at
+
+    def mark_in(self, employee_id: UUID, attendance_id: UUID, clock_in: datetime) -> None:
+        """Record a clock in, keeping the employee fields already known"""
+        self.start()
+        with self._lock:
+            known = self._sessions.get(employee_id)
+            session = PresentSession(employee_id, attendance_id, clock_in)
+            if known is not None:
+                session = known._replace(attendance_id=attendance_id, clock_in=clock_in)
+            self._set(employee_id, session)
+
+    def mark_out(self, employee_id: UUID) -> None:
+        """Record a clock out"""
+        self.start()
+        with self._lock:
+            if employee_id in self._sessions:
+                self._set(employee_id, None)
+
+    def apply(self, rows: Iterable) -> None:
+        """Add open sessions read from the database (get_present_sessions rows)"""
+        with self._lock:
+            for row in rows:
+                self._set(row.employee_id, PresentSession.from_row(row))
+
+    def missing_details(self) -> List[UUID]:
+        """Present employees whose code and name are not known yet"""
+        with self._lock:
+            return [session.employee_id for session in self._sessions.values() if session.employee_code is None]
+
+    def roster(self) -> Optional[List[PresentSession]]:
+        """Present employees sorted by name, None when not loaded yet"""
+        self.start()
+        if not self.is_loaded:
+            return None
+        with self._lock:
+            if self._roster is None:
+                self._roster = sorted(self._sessions.values(), key=roster_key)
+            return self._roster
+
+    def load(self, db) -> None:
+        """Replace the set with the open sessions in the database"""
+        with self._lock:
+            self._changes = []
+        try:
+            open_since = None
+            if self._open_session_lookback_days:
+                open_since = datetime.now(timezone.utc) - timedelta(days=self._open_session_lookback_days)
+            sessions = {
+                row.employee_id: PresentSession.from_row(row)
+                for row in self._repository.get_present_sessions(db=db, open_since=open_since)
+            }
+            reconciled_at = datetime.now(timezone.utc)
+            with self._lock:
+                for employee_id, session in self._changes:
+                    if session is None:
+                        sessions.pop(employee_id, None)
+                    else:
+                        sessions[employee_id] = session
+                self._sessions = sessions
+                self._roster = None
+                self._loaded_at = time.monotonic()
+                self._reconciled_at = reconciled_at
+        finally:
+            with self._lock:
+                self._changes = None
+        logger.debug(f"PresenceIndex: loaded {len(sessions)} open sessions")
+
+    def start(self) -> None:
+        """Start the background reconciler on first use in this process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='presence-index',
+                    daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            'loaded': self.is_loaded,
+            'present': len(self._sessions),
+            'reconciled_at': self._reconciled_at.isoformat() if self._reconciled_at else None,
+            'reconcile_errors': self.reconcile_errors
+        }
+
+    def _set(self, employee_id: UUID, session: Optional[PresentSession]) -> None:
+        """Apply one change; caller holds the lock"""
+        if session is None:
+            self._sessions.pop(employee_id, None)
+        else:
+            self._sessions[employee_id] = session
+        self._roster = None
+        if self._changes is not None:
+            self._changes.append((employee_id, session))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self._session_factory() as session:
+                    self.load(session)
+            except Exception:
+                self.reconcile_errors += 1
+                logger.error("PresenceIndex: reconcile failed", exc_info=True)
+            self._stop.wait(self.reconcile_seconds)
+
+
+def roster_key(session: PresentSession) -> Tuple[str, str, str]:
+    """Sort key of the roster, also its keyset cursor"""
+    return (session.last_name or '', session.first_name or '', str(session.employee_id))
+
@@ -0,0 +1,288 @@
+"""
+Punch Write-Behind Queue - acknowledge clock ins now, write them in batches
+Following Single Responsibility Principle
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from util.spool import Spool
+from util.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class DroppedPunch(NamedTuple):
+    """An accepted clock in that was not written"""
+    attendance_id: UUID
+    clock_in: datetime
+    reason: str  # already_clocked_in or unknown_employee
+
+
+class PunchWriteBehindQueue:
+    """
+    Bounded in-process queue of accepted clock ins
+
+    Accepted punches are appended to a durable local spool, then queued; a
+    background flusher writes them to attendance_record_t in one INSERT
+    per batch (batch_size punches, or whatever is queued after
+    flush_interval_ms). A punch is removed from the queue and acknowledged
+    in the spool only after its batch committed, so a crashed worker's
+    spool is replayed by the next worker that starts. The insert is
+    idempotent (preassigned ids), which makes replays safe. When the queue
+    is full, enqueue() waits up to enqueue_timeout_ms and then refuses.
+
+    Spool appends are ordered by their own lock and their fsyncs shared
+    between concurrent enqueues (group commit), so neither the flusher
+    nor other enqueues wait behind a disk flush on the queue's lock.
+
+    A punch already acknowledged with 202 is dropped at write time when
+    its employee turned out to have another open session or no longer
+    exists. The last dropped punch of each employee is kept for
+    dropped_ttl_seconds (get_dropped), in this worker only.
+    """
+
+    def __init__(
+        self,
+        repository,
+        session_factory,
+        spool_dir: str,
+        max_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 200,
+        enqueue_timeout_ms: int = 50,
+        fsync: bool = True,
+        partitioned: bool = False,
+        open_session_lookback_days: Optional[int] = None,
+        dropped_ttl_seconds: float = 86400
+    ):
+        """Spool location, queue bound, batching and fsync of the punches and how their inserts find open sessions"""
+        self._repository = repository
+        self._session_factory = session_factory
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.enqueue_timeout = enqueue_timeout_ms / 1000
+        self._partitioned = partitioned
+        self._open_session_lookback_days = open_session_lookback_days
+        self._spool = Spool(spool_dir, fsync=fsync)
+        # (attendance_id, employee_id, clock_in, enqueued at), oldest first
+        self._queue = deque()
+        # employee_id -> punches queued and not written yet
+        self._pending: Dict[UUID, int] = {}
+        # Queue slots taken by enqueues still appending to the spool
+        self._reserved = 0
+        self._condition = threading.Condition()
+        # Keeps spool order and queue order the same (acknowledge() counts on
+        # it); held by the flusher while it acknowledges
+        self._append_lock = threading.Lock()
+        # employee_id -> DroppedPunch
+        self._dropped = TTLCache(max_size=max_size, ttl_seconds=dropped_ttl_seconds)
+        self._flush_requested = False
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.accepted = 0
+        self.written = 0
+        self.dropped = 0
+        self.refused = 0
+        self.replayed = 0
+        self.flush_errors = 0
+
+    def enqueue(self, attendance_id: UUID, employee_id: UUID, clock_in: datetime) -> bool:
+        """Durably queue an accepted clock in, False when the queue stayed full"""
+        self.start()
+        record = json.dumps([str(attendance_id), str(employee_id), clock_in.isoformat()]).encode()
+        with self._condition:
+            deadline = time.monotonic() + self.enqueue_timeout
+            while len(self._queue) + self._reserved >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.refused += 1
+                    return False
+                self._condition.wait(remaining)
+            self._reserved += 1
+        queued = False
+        try:
+            with self._append_lock:
+                position = self._spool.append(record, sync=False)
+                with self._condition:
+                    self._reserved -= 1
+                    queued = True
+                    self._queue.append((attendance_id, employee_id, clock_in, time.monotonic()))
+                    self._pending[employee_id] = self._pending.get(employee_id, 0) + 1
+                    self.accepted += 1
+                    if len(self._queue) >= self.batch_size:
+                        self._condition.notify_all()
+        finally:
+            if not queued:
+                with self._condition:
+                    self._reserved -= 1
+        self._dropped.pop(employee_id)
+        self._spool.sync(position)
+        return True
+
+    def get_dropped(self, employee_id: UUID) -> Optional[DroppedPunch]:
+        """The employee's last accepted clock in that was dropped, if this worker still knows it"""
+        return self._dropped.get(employee_id)
+
+    def is_pending(self, employee_id: UUID) -> bool:
+        """Whether a clock in of the employee is queued but not written yet"""
+        return employee_id in self._pending
+
+    def wait_written(self, employee_ids: Iterable[UUID], timeout: float) -> bool:
+        """Flush now and wait until no punch of employee_ids is queued, False on timeout"""
+        employee_ids = set(employee_ids)
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while any(employee_id in self._pending for employee_id in employee_ids):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flush_requested = True
+                self._condition.notify_all()
+                self._condition.wait(remaining)
+        return True
+
+    def start(self) -> None:
+        """Open the spool and start the flusher on first use in this process"""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._spool.open()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='punch-write-behind',
+                    daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10) -> None:
+        """Write what is queued and stop the flusher"""
+        self._stop.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if not self._queue:
+                self._spool.close()
+
+    def stats(self) -> dict:
+        return {
+            'queued': len(self._queue),
+            'max_size': self.max_size,
+            'accepted': self.accepted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'dropped_known': len(self._dropped),
+            'refused': self.refused,
+            'replayed': self.replayed,
+            'flush_errors': self.flush_errors
+        }
+
+    def _run(self) -> None:
+        try:
+            self.replayed += self._spool.recover_orphans(self._replay)
+        except Exception:
+            self.flush_errors += 1
+            logger.error("PunchWriteBehindQueue: spool replay failed", exc_info=True)
+        backoff = self.flush_interval
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._write([(attendance_id, employee_id, clock_in) for attendance_id, employee_id, clock_in, _ in batch])
+            except Exception:
+                self.flush_errors += 1
+                logger.error(f"PunchWriteBehindQueue: writing {len(batch)} punches failed", exc_info=True)
+                # Batch stays queued (and spooled); retry with backoff
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+                if self._stop.is_set():
+                    return
+                continue
+            backoff = self.flush_interval
+            # Same lock order as enqueue: the spool is never appended to
+            # while it is acknowledged
+            with self._append_lock, self._condition:
+                for _ in batch:
+                    _, employee_id, _, _ = self._queue.popleft()
+                    if self._pending[employee_id] == 1:
+                        del self._pending[employee_id]
+                    else:
+                        self._pending[employee_id] -= 1
+                self._spool.acknowledge(len(batch))
+                self._condition.notify_all()
+
+    def _next_batch(self) -> Optional[List[tuple]]:
+        """Wait for a full batch, the flush interval or a flush request; None once stopped and empty"""
+        with self._condition:
+            while True:
+                if self._queue:
+                    age = time.monotonic() - self._queue[0][3]
+                    if (
+                        len(self._queue) >= self.batch_size
+                        or age >= self.flush_interval
+                        or self._flush_requested
+                        or self._stop.is_set()
+                    ):
+                        self._flush_requested = False
+                        return [self._queue[i] for i in range(min(self.batch_size, len(self._queue)))]
+                    self._condition.wait(self.flush_interval - age)
+                elif self._stop.is_set():
+                    return None
+                else:
+                    self._condition.wait()
+
+    def _write(self, punches: List[Tuple[UUID, UUID, datetime]]) -> None:
+        """Insert one batch in its own transaction"""
+        unique = {}
+        for punch in punches:
+            unique.setdefault(punch[1], punch)
+        open_since = None
+        if self._open_session_lookback_days:
+            open_since = datetime.now(timezone.utc) - timedelta(days=self._open_session_lookback_days)
+        with self._session_factory() as db:
+            rows = self._repository.insert_accepted_clock_ins(
+                db=db,
+                punches=list(unique.values()),
+                open_since=open_since,
+                lock_employee=self._partitioned
+            )
+        outcomes = {row.id: row.outcome for row in rows}
+        dropped = []
+        for punch in punches:
+            attendance_id, employee_id, clock_in = punch
+            first = unique[employee_id]
+            if first is punch:
+                outcome = outcomes[attendance_id]
+            else:
+                # Another punch of the employee in this batch: a replayed copy or a duplicate
+                outcome = 'stored' if first[0] == attendance_id else 'already_clocked_in'
+            if outcome in ('inserted', 'stored'):
+                self.written += outcome == 'inserted'
+                continue
+            self._dropped.set(employee_id, DroppedPunch(attendance_id, clock_in, outcome))
+            dropped.append(f'{attendance_id} ({outcome})')
+        if dropped:
+            self.dropped += len(dropped)
+            logger.warning(
+                f"PunchWriteBehindQueue: dropped {len(dropped)} accepted clock ins: {', '.join(dropped)}"
+            )
+
+    def _replay(self, records: List[bytes]) -> None:
+        punches = []
+        for record in records:
+            attendance_id, employee_id, clock_in = json.loads(record)
+            punches.append((UUID(attendance_id), UUID(employee_id), datetime.fromisoformat(clock_in)))
+        for start in range(0, len(punches), self.batch_size):
+            self._write(punches[start:start + self.batch_size])
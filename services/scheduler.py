@@ -0,0 +1,119 @@
+"""
+Scheduler - periodic background jobs, one worker at a time
+Following Single Responsibility Principle
+"""
+import logging
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock class of scheduled jobs; the second key is a hash of the job name
+JOB_LOCK_CLASS = 0x4A4F4253
+
+
+class _Job:
+    def __init__(self, name: str, interval_seconds: float, func: Callable[[], Optional[int]]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.lock_key = zlib.crc32(name.encode()) - 2 ** 31
+        self.next_run = time.monotonic() + interval_seconds
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_result: Optional[int] = None
+        self.last_duration: Optional[float] = None
+
+
+class Scheduler:
+    """
+    In-process scheduler of periodic jobs
+
+    Every worker runs one daemon thread, started on first use. Before a
+    job runs its cluster-wide advisory lock is taken with
+    pg_try_advisory_lock on a dedicated autocommit connection, so when
+    several workers (or hosts) are due at the same time only one runs it
+    and the others skip that round. Jobs manage their own transactions.
+    """
+
+    def __init__(self, engine):
+        """The engine whose advisory locks keep each job to one worker at a time"""
+        self._engine = engine
+        self._jobs: List[_Job] = []
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def add_job(self, name: str, interval_seconds: float, func: Callable[[], Optional[int]]) -> None:
+        """Run func every interval_seconds; its return value is kept as last_result"""
+        self._jobs.append(_Job(name, interval_seconds, func))
+
+    def start(self) -> None:
+        """Start the scheduler thread on first use in this process"""
+        if self._thread is not None or not self._jobs:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='scheduler',
+                    daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_now(self, name: str) -> bool:
+        """Run a job immediately under its lock, False when another worker holds it"""
+        return self._run_job(next(job for job in self._jobs if job.name == name))
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            job.name: {
+                'interval_seconds': job.interval_seconds,
+                'runs': job.runs,
+                'skipped': job.skipped,
+                'errors': job.errors,
+                'last_result': job.last_result,
+                'last_duration_seconds': round(job.last_duration, 3) if job.last_duration is not None else None
+            }
+            for job in self._jobs
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self._jobs:
+                if job.next_run <= now:
+                    self._run_job(job)
+                    job.next_run = time.monotonic() + job.interval_seconds
+            next_run = min(job.next_run for job in self._jobs)
+            self._stop.wait(max(next_run - time.monotonic(), 0))
+
+    def _run_job(self, job: _Job) -> bool:
+        try:
+            with self._engine.connect() as connection:
+                connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+                locked = connection.execute(
+                    select(func.pg_try_advisory_lock(JOB_LOCK_CLASS, job.lock_key))
+                ).scalar()
+                if not locked:
+                    job.skipped += 1
+                    return False
+                try:
+                    started = time.monotonic()
+                    job.last_result = job.func()
+                    job.last_duration = time.monotonic() - started
+                    job.runs += 1
+                finally:
+                    connection.execute(select(func.pg_advisory_unlock(JOB_LOCK_CLASS, job.lock_key)))
+        except Exception:
+            job.errors += 1
+            logger.error(f"Scheduler: job {job.name} failed", exc_info=True)
+        return True
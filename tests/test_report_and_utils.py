@@ -0,0 +1,208 @@
+"""
+Input / expected output cases for the attendance report computation and the util helpers
+"""
+from datetime import date, datetime, timezone
+from uuid import UUID
+
+import numpy as np
+import pytest
+
+from exceptions.app_exceptions import ValidationException
+from services.attendance_report_service import SessionArrays, compute_report
+from util.histogram import histogram_percentile
+from util.ignore_requests import ActivityLogRules, ActivityRule
+from util.pagination import decode_cursor, encode_cursor
+from util.ttl_cache import TTLCache
+
+HOUR = 3600.0
+DAY = 86400.0
+FIRST_DAY = 20000  # work dates as days since 1970-01-01, UTC work day
+SHIFT_START = 9 * HOUR + 5 * 60  # 09:00 with 5 minutes grace
+AS_OF = (FIRST_DAY + 3) * DAY + 12 * HOUR  # day 3, 12:00
+
+
+def _sessions(rows, employees):
+    """SessionArrays from (employee index, work day offset, start hour, hours worked or None while open)"""
+    clock_in = np.array([(FIRST_DAY + day) * DAY + start * HOUR for _, day, start, _ in rows])
+    return SessionArrays(
+        employee_ids=[UUID(int=i + 1) for i in range(employees)],
+        employee_index=np.array([employee for employee, _, _, _ in rows], dtype=np.int64),
+        clock_in=clock_in,
+        clock_out=np.array([
+            np.nan if hours is None else start + hours * HOUR
+            for start, (_, _, _, hours) in zip(clock_in, rows)
+        ]),
+        work_day=np.array([FIRST_DAY + day for _, day, _, _ in rows], dtype=np.int64),
+        start_seconds=np.array([start * HOUR for _, _, start, _ in rows])
+    )
+
+
+def _report(sessions):
+    totals = compute_report(
+        sessions,
+        shift_start_seconds=SHIFT_START,
+        daily_overtime_seconds=8 * HOUR,
+        max_session_seconds=16 * HOUR,
+        as_of=AS_OF
+    )
+    return {name: values.tolist() for name, values in totals._asdict().items()}
+
+
+def test_compute_report_multiple_employees():
+    sessions = _sessions(
+        [
+            # Employee 0, day 0: afternoon session listed first, the day's
+            # first clock in is still 09:00 (on time); 9 h worked, 1 h overtime
+            (0, 0, 14, 5),
+            (0, 0, 9, 4),
+            # Employee 1, day 0: still open 26.5 h later, late at 09:30
+            (1, 0, 9.5, None),
+            # Employee 0, day 1: 22:00 to 06:00 spans midnight and counts
+            # towards the clock in day; late
+            (0, 1, 22, 8),
+            # Employee 1, day 2: closed after 17 h, a missing punch with 9 h overtime
+            (1, 2, 8, 17),
+            # Employee 2, day 3: open for 1 h only, not missing yet; late
+            (2, 3, 11, None),
+        ],
+        employees=3
+    )
+    assert _report(sessions) == {
+        'total_seconds': [17 * HOUR, 17 * HOUR, 0.0],
+        'session_count': [3, 2, 1],
+        'days_worked': [2, 2, 1],
+        'overtime_seconds': [1 * HOUR, 9 * HOUR, 0.0],
+        'late_arrivals': [1, 1, 1],
+        'missing_punches': [0, 2, 0],
+    }
+
+
+def test_compute_report_separates_employees_on_the_same_day():
+    # Same work day for both: the (employee, day) key must not merge them
+    sessions = _sessions([(0, 0, 9, 5), (1, 0, 12, 5), (1, 0, 7, 6)], employees=2)
+    report = _report(sessions)
+    assert report['days_worked'] == [1, 1]
+    assert report['overtime_seconds'] == [0.0, 3 * HOUR]
+    assert report['late_arrivals'] == [0, 0]
+
+
+def test_compute_report_without_sessions():
+    assert _report(_sessions([], employees=0)) == {
+        'total_seconds': [],
+        'session_count': [],
+        'days_worked': [],
+        'overtime_seconds': [],
+        'late_arrivals': [],
+        'missing_punches': [],
+    }
+
+
+def test_cursor_round_trip():
+    clock_in = datetime(2026, 10, 17, 8, 30, tzinfo=timezone.utc)
+    attendance_id = UUID('12345678-1234-5678-1234-567812345678')
+    cursor = encode_cursor(clock_in, attendance_id)
+    assert '=' not in cursor
+    assert decode_cursor(cursor, datetime, UUID) == (clock_in, attendance_id)
+    assert decode_cursor(encode_cursor(date(2026, 10, 17), 'a', 3), date, str, int) == (date(2026, 10, 17), 'a', 3)
+    assert decode_cursor(encode_cursor('Doe', None), str, str) == ('Doe', None)
+
+
+@pytest.mark.parametrize('cursor, types', [
+    ('not a cursor', (datetime, UUID)),
+    (encode_cursor('2026-10-17T08:30:00'), (datetime, UUID)),
+    (encode_cursor('yesterday', 'x'), (datetime, UUID)),
+    (encode_cursor('2026-10-17', 'not-a-uuid'), (date, UUID)),
+])
+def test_malformed_cursor(cursor, types):
+    with pytest.raises(ValidationException):
+        decode_cursor(cursor, *types)
+
+
+RULES = [
+    {'endpoint': '*', 'methods': ['options'], 'sample_rate': 0},
+    {'endpoint': 'auth.*', 'sample_rate': 1.0},
+    {'endpoint': '*', 'errors_only': True, 'sample_rate': 1.0},
+    {'endpoint': 'attendance.get_cache_stats', 'sample_rate': 0},
+    {'endpoint': '*', 'methods': ['GET'], 'sample_rate': 0.1},
+]
+
+
+@pytest.mark.parametrize('endpoint, method, status_code, draw, logged', [
+    ('auth.login', 'OPTIONS', 200, 0.0, False),
+    ('auth.login', 'POST', 401, 0.99, True),
+    ('attendance.get_cache_stats', 'GET', 200, 0.0, False),
+    ('attendance.get_cache_stats', 'GET', 500, 0.99, True),
+    ('attendance.get_records', 'GET', 200, 0.05, True),
+    ('attendance.get_records', 'GET', 200, 0.1, False),
+    ('attendance.get_records', 'GET', 404, 0.99, True),
+    ('attendance.clock_in', 'POST', 201, 0.99, True),
+    (None, 'GET', 200, 0.5, False),
+])
+def test_activity_log_rules(endpoint, method, status_code, draw, logged):
+    rules = ActivityLogRules(RULES, default_sample_rate=1.0, rng=lambda: draw)
+    assert rules.should_log(endpoint, method, status_code) is logged
+    assert rules.sampled_out == (0 if logged else 1)
+
+
+def test_activity_log_rules_default_sample_rate():
+    rules = ActivityLogRules([], default_sample_rate=0.5, rng=iter([0.4, 0.6]).__next__)
+    assert [rules.should_log('users.get_user', 'GET', 200) for _ in range(2)] == [True, False]
+
+
+def test_activity_rule_rejects_invalid_sample_rate():
+    with pytest.raises(ValueError):
+        ActivityRule(endpoint='auth.*', sample_rate=2)
+
+
+@pytest.mark.parametrize('buckets, q, expected', [
+    ([0, 4, 4, 0], 0.5, 20.0),
+    ([0, 4, 4, 0], 0.25, 15.0),
+    ([0, 4, 4, 0], 0.75, 30.0),
+    ([2, 0, 0, 0], 0.5, 5.0),
+    ([0, 0, 0, 3], 0.5, 40.0),
+    ([0, 0, 0, 0], 0.5, None),
+])
+def test_histogram_percentile(buckets, q, expected):
+    assert histogram_percentile(buckets, q, bounds=(10, 20, 40)) == expected
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expiry():
+    clock = _Clock()
+    cache = TTLCache(max_size=10, ttl_seconds=60, clock=clock)
+    cache.set('a', 1)
+    clock.now = 59.9
+    assert cache.get('a') == 1
+    clock.now = 60
+    assert cache.get('a', 'gone') == 'gone'
+    assert len(cache) == 0
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl_seconds=60, clock=_Clock())
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'missing') == 'missing'
+    assert cache.stats() == {
+        'size': 1,
+        'max_size': 2,
+        'ttl_seconds': 60,
+        'hits': 3,
+        'misses': 1,
+        'evictions': 1,
+        'hit_ratio': 0.75,
+    }
@@ -0,0 +1,129 @@
+"""
+Spool and write-behind punch queue: records stay on disk until acknowledged
+"""
+import json
+import os
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+from services.punch_write_behind import PunchWriteBehindQueue
+from util.spool import Spool, read_segment
+
+
+def _spooled(spool):
+    """Records still on disk, oldest first"""
+    return [
+        record
+        for name in sorted(os.listdir(spool.directory)) if name.endswith('.seg')
+        for record in read_segment(os.path.join(spool.directory, name))
+    ]
+
+
+def _unacknowledged(spool):
+    """Records on disk past those acknowledged in a partly acknowledged segment"""
+    records = _spooled(spool)
+    return records[len(records) - spool.pending:]
+
+
+def test_spool_deletes_acknowledged_segments(tmp_path):
+    spool = Spool(str(tmp_path), segment_records=2, fsync=False)
+    spool.open()
+    for i in range(5):
+        spool.append(b'%d' % i)
+    assert spool.pending == 5
+    spool.acknowledge(3)
+    assert spool.pending == 2
+    # The segment of 2 and 3 goes once both are acknowledged
+    assert _spooled(spool) == [b'2', b'3', b'4']
+    spool.acknowledge(2)
+    assert _spooled(spool) == []
+    spool.append(b'5')
+    assert _spooled(spool) == [b'5']
+    spool.close()
+    assert os.path.isdir(spool.directory)
+
+
+class _AppendOnFirstLock:
+    """Lock wrapper: another thread appends to the spool just before the first acquire"""
+
+    def __init__(self, spool, record):
+        self._lock = spool._file_lock
+        self._append = threading.Thread(target=spool.append, args=(record,))
+
+    def __enter__(self):
+        if self._append.ident is None:
+            self._append.start()
+            # The append finishes before the caller takes the lock
+            self._append.join(0.2)
+        return self._lock.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._lock.__exit__(*exc_info)
+
+
+def test_spool_keeps_a_record_appended_while_acknowledging(tmp_path):
+    spool = Spool(str(tmp_path), segment_records=None, fsync=False)
+    spool.open()
+    spool.append(b'acknowledged')
+    lock = spool._file_lock = _AppendOnFirstLock(spool, b'queued')
+    spool.acknowledge(1)
+    lock._append.join()
+    assert spool.pending == 1
+    assert _unacknowledged(spool) == [b'queued']
+    spool.close()
+
+
+class _Repository:
+    """Stores every punch, once per attendance id"""
+
+    def __init__(self):
+        self.stored = {}
+        self.lock = threading.Lock()
+
+    def insert_accepted_clock_ins(self, db, punches, open_since=None, lock_employee=False):
+        rows = []
+        with self.lock:
+            for attendance_id, employee_id, clock_in in punches:
+                outcome = 'stored' if attendance_id in self.stored else 'inserted'
+                self.stored[attendance_id] = employee_id
+                rows.append(SimpleNamespace(id=attendance_id, employee_id=employee_id, outcome=outcome))
+        return rows
+
+
+def test_punch_queue_writes_and_acknowledges_concurrent_enqueues(tmp_path):
+    repository = _Repository()
+    queue = PunchWriteBehindQueue(
+        repository,
+        nullcontext,
+        spool_dir=str(tmp_path),
+        max_size=100,
+        batch_size=7,
+        flush_interval_ms=1,
+        enqueue_timeout_ms=5000,
+        fsync=False
+    )
+    accepted = []
+
+    def clock_ins():
+        for _ in range(200):
+            attendance_id = uuid4()
+            assert queue.enqueue(attendance_id, uuid4(), datetime.now(timezone.utc))
+            accepted.append(attendance_id)
+
+    threads = [threading.Thread(target=clock_ins) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Every punch still queued is still on disk
+    with queue._append_lock, queue._condition:
+        assert [UUID(json.loads(record)[0]) for record in _unacknowledged(queue._spool)] == [
+            attendance_id for attendance_id, _, _, _ in queue._queue
+        ]
+    queue.stop()
+    assert sorted(repository.stored) == sorted(accepted)
+    assert queue.stats()['written'] == 800
+    assert not os.path.isdir(queue._spool.directory)
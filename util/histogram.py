@@ -0,0 +1,32 @@
+from typing import Optional, Sequence
+
+# Upper bounds (inclusive) of the latency histogram buckets; one more bucket
+# counts the requests slower than the last bound
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def histogram_percentile(
+    buckets: Sequence[int],
+    q: float,
+    bounds: Sequence[float] = LATENCY_BUCKETS_MS
+) -> Optional[float]:
+    """
+    Estimate the q-quantile (0..1) of a histogram with the given bucket bounds
+
+    Interpolates linearly within the bucket holding the quantile; for the
+    overflow bucket the last bound is returned. None for an empty histogram.
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    for index, count in enumerate(buckets):
+        if count and cumulative + count >= rank:
+            if index >= len(bounds):
+                return float(bounds[-1])
+            lower = bounds[index - 1] if index else 0
+            upper = bounds[index]
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+    return float(bounds[-1])
@@ -0,0 +1,57 @@
+import hashlib
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+from datastore.deps import commit_request_session
+from exceptions.app_exceptions import ValidationException
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+# Set on responses replayed from the idempotency store
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def idempotent(f):
+    """
+    Replay the stored response when a request is retried with the same Idempotency-Key.
+
+    Keys are scoped to the method and path. Only 2xx JSON responses are
+    stored, after committing the request's transaction; a request that
+    fails is released so its retry runs again.
+    Without the header, or with no idempotency_store configured, the view
+    runs as usual.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        store = current_app.extensions.get('idempotency_store')
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if store is None or not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationException(message=f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters.')
+
+        scope = f'{request.method} {request.path}'
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        stored = store.begin(scope, key, fingerprint)
+        if stored is not None:
+            response = jsonify(stored.body)
+            response.status_code = stored.status_code
+            response.headers[REPLAYED_HEADER] = 'true'
+            return response
+
+        try:
+            response = current_app.make_response(f(*args, **kwargs))
+            if 200 <= response.status_code < 300 and response.is_json:
+                # Only a committed write may be replayed
+                commit_request_session()
+        except BaseException:
+            store.release(scope, key)
+            raise
+        if 200 <= response.status_code < 300 and response.is_json:
+            store.complete(scope, key, fingerprint, response.status_code, response.get_json())
+        else:
+            store.release(scope, key)
+        return response
+
+    return decorated_function
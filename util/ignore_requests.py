@@ -1,15 +1,102 @@
-IGNORE_TOKEN_VERIFICATION_ENDPOINTS = ['/user-service/auth/login',
-                                       '/user-service/users',
-                                       '/user-service/ping',
-                                                                                          '/user-service/users/organizations']
+import fnmatch
+import random
+import re
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
+# Flask endpoints (blueprint.view) served without an auth token
+TOKEN_EXEMPT_ENDPOINTS = frozenset({
+    'auth.login',
+    'users.create_user',
+    'organizations.list_organizations',
+    'static',
+})
 
-def check_ignore_token(path, method):
+
+def check_ignore_token(endpoint, method):
     if method == 'OPTIONS':
         return True
+    return endpoint in TOKEN_EXEMPT_ENDPOINTS
 
-    if IGNORE_TOKEN_VERIFICATION_ENDPOINTS.__contains__(path):
-        return True
-    if 'geo' in path:
+
+class ActivityRule:
+    """
+    One activity logging rule
+
+    endpoint is a glob over Flask endpoint names ('attendance.*'), methods
+    limits the rule to those HTTP methods (None: any), and an errors_only
+    rule only applies to responses with status >= 400. A matching request
+    is logged with probability sample_rate.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = '*',
+        methods: Optional[Iterable[str]] = None,
+        sample_rate: float = 1.0,
+        errors_only: bool = False
+    ):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError(f"sample_rate of activity rule {endpoint!r} must be between 0 and 1")
+        self.endpoint = endpoint
+        self.methods = frozenset(method.upper() for method in methods) if methods else None
+        self.sample_rate = sample_rate
+        self.errors_only = errors_only
+        self._pattern = re.compile(fnmatch.translate(endpoint))
+
+    def matches(self, endpoint: str, method: str) -> bool:
+        return (
+            (self.methods is None or method in self.methods)
+            and self._pattern.match(endpoint) is not None
+        )
+
+
+class ActivityLogRules:
+    """
+    Decide which requests are recorded in user_activity_t
+
+    Rules are tried in order and the first one that applies decides;
+    requests no rule applies to are logged with default_sample_rate. The
+    rules applying to an (endpoint, method) pair are resolved once and
+    cached, so a request costs a dict lookup and at most one random draw.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Mapping],
+        default_sample_rate: float = 1.0,
+        rng: Callable[[], float] = random.random
+    ):
+        self.rules = [ActivityRule(**rule) for rule in rules]
+        self.default_sample_rate = default_sample_rate
+        self._rng = rng
+        # (endpoint, method) -> applicable rules, up to the first one without errors_only
+        self._resolved: Dict[Tuple[str, str], Tuple[ActivityRule, ...]] = {}
+        self.sampled_out = 0
+
+    def should_log(self, endpoint: Optional[str], method: str, status_code: int) -> bool:
+        """Whether the activity of this request should be recorded"""
+        sample_rate = self.default_sample_rate
+        for rule in self._rules_for(endpoint or '', method):
+            if rule.errors_only and status_code < 400:
+                continue
+            sample_rate = rule.sample_rate
+            break
+        if sample_rate >= 1:
+            return True
+        if sample_rate <= 0 or self._rng() >= sample_rate:
+            self.sampled_out += 1
+            return False
         return True
-    return False
+
+    def _rules_for(self, endpoint: str, method: str) -> Tuple[ActivityRule, ...]:
+        key = (endpoint, method)
+        rules = self._resolved.get(key)
+        if rules is None:
+            applicable: List[ActivityRule] = []
+            for rule in self.rules:
+                if rule.matches(endpoint, method):
+                    applicable.append(rule)
+                    if not rule.errors_only:
+                        break
+            rules = self._resolved[key] = tuple(applicable)
+        return rules
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime, date
+from uuid import UUID
+
+from exceptions.app_exceptions import ValidationException
+
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row of a page as an opaque keyset cursor"""
+    parts = []
+    for value in values:
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif isinstance(value, UUID):
+            value = str(value)
+        parts.append(value)
+    raw = json.dumps(parts, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, *types):
+    """
+    Decode a keyset cursor back into its sort key values.
+
+    types gives the expected type of each value (datetime, date, UUID, str,
+    int); any malformed cursor raises ValidationException.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        parts = json.loads(raw)
+        if not isinstance(parts, list) or len(parts) != len(types):
+            raise ValueError('wrong number of values')
+        values = []
+        for value, value_type in zip(parts, types):
+            if value_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value_type is date:
+                value = date.fromisoformat(value)
+            elif value is not None:
+                value = value_type(value)
+            values.append(value)
+        return tuple(values)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValidationException(message='Invalid pagination cursor.')
@@ -0,0 +1,244 @@
+import fcntl
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct('>I')
+_LOCK_FILE = '.lock'
+_SEGMENT_SUFFIX = '.seg'
+
+
+class Spool:
+    """
+    Durable, append-only spool of length-prefixed records
+
+    Each process writes to its own directory under root (host-pid), held
+    with an exclusive flock for the life of the process. Records are
+    appended to numbered segment files and acknowledged in append order;
+    a segment is deleted once all its records are acknowledged. A
+    directory whose lock is free belongs to a dead process, and its
+    segments can be replayed with recover_orphans().
+
+    A segment is sealed (and the next append starts a new one) after
+    segment_records records or segment_bytes bytes, whichever limits are
+    given.
+
+    append(record, sync=False) only writes the record; sync() then makes
+    it durable. Threads calling sync() concurrently share fsyncs (group
+    commit), so appends do not have to be serialised behind one. Callers
+    must still order appends and acknowledgements so that every
+    acknowledged record was appended before (acknowledge counts records
+    in append order).
+    """
+
+    def __init__(
+        self,
+        root: str,
+        segment_records: Optional[int] = 1000,
+        fsync: bool = True,
+        segment_bytes: Optional[int] = None
+    ):
+        self.root = root
+        self.segment_records = segment_records
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.directory = os.path.join(root, f'{socket.gethostname()}-{os.getpid()}')
+        self._lock_fd: Optional[int] = None
+        self._file = None
+        self._sequence = 0
+        # [path, records written, records acknowledged, bytes written], oldest first
+        self._segments = deque()
+        # Records appended, and how many of them are known to be on disk
+        self._appended = 0
+        self._synced = 0
+        # _file_lock guards the open segment file against sync() from
+        # other threads; _sync_lock lets one fsync run at a time
+        self._file_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def open(self) -> None:
+        """Create and lock this process's spool directory"""
+        if os.path.isdir(self.directory):
+            # Left by an earlier process with the same pid (e.g. pid 1 in a
+            # restarted container): set it aside for recover_orphans()
+            lock_fd = _lock(self.directory, blocking=True)
+            try:
+                if _segment_paths(self.directory):
+                    os.rename(self.directory, f'{self.directory}.{time.time_ns()}')
+            finally:
+                os.close(lock_fd)
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock_fd = _lock(self.directory, blocking=True)
+
+    def append(self, record: bytes, sync: bool = True) -> int:
+        """Append one record, durably unless sync=False; returns its position for sync()"""
+        with self._file_lock:
+            if self._file is None:
+                self._sequence += 1
+                path = os.path.join(self.directory, f'{self._sequence:012d}{_SEGMENT_SUFFIX}')
+                self._file = open(path, 'ab')
+                self._segments.append([path, 0, 0, 0])
+            self._file.write(_LENGTH.pack(len(record)) + record)
+            self._file.flush()
+            self._appended += 1
+            position = self._appended
+            segment = self._segments[-1]
+            segment[1] += 1
+            segment[3] += _LENGTH.size + len(record)
+            if (self.segment_records is not None and segment[1] >= self.segment_records) or (
+                self.segment_bytes is not None and segment[3] >= self.segment_bytes
+            ):
+                self._seal()
+        if sync:
+            self.sync(position)
+        return position
+
+    def sync(self, position: int) -> None:
+        """Make the records appended up to position durable, sharing the fsync with concurrent callers"""
+        if not self.fsync:
+            return
+        with self._sync_lock:
+            if self._synced >= position:
+                # Covered by the fsync another thread just did
+                return
+            with self._file_lock:
+                appended = self._appended
+                fd = os.dup(self._file.fileno()) if self._file is not None else None
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            self._synced = max(self._synced, appended)
+
+    def acknowledge(self, count: int) -> None:
+        """Mark the oldest count unacknowledged records as done, deleting finished segments"""
+        # Under the file lock, so a record appended to the open segment is
+        # either counted before it is found finished or goes to a new one
+        with self._file_lock:
+            while count and self._segments:
+                segment = self._segments[0]
+                taken = min(count, segment[1] - segment[2])
+                segment[2] += taken
+                count -= taken
+                if segment[2] < segment[1]:
+                    break
+                if len(self._segments) == 1:
+                    self._seal()
+                self._segments.popleft()
+                os.unlink(segment[0])
+
+    @property
+    def pending(self) -> int:
+        """Records appended but not acknowledged yet"""
+        return sum(written - acknowledged for _, written, acknowledged, _ in self._segments)
+
+    @property
+    def size(self) -> int:
+        """Bytes of the segments not deleted yet"""
+        return sum(segment[3] for segment in self._segments)
+
+    def rotate(self) -> None:
+        """Seal the segment being written, so the next append starts a new one"""
+        with self._file_lock:
+            self._seal()
+
+    def sealed_segments(self) -> List[Tuple[str, int]]:
+        """(path, records) of the sealed segments not acknowledged yet, oldest first"""
+        sealed = list(self._segments)
+        if self._file is not None:
+            sealed.pop()
+        return [(path, written) for path, written, acknowledged, _ in sealed if acknowledged == 0]
+
+    def close(self) -> None:
+        """Close the spool; the directory is removed when nothing is pending"""
+        with self._file_lock:
+            self._seal()
+        if not self._segments and os.path.isdir(self.directory):
+            os.unlink(os.path.join(self.directory, _LOCK_FILE))
+            os.rmdir(self.directory)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def recover_orphans(self, handler: Callable[[List[bytes]], None]) -> int:
+        """
+        Replay the segments of dead processes' spools through handler.
+
+        handler receives the records of one segment at a time and must
+        make them durable (or raise); the segment is deleted after it
+        returns. Returns the number of records replayed.
+        """
+        replayed = 0
+        if not os.path.isdir(self.root):
+            return replayed
+        for name in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, name)
+            if directory == self.directory or not os.path.isdir(directory):
+                continue
+            lock_fd = _lock(directory, blocking=False)
+            if lock_fd is None:
+                continue
+            try:
+                for path in _segment_paths(directory):
+                    records = list(read_segment(path))
+                    if records:
+                        handler(records)
+                    os.unlink(path)
+                    replayed += len(records)
+                os.unlink(os.path.join(directory, _LOCK_FILE))
+                os.rmdir(directory)
+                logger.info(f"Spool: replayed orphaned spool {directory}")
+            finally:
+                os.close(lock_fd)
+        return replayed
+
+    def _seal(self) -> None:
+        if self._file is not None:
+            # Records appended with sync=False must be on disk before the
+            # file is closed, a later sync() only reaches the open segment
+            if self.fsync and self._synced < self._appended:
+                os.fsync(self._file.fileno())
+                self._synced = self._appended
+            self._file.close()
+            self._file = None
+
+
+def read_segment(path: str) -> Iterator[bytes]:
+    """Records of a segment file; a torn record at the end (crash mid-append) is ignored"""
+    with open(path, 'rb') as segment:
+        while True:
+            header = segment.read(_LENGTH.size)
+            if len(header) < _LENGTH.size:
+                return
+            record = segment.read(_LENGTH.unpack(header)[0])
+            if len(record) < _LENGTH.unpack(header)[0]:
+                logger.warning(f"Spool: ignoring torn record at the end of {path}")
+                return
+            yield record
+
+
+def _segment_paths(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(_SEGMENT_SUFFIX)
+    )
+
+
+def _lock(directory: str, blocking: bool) -> Optional[int]:
+    """flock the directory's lock file, None if it is held and not blocking"""
+    fd = os.open(os.path.join(directory, _LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
@@ -14,8 +14,8 @@ def authenticate(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
 
-        if check_ignore_token(request.path, request.method):
-            return
+        if check_ignore_token(request.endpoint, request.method):
+            return f(*args, **kwargs)
 
         response_object = {
             'status': 'error',
@@ -39,7 +39,7 @@ def authenticate(f):
             user = crud.user_crud_handler.get_row_by_user_id(db=session, id=resp)
             http_args = request.args.to_dict()
             http_args['userId'] = user.id
-            from starlette.datastructures import ImmutableMultiDict
+            from werkzeug.datastructures import ImmutableMultiDict
             request.args = ImmutableMultiDict(http_args)
 
         return f(*args, **kwargs)